@@ -0,0 +1,36 @@
+"""Build the out-of-line (API mode) cffi extension of the backend.
+
+The extension is placed next to the backend sources and is loaded by `frontend.core.backend`,
+which falls back to loading `libbackend.so` in the ABI mode if the extension is not built.
+"""
+
+import os
+from pathlib import Path
+
+from cffi import FFI
+
+BACKEND_DIR = Path(__file__).parent
+EXTENSION_MODULE = "_drunk_cats_backend"
+
+if os.name == "nt":
+    COMPILE_ARGS = ["/O2", "/fp:fast"]
+else:
+    COMPILE_ARGS = ["-O3", "-ffast-math"]
+
+
+def create_builder() -> FFI:
+    builder = FFI()
+    with open(BACKEND_DIR / "library.h", mode="r") as f:
+        declarations = "".join(line for line in f if not line.startswith("#"))
+        builder.cdef(declarations)
+    builder.set_source(
+        EXTENSION_MODULE,
+        '#include "library.c"',
+        include_dirs=[str(BACKEND_DIR)],
+        extra_compile_args=COMPILE_ARGS,
+    )
+    return builder
+
+
+if __name__ == "__main__":
+    create_builder().compile(tmpdir=str(BACKEND_DIR), verbose=True)
@@ -2,57 +2,165 @@
 
 #include <math.h>
 #include <stddef.h>
+#include <stdint.h>
 #include <stdlib.h>
+#include <string.h>
 
 #include "utils-opengl.c"
 #include "utils-random.c"
+#include "utils-time.c"
 
 #include "third-party/kdtree/kdtree.c"
 
+#include "utils-neighbor-list.c"
 
-// static const int CAT_STATE_CALM = 0;
-static const int CAT_STATE_HISSES = 1;
-static const int CAT_STATE_WANTS_TO_FIGHT = 2;
 
+// static const uint8_t CAT_STATE_CALM = 0;
+static const uint8_t CAT_STATE_HISSES = 1;
+static const uint8_t CAT_STATE_WANTS_TO_FIGHT = 2;
 
-static double drunk_cats_g_fight_radius = 0.0;
-static double drunk_cats_g_hiss_radius = 0.0;
+
+struct DrunkCatsWorld {
+    double fight_radius;
+    double hiss_radius;
+    /** Seed of hiss rolls and the number of calculations since it was set. */
+    RandomKey random_key;
+    NeighborList neighbor_list;
+    DrunkCatsStats stats;
+};
+
+/** World used by the global API. */
+static DrunkCatsWorld drunk_cats_g_world = {0};
 
 
 void drunk_cats_configure(const double fight_radius, const double hiss_radius) {
-    drunk_cats_g_fight_radius = fight_radius;
-    drunk_cats_g_hiss_radius = hiss_radius;
+    drunk_cats_world_configure(&drunk_cats_g_world, fight_radius, hiss_radius);
 }
 
-int *drunk_cats_calculate_states(
-    const size_t cat_count,
-    const OpenGlPosition *cat_positions,
-    const unsigned int window_width,
-    const unsigned int window_height,
-    const float scale
-) {
-    double *positions = convert_opengl_to_plain_coordinates(
-        cat_count, cat_positions,
-        window_width, window_height, scale
-    );
-    int *states = calloc(cat_count, sizeof(int));
+int drunk_cats_configure_neighbor_list(const double skin) {
+    return drunk_cats_world_configure_neighbor_list(&drunk_cats_g_world, skin);
+}
+
+void drunk_cats_configure_random(const uint64_t seed) {
+    drunk_cats_world_configure_random(&drunk_cats_g_world, seed);
+}
 
-    // Recalculate states
+uint64_t drunk_cats_get_random_tick(void) {
+    return drunk_cats_world_get_random_tick(&drunk_cats_g_world);
+}
+
+void drunk_cats_set_random_tick(const uint64_t tick) {
+    drunk_cats_world_set_random_tick(&drunk_cats_g_world, tick);
+}
+
+DrunkCatsWorld *drunk_cats_world_create(const double fight_radius, const double hiss_radius) {
+    DrunkCatsWorld *world = calloc(1, sizeof(DrunkCatsWorld));
+    if (world == NULL) exit(1);
+    drunk_cats_world_configure(world, fight_radius, hiss_radius);
+    return world;
+}
+
+void drunk_cats_world_destroy(DrunkCatsWorld *world) {
+    if (world == NULL) return;
+    neighbor_list_free(&world->neighbor_list);
+    free(world);
+}
+
+void drunk_cats_world_configure(DrunkCatsWorld *world, const double fight_radius, const double hiss_radius) {
+    world->fight_radius = fight_radius;
+    world->hiss_radius = hiss_radius;
+    neighbor_list_invalidate(&world->neighbor_list);
+}
+
+int drunk_cats_world_configure_neighbor_list(DrunkCatsWorld *world, const double skin) {
+    // A negative skin would let cats move into the hiss radius unseen between rebuilds
+    if (!(skin >= 0.0)) return -1;
+    world->neighbor_list.skin = skin;
+    neighbor_list_invalidate(&world->neighbor_list);
+    return 0;
+}
+
+void drunk_cats_world_configure_random(DrunkCatsWorld *world, const uint64_t seed) {
+    world->random_key.seed = seed;
+    world->random_key.tick = 0;
+}
+
+uint64_t drunk_cats_world_get_random_tick(const DrunkCatsWorld *world) {
+    return world->random_key.tick;
+}
 
+void drunk_cats_world_set_random_tick(DrunkCatsWorld *world, const uint64_t tick) {
+    world->random_key.tick = tick;
+}
+
+/**
+ * Calculate the greatest common divisor.
+ *
+ * @returns `gcd(a, b)`, where `gcd(a, 0) = a`.
+ */
+static size_t gcd(size_t a, size_t b) {
+    while (b != 0) {
+        const size_t r = a % b;
+        a = b;
+        b = r;
+    }
+    return a;
+}
+
+/**
+ * Build a kd-tree of cat positions, the data of every node is the cat index.
+ *
+ * @param cat_count Number of cat positions given.
+ * @param positions Cat positions as plain flatten coordinates.
+ *
+ * @returns kd-tree, must be freed with `kd_free`.
+ */
+static struct kdtree *kd_tree_build(const size_t cat_count, const double *positions) {
     struct kdtree *tree = kd_create(2);
 
-    // Populate kd_tree
-    for (size_t i = 0; i < cat_count; i++) {
+    // Populate kd_tree in a scrambled order, sorted input (e.g. a grid) makes the tree degenerate
+    size_t step = 2654435761u % (cat_count > 0 ? cat_count : 1);
+    while (gcd(step, cat_count) != 1) step++;
+    for (size_t k = 0, i = 0; k < cat_count; k++, i = (i + step) % cat_count) {
         kd_insert(tree, positions + 2 * i, (void *) i);
     }
 
+    return tree;
+}
+
+/**
+ * Calculate cat states using the kd-tree search of neighbors.
+ *
+ * Used when cats are too crowded for neighbor lists.
+ *
+ * @param tree kd-tree of the given positions.
+ * @param cat_count Number of cat positions given.
+ * @param positions Cat positions as plain flatten coordinates.
+ * @param fight_radius The radius at which cats always start fighting.
+ * @param hiss_radius The radius at which cats may start hissing.
+ * @param random_key Seed, tick and cat ids of hiss rolls.
+ * @param stats Stats to record stage timings to.
+ * @param states Zero-initialized array to write cat states to.
+ */
+static void calculate_states_with_kd_tree(
+    struct kdtree *tree,
+    const size_t cat_count,
+    const double *positions,
+    const double fight_radius,
+    const double hiss_radius,
+    const RandomKey *random_key,
+    DrunkCatsStats *stats,
+    uint8_t *states
+) {
+    double started_at = now_seconds();
+
     // Calculate "wants to fight" states
     for (size_t i = 0; i < cat_count; i++) {
-        const int *state = &states[i];
+        const uint8_t *state = &states[i];
 
         if (*state == CAT_STATE_WANTS_TO_FIGHT) continue;
 
-        struct kdres *fight_cats = kd_nearest_range(tree, positions + 2 * i, drunk_cats_g_fight_radius);
+        struct kdres *fight_cats = kd_nearest_range(tree, positions + 2 * i, fight_radius);
         if (fight_cats == NULL) exit(1);
 
         if (kd_res_size(fight_cats) > 1) {
@@ -64,13 +172,16 @@ int *drunk_cats_calculate_states(
         kd_res_free(fight_cats);
     }
 
+    stage_time_record(&stats->fight_pass, started_at);
+    started_at = now_seconds();
+
     // Calculate "hisses" states
     for (size_t i = 0; i < cat_count; i++) {
-        int *state = &states[i];
+        uint8_t *state = &states[i];
 
         if (*state == CAT_STATE_WANTS_TO_FIGHT) continue;
 
-        struct kdres *hiss_cats = kd_nearest_range(tree, positions + 2 * i, drunk_cats_g_hiss_radius);
+        struct kdres *hiss_cats = kd_nearest_range(tree, positions + 2 * i, hiss_radius);
         if (hiss_cats == NULL) exit(1);
 
         for (; !kd_res_end(hiss_cats); kd_res_next(hiss_cats)) {
@@ -80,7 +191,7 @@ int *drunk_cats_calculate_states(
                 positions[2 * i] - positions[2 * other_cat_i],
                 positions[2 * i + 1] - positions[2 * other_cat_i + 1]
             );
-            if (rand_ud() <= (drunk_cats_g_fight_radius * drunk_cats_g_fight_radius) / (dist * dist)) {
+            if (rand_ud(random_key, i, other_cat_i) <= (fight_radius * fight_radius) / (dist * dist)) {
                 *state = CAT_STATE_HISSES;
                 break;
             }
@@ -88,8 +199,533 @@ int *drunk_cats_calculate_states(
         kd_res_free(hiss_cats);
     }
 
-    kd_free(tree);
+    stage_time_record(&stats->hiss_pass, started_at);
+}
+
+/**
+ * Calculate cat states by re-checking distances inside the neighbor lists only.
+ *
+ * @param list Neighbor list valid for the given positions and covering `hiss_radius`.
+ * @param cat_count Number of cat positions given.
+ * @param positions Cat positions as plain flatten coordinates.
+ * @param fight_radius The radius at which cats always start fighting.
+ * @param hiss_radius The radius at which cats may start hissing.
+ * @param random_key Seed, tick and cat ids of hiss rolls.
+ * @param stats Stats to record stage timings to.
+ * @param states Zero-initialized array to write cat states to.
+ */
+static void calculate_states_with_neighbor_list(
+    const NeighborList *list,
+    const size_t cat_count,
+    const double *positions,
+    const double fight_radius,
+    const double hiss_radius,
+    const RandomKey *random_key,
+    DrunkCatsStats *stats,
+    uint8_t *states
+) {
+    const double fight_radius_sq = fight_radius * fight_radius;
+    const double hiss_radius_sq = hiss_radius * hiss_radius;
+
+    double started_at = now_seconds();
+
+    // Calculate "wants to fight" states
+    for (size_t i = 0; i < cat_count; i++) {
+        for (size_t k = list->offsets[i]; k < list->offsets[i + 1]; k++) {
+            const size_t other_cat_i = list->neighbors[k];
+            const double dx = positions[2 * i] - positions[2 * other_cat_i];
+            const double dy = positions[2 * i + 1] - positions[2 * other_cat_i + 1];
+            if (dx * dx + dy * dy <= fight_radius_sq) {
+                states[i] = CAT_STATE_WANTS_TO_FIGHT;
+                break;
+            }
+        }
+    }
+
+    stage_time_record(&stats->fight_pass, started_at);
+    started_at = now_seconds();
+
+    // Calculate "hisses" states
+    for (size_t i = 0; i < cat_count; i++) {
+        uint8_t *state = &states[i];
+
+        if (*state == CAT_STATE_WANTS_TO_FIGHT) continue;
+
+        for (size_t k = list->offsets[i]; k < list->offsets[i + 1]; k++) {
+            const size_t other_cat_i = list->neighbors[k];
+            const double dx = positions[2 * i] - positions[2 * other_cat_i];
+            const double dy = positions[2 * i + 1] - positions[2 * other_cat_i + 1];
+            const double dist_sq = dx * dx + dy * dy;
+            if (dist_sq > hiss_radius_sq) continue;
+            if (rand_ud(random_key, i, other_cat_i) <= fight_radius_sq / dist_sq) {
+                *state = CAT_STATE_HISSES;
+                break;
+            }
+        }
+    }
+
+    stage_time_record(&stats->hiss_pass, started_at);
+}
+
+/**
+ * Record one cat within `hiss_radius` of the cat `i` into the interactions.
+ *
+ * @param interactions Interactions to record to.
+ * @param i Index of the cat.
+ * @param other_cat_i Index of the other cat.
+ * @param dist_sq Squared distance between the cats.
+ * @param fight_radius_sq Squared radius at which cats always start fighting.
+ * @param nearest_dist_sq Squared distance to the nearest other cat found so far, updated.
+ * @param nearest_cat_i Index of the nearest other cat found so far or -1, updated.
+ */
+static void interactions_record_neighbor(
+    DrunkCatsInteractions *interactions,
+    const size_t i,
+    const size_t other_cat_i,
+    const double dist_sq,
+    const double fight_radius_sq,
+    double *nearest_dist_sq,
+    int64_t *nearest_cat_i
+) {
+    if (*nearest_cat_i < 0 || dist_sq < *nearest_dist_sq) {
+        *nearest_dist_sq = dist_sq;
+        *nearest_cat_i = (int64_t) other_cat_i;
+    }
+
+    // Every pair is seen from both cats, it is written once
+    if (dist_sq <= fight_radius_sq && i < other_cat_i) {
+        const size_t pair = interactions->fight_pair_count++;
+        if (interactions->fight_pairs != NULL && pair < interactions->fight_pairs_capacity) {
+            interactions->fight_pairs[2 * pair] = (uint32_t) i;
+            interactions->fight_pairs[2 * pair + 1] = (uint32_t) other_cat_i;
+        }
+    }
+}
+
+/**
+ * Write the per-cat interactions of the cat `i`.
+ *
+ * @param interactions Interactions to write to.
+ * @param i Index of the cat.
+ * @param neighbor_count Number of other cats within `hiss_radius`.
+ * @param nearest_cat_i Index of the nearest other cat within `hiss_radius` or -1.
+ */
+static void interactions_write_cat(
+    DrunkCatsInteractions *interactions,
+    const size_t i,
+    const uint32_t neighbor_count,
+    const int64_t nearest_cat_i
+) {
+    if (interactions->neighbor_counts != NULL) interactions->neighbor_counts[i] = neighbor_count;
+    if (interactions->nearest_rivals != NULL) interactions->nearest_rivals[i] = nearest_cat_i;
+}
+
+/**
+ * Calculate cat states and interactions in a single pass over the neighbor lists.
+ *
+ * States are the same as the ones of `calculate_states_with_neighbor_list`:
+ * hiss rolls are counter-based, so rolling them before a fight is found does not change them.
+ *
+ * @param list Neighbor list valid for the given positions and covering `hiss_radius`.
+ * @param cat_count Number of cat positions given.
+ * @param positions Cat positions as plain flatten coordinates.
+ * @param fight_radius The radius at which cats always start fighting.
+ * @param hiss_radius The radius at which cats may start hissing.
+ * @param random_key Seed, tick and cat ids of hiss rolls.
+ * @param stats Stats to record stage timings to.
+ * @param states Array to write cat states to.
+ * @param interactions Interactions to write to, with a zero pair count.
+ */
+static void calculate_interactions_with_neighbor_list(
+    const NeighborList *list,
+    const size_t cat_count,
+    const double *positions,
+    const double fight_radius,
+    const double hiss_radius,
+    const RandomKey *random_key,
+    DrunkCatsStats *stats,
+    uint8_t *states,
+    DrunkCatsInteractions *interactions
+) {
+    const double fight_radius_sq = fight_radius * fight_radius;
+    const double hiss_radius_sq = hiss_radius * hiss_radius;
+
+    const double started_at = now_seconds();
+
+    for (size_t i = 0; i < cat_count; i++) {
+        uint8_t state = 0;
+        uint32_t neighbor_count = 0;
+        double nearest_dist_sq = 0.0;
+        int64_t nearest_cat_i = -1;
+
+        for (size_t k = list->offsets[i]; k < list->offsets[i + 1]; k++) {
+            const size_t other_cat_i = list->neighbors[k];
+            const double dx = positions[2 * i] - positions[2 * other_cat_i];
+            const double dy = positions[2 * i + 1] - positions[2 * other_cat_i + 1];
+            const double dist_sq = dx * dx + dy * dy;
+            if (dist_sq > hiss_radius_sq) continue;
+
+            neighbor_count++;
+            interactions_record_neighbor(
+                interactions, i, other_cat_i, dist_sq, fight_radius_sq,
+                &nearest_dist_sq, &nearest_cat_i
+            );
+            if (dist_sq <= fight_radius_sq) {
+                state = CAT_STATE_WANTS_TO_FIGHT;
+            } else if (state == 0 && rand_ud(random_key, i, other_cat_i) <= fight_radius_sq / dist_sq) {
+                state = CAT_STATE_HISSES;
+            }
+        }
+
+        states[i] = state;
+        interactions_write_cat(interactions, i, neighbor_count, nearest_cat_i);
+    }
+
+    stage_time_record(&stats->interaction_pass, started_at);
+}
+
+/**
+ * Calculate cat states and interactions in a single pass using the kd-tree search of neighbors.
+ *
+ * Used when cats are too crowded for neighbor lists, see `calculate_interactions_with_neighbor_list`.
+ *
+ * @param tree kd-tree of the given positions.
+ * @param cat_count Number of cat positions given.
+ * @param positions Cat positions as plain flatten coordinates.
+ * @param fight_radius The radius at which cats always start fighting.
+ * @param hiss_radius The radius at which cats may start hissing.
+ * @param random_key Seed, tick and cat ids of hiss rolls.
+ * @param stats Stats to record stage timings to.
+ * @param states Array to write cat states to.
+ * @param interactions Interactions to write to, with a zero pair count.
+ */
+static void calculate_interactions_with_kd_tree(
+    struct kdtree *tree,
+    const size_t cat_count,
+    const double *positions,
+    const double fight_radius,
+    const double hiss_radius,
+    const RandomKey *random_key,
+    DrunkCatsStats *stats,
+    uint8_t *states,
+    DrunkCatsInteractions *interactions
+) {
+    const double fight_radius_sq = fight_radius * fight_radius;
+
+    const double started_at = now_seconds();
+
+    for (size_t i = 0; i < cat_count; i++) {
+        uint8_t state = 0;
+        uint32_t neighbor_count = 0;
+        double nearest_dist_sq = 0.0;
+        int64_t nearest_cat_i = -1;
+
+        struct kdres *hiss_cats = kd_nearest_range(tree, positions + 2 * i, hiss_radius);
+        if (hiss_cats == NULL) exit(1);
+
+        for (; !kd_res_end(hiss_cats); kd_res_next(hiss_cats)) {
+            const size_t other_cat_i = (size_t) kd_res_item_data(hiss_cats);
+            if (i == other_cat_i) continue;
+            const double dx = positions[2 * i] - positions[2 * other_cat_i];
+            const double dy = positions[2 * i + 1] - positions[2 * other_cat_i + 1];
+            const double dist_sq = dx * dx + dy * dy;
+
+            neighbor_count++;
+            interactions_record_neighbor(
+                interactions, i, other_cat_i, dist_sq, fight_radius_sq,
+                &nearest_dist_sq, &nearest_cat_i
+            );
+            if (dist_sq <= fight_radius_sq) {
+                state = CAT_STATE_WANTS_TO_FIGHT;
+            } else if (state == 0 && rand_ud(random_key, i, other_cat_i) <= fight_radius_sq / dist_sq) {
+                state = CAT_STATE_HISSES;
+            }
+        }
+        kd_res_free(hiss_cats);
+
+        states[i] = state;
+        interactions_write_cat(interactions, i, neighbor_count, nearest_cat_i);
+    }
+
+    stage_time_record(&stats->interaction_pass, started_at);
+}
+
+int *drunk_cats_calculate_states(
+    const size_t cat_count,
+    const OpenGlPosition *cat_positions,
+    const unsigned int window_width,
+    const unsigned int window_height,
+    const float scale
+) {
+    return drunk_cats_world_calculate_states(
+        &drunk_cats_g_world,
+        cat_count, cat_positions,
+        window_width, window_height, scale
+    );
+}
+
+/**
+ * Calculate cat states in the world, reusing or rebuilding its neighbor lists.
+ *
+ * @param world World.
+ * @param cat_count Number of cat positions given.
+ * @param positions Cat positions as plain flatten coordinates.
+ * @param cat_ids Ids of cats to count hiss rolls by, or `NULL` to count them by indices.
+ * @param states Zero-initialized array to write cat states to.
+ * @param interactions Interactions to find in the same pass, or `NULL` to find states only.
+ */
+static void world_calculate_plain_states(
+    DrunkCatsWorld *world,
+    const size_t cat_count,
+    const double *positions,
+    const uint64_t *cat_ids,
+    uint8_t *states,
+    DrunkCatsInteractions *interactions
+) {
+    DrunkCatsStats *stats = &world->stats;
+    NeighborList *list = &world->neighbor_list;
+    const double started_at = now_seconds();
+
+    RandomKey random_key = world->random_key;
+    random_key.cat_ids = cat_ids;
+
+    if (interactions != NULL) interactions->fight_pair_count = 0;
+
+    int is_list_valid = neighbor_list_is_valid(list, cat_count, positions, world->hiss_radius);
+    if (is_list_valid) {
+        stats->neighbor_list_reuses++;
+    } else if (neighbor_list_build(list, cat_count, positions, world->hiss_radius)) {
+        stats->neighbor_list_builds++;
+        is_list_valid = 1;
+    }
+
+    if (is_list_valid) {
+        stage_time_record(&stats->neighbor_search, started_at);
+        if (interactions != NULL) {
+            calculate_interactions_with_neighbor_list(
+                list, cat_count, positions,
+                world->fight_radius, world->hiss_radius,
+                &random_key, stats, states, interactions
+            );
+        } else {
+            calculate_states_with_neighbor_list(
+                list, cat_count, positions,
+                world->fight_radius, world->hiss_radius,
+                &random_key, stats, states
+            );
+        }
+    } else {
+        stats->kd_tree_searches++;
+        struct kdtree *tree = kd_tree_build(cat_count, positions);
+        stage_time_record(&stats->neighbor_search, started_at);
+        if (interactions != NULL) {
+            calculate_interactions_with_kd_tree(
+                tree, cat_count, positions,
+                world->fight_radius, world->hiss_radius,
+                &random_key, stats, states, interactions
+            );
+        } else {
+            calculate_states_with_kd_tree(
+                tree, cat_count, positions,
+                world->fight_radius, world->hiss_radius,
+                &random_key, stats, states
+            );
+        }
+        kd_free(tree);
+    }
+
+    stats->calls++;
+    stats->neighbor_count = list->is_built ? list->offsets[cat_count] : 0;
+    world->random_key.tick++;
+}
+
+int *drunk_cats_world_calculate_states(
+    DrunkCatsWorld *world,
+    const size_t cat_count,
+    const OpenGlPosition *cat_positions,
+    const unsigned int window_width,
+    const unsigned int window_height,
+    const float scale
+) {
+    return drunk_cats_world_calculate_states_of_cats(
+        world,
+        cat_count, cat_positions, NULL,
+        window_width, window_height, scale
+    );
+}
 
+int *drunk_cats_world_calculate_states_of_cats(
+    DrunkCatsWorld *world,
+    const size_t cat_count,
+    const OpenGlPosition *cat_positions,
+    const uint64_t *cat_ids,
+    const unsigned int window_width,
+    const unsigned int window_height,
+    const float scale
+) {
+    const double call_started_at = now_seconds();
+
+    double *positions = convert_opengl_to_plain_coordinates(
+        cat_count, cat_positions,
+        window_width, window_height, scale
+    );
+    uint8_t *plain_states = calloc(cat_count, sizeof(uint8_t));
+    int *states = malloc(cat_count * sizeof(int));
+
+    stage_time_record(&world->stats.conversion, call_started_at);
+
+    world_calculate_plain_states(world, cat_count, positions, cat_ids, plain_states, NULL);
+
+    for (size_t i = 0; i < cat_count; i++) {
+        states[i] = plain_states[i];
+    }
+    free(plain_states);
+    free(positions);
+
+    stage_time_record(&world->stats.total, call_started_at);
+
+    return states;
+}
+
+void drunk_cats_calculate_states_f32(
+    const size_t cat_count,
+    const OpenGlPositionF32 *cat_positions,
+    const unsigned int window_width,
+    const unsigned int window_height,
+    const float scale,
+    uint8_t *states
+) {
+    drunk_cats_world_calculate_states_f32(
+        &drunk_cats_g_world,
+        cat_count, cat_positions,
+        window_width, window_height, scale,
+        states
+    );
+}
+
+void drunk_cats_world_calculate_states_f32(
+    DrunkCatsWorld *world,
+    const size_t cat_count,
+    const OpenGlPositionF32 *cat_positions,
+    const unsigned int window_width,
+    const unsigned int window_height,
+    const float scale,
+    uint8_t *states
+) {
+    const double call_started_at = now_seconds();
+
+    double *positions = convert_opengl_f32_to_plain_coordinates(
+        cat_count, cat_positions,
+        window_width, window_height, scale
+    );
+    memset(states, 0, cat_count * sizeof(uint8_t));
+
+    stage_time_record(&world->stats.conversion, call_started_at);
+
+    world_calculate_plain_states(world, cat_count, positions, NULL, states, NULL);
+
+    free(positions);
+
+    stage_time_record(&world->stats.total, call_started_at);
+}
+
+void drunk_cats_calculate_interactions(
+    const size_t cat_count,
+    const OpenGlPositionF32 *cat_positions,
+    const unsigned int window_width,
+    const unsigned int window_height,
+    const float scale,
+    uint8_t *states,
+    DrunkCatsInteractions *interactions
+) {
+    drunk_cats_world_calculate_interactions(
+        &drunk_cats_g_world,
+        cat_count, cat_positions,
+        window_width, window_height, scale,
+        states, interactions
+    );
+}
+
+void drunk_cats_world_calculate_interactions(
+    DrunkCatsWorld *world,
+    const size_t cat_count,
+    const OpenGlPositionF32 *cat_positions,
+    const unsigned int window_width,
+    const unsigned int window_height,
+    const float scale,
+    uint8_t *states,
+    DrunkCatsInteractions *interactions
+) {
+    const double call_started_at = now_seconds();
+
+    double *positions = convert_opengl_f32_to_plain_coordinates(
+        cat_count, cat_positions,
+        window_width, window_height, scale
+    );
+
+    stage_time_record(&world->stats.conversion, call_started_at);
+
+    world_calculate_plain_states(world, cat_count, positions, NULL, states, interactions);
+
+    free(positions);
+
+    stage_time_record(&world->stats.total, call_started_at);
+}
+
+int *drunk_cats_calculate_states_sweep(
+    const size_t cat_count,
+    const OpenGlPosition *cat_positions,
+    const unsigned int window_width,
+    const unsigned int window_height,
+    const float scale,
+    const size_t radii_count,
+    const DrunkCatsRadii *radii
+) {
+    double *positions = convert_opengl_to_plain_coordinates(
+        cat_count, cat_positions,
+        window_width, window_height, scale
+    );
+    uint8_t *plain_states = calloc(radii_count * cat_count, sizeof(uint8_t));
+    int *states = malloc(radii_count * cat_count * sizeof(int));
+    if ((plain_states == NULL || states == NULL) && radii_count * cat_count > 0) exit(1);
+
+    // Stage timings of the sweep are not reported
+    DrunkCatsStats stats = {0};
+    // All radius pairs share the hiss rolls of the next calculation in the default world
+    const RandomKey random_key = drunk_cats_g_world.random_key;
+
+    double max_hiss_radius = 0.0;
+    for (size_t k = 0; k < radii_count; k++) {
+        if (radii[k].hiss_radius > max_hiss_radius) max_hiss_radius = radii[k].hiss_radius;
+    }
+
+    // One neighbor search covering the largest radius is shared by all radius pairs
+    NeighborList list = {0};
+    if (neighbor_list_build(&list, cat_count, positions, max_hiss_radius)) {
+        for (size_t k = 0; k < radii_count; k++) {
+            calculate_states_with_neighbor_list(
+                &list, cat_count, positions,
+                radii[k].fight_radius, radii[k].hiss_radius,
+                &random_key, &stats, plain_states + k * cat_count
+            );
+        }
+    } else {
+        struct kdtree *tree = kd_tree_build(cat_count, positions);
+        for (size_t k = 0; k < radii_count; k++) {
+            calculate_states_with_kd_tree(
+                tree, cat_count, positions,
+                radii[k].fight_radius, radii[k].hiss_radius,
+                &random_key, &stats, plain_states + k * cat_count
+            );
+        }
+        kd_free(tree);
+    }
+    neighbor_list_free(&list);
+
+    for (size_t i = 0; i < radii_count * cat_count; i++) {
+        states[i] = plain_states[i];
+    }
+    free(plain_states);
     free(positions);
 
     return states;
@@ -98,3 +734,20 @@ int *drunk_cats_calculate_states(
 void drunk_cats_free_states(int *states) {
     free(states);
 }
+
+void drunk_cats_get_stats(DrunkCatsStats *stats) {
+    drunk_cats_world_get_stats(&drunk_cats_g_world, stats);
+}
+
+void drunk_cats_reset_stats(void) {
+    drunk_cats_world_reset_stats(&drunk_cats_g_world);
+}
+
+void drunk_cats_world_get_stats(const DrunkCatsWorld *world, DrunkCatsStats *stats) {
+    *stats = world->stats;
+}
+
+void drunk_cats_world_reset_stats(DrunkCatsWorld *world) {
+    const DrunkCatsStats empty_stats = {0};
+    world->stats = empty_stats;
+}
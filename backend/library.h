@@ -3,6 +3,7 @@
 
 
 #include <stddef.h>
+#include <stdint.h>
 
 
 /**
@@ -13,6 +14,86 @@ typedef struct OpenGlPosition {
     double y;
 } OpenGlPosition;
 
+/**
+ * Cat position in the OpenGL coordinate system with single precision.
+ */
+typedef struct OpenGlPositionF32 {
+    float x;
+    float y;
+} OpenGlPositionF32;
+
+/**
+ * Time spent in one stage of `drunk_cats_calculate_states`.
+ */
+typedef struct DrunkCatsStageTime {
+    /** Seconds spent during the last call. */
+    double last;
+    /** Seconds spent during all calls. */
+    double total;
+} DrunkCatsStageTime;
+
+/**
+ * Backend counters and stage timings accumulated since the last `drunk_cats_reset_stats` call.
+ */
+typedef struct DrunkCatsStats {
+    /** Number of `drunk_cats_calculate_states` calls. */
+    size_t calls;
+    /** Number of calls that had to rebuild the neighbor lists. */
+    size_t neighbor_list_builds;
+    /** Number of calls that reused the neighbor lists built earlier. */
+    size_t neighbor_list_reuses;
+    /** Number of calls where cats were too crowded for neighbor lists and the kd-tree search was used instead. */
+    size_t kd_tree_searches;
+    /** Total number of stored neighbors after the last call, zero if the kd-tree search was used. */
+    size_t neighbor_count;
+
+    /** Conversion of positions from the OpenGL coordinate system. */
+    DrunkCatsStageTime conversion;
+    /** Neighbor search: kd-tree or neighbor list build, or the neighbor list validity check. */
+    DrunkCatsStageTime neighbor_search;
+    /** Calculation of "wants to fight" states. */
+    DrunkCatsStageTime fight_pass;
+    /** Calculation of "hisses" states. */
+    DrunkCatsStageTime hiss_pass;
+    /** Single pass of `drunk_cats_calculate_interactions` finding states and interactions together. */
+    DrunkCatsStageTime interaction_pass;
+    /** Whole `drunk_cats_calculate_states` call. */
+    DrunkCatsStageTime total;
+} DrunkCatsStats;
+
+/**
+ * Pair of interaction radii **in the plain coordinate system**.
+ */
+typedef struct DrunkCatsRadii {
+    double fight_radius;
+    double hiss_radius;
+} DrunkCatsRadii;
+
+/**
+ * Interactions of cats found by `drunk_cats_calculate_interactions` in the same pass as their states.
+ *
+ * All arrays are owned by the caller, and any of them may be `NULL` to skip that output.
+ */
+typedef struct DrunkCatsInteractions {
+    /** Array of `cat_count` numbers of other cats within `hiss_radius` of every cat. */
+    uint32_t *neighbor_counts;
+    /** Array of `cat_count` indices of the nearest other cat within `hiss_radius`, or -1 if there is none. */
+    int64_t *nearest_rivals;
+    /** Array of `2 * fight_pairs_capacity` cat indices to write pairs `i < j` of cats within `fight_radius` to. */
+    uint32_t *fight_pairs;
+    /** Maximum number of pairs written to `fight_pairs`. */
+    size_t fight_pairs_capacity;
+    /** Set to the number of fighting pairs found, which may exceed `fight_pairs_capacity`. */
+    size_t fight_pair_count;
+} DrunkCatsInteractions;
+
+/**
+ * Independent simulation world with its own radii, neighbor lists and stats.
+ *
+ * Different worlds can be used from different threads at the same time.
+ */
+typedef struct DrunkCatsWorld DrunkCatsWorld;
+
 
 /**
  * Set global configuration.
@@ -27,6 +108,44 @@ void drunk_cats_configure(
     double hiss_radius
 );
 
+/**
+ * Set neighbor list configuration.
+ *
+ * Neighbors are searched within `hiss_radius + skin` and the found lists are reused between calls
+ * until any cat moves farther than `skin / 2` from its position at the time of the last rebuild.
+ * Zero skin rebuilds the lists whenever any cat moves.
+ *
+ * @param skin Margin beyond `hiss_radius` **in the plain coordinate system**, must be non-negative.
+ * @returns `0`, or `-1` if `skin` is negative: the configuration is kept then.
+ */
+int drunk_cats_configure_neighbor_list(double skin);
+
+/**
+ * Set the seed of hiss rolls and restart counting calculations from zero.
+ *
+ * Every hiss roll is a counter-based random number of the seed, the number of calculations
+ * done since the seed was set (tick), and the ids of both cats. So the same seed and the same
+ * sequence of calls give bit-identical states, no matter how neighbors are searched.
+ * Without this call the seed is zero.
+ *
+ * @param seed Seed of hiss rolls.
+ */
+void drunk_cats_configure_random(uint64_t seed);
+
+/**
+ * Get the number of calculations done since the seed of hiss rolls was set (tick).
+ *
+ * @returns Tick of the next calculation.
+ */
+uint64_t drunk_cats_get_random_tick(void);
+
+/**
+ * Set the tick of the next calculation, e.g. to continue a saved run with the same hiss rolls.
+ *
+ * @param tick Tick previously returned by `drunk_cats_get_random_tick`.
+ */
+void drunk_cats_set_random_tick(uint64_t tick);
+
 /**
  * Calculate cat states.
  *
@@ -56,6 +175,53 @@ int *drunk_cats_calculate_states(
     float scale
 );
 
+/**
+ * Calculate cat states from single precision positions into a caller-owned array.
+ *
+ * Same as `drunk_cats_calculate_states`, but nothing is allocated for the result,
+ * and every state takes a single byte.
+ *
+ * @param cat_count Number of cat positions given.
+ * @param cat_positions Array of cat positions in the OpenGL coordinate system.
+ * @param window_width Window width, must be positive.
+ * @param window_height Window height, must be positive.
+ * @param scale Window scale (e.g. 1.0 - no scale, 2.0 - two times scale), must be positive.
+ * @param states Array of `cat_count` bytes to write cat states to.
+ */
+void drunk_cats_calculate_states_f32(
+    size_t cat_count,
+    const OpenGlPositionF32 *cat_positions,
+    unsigned int window_width,
+    unsigned int window_height,
+    float scale,
+    uint8_t *states
+);
+
+/**
+ * Calculate cat states together with their interactions into caller-owned arrays.
+ *
+ * Same states as `drunk_cats_calculate_states_f32`, found in a single pass over the neighbors
+ * that also collects the requested interactions, so they cost little more than the states alone.
+ * Fighting pairs are ordered by the first cat.
+ *
+ * @param cat_count Number of cat positions given, at most `UINT32_MAX`.
+ * @param cat_positions Array of cat positions in the OpenGL coordinate system.
+ * @param window_width Window width, must be positive.
+ * @param window_height Window height, must be positive.
+ * @param scale Window scale (e.g. 1.0 - no scale, 2.0 - two times scale), must be positive.
+ * @param states Array of `cat_count` bytes to write cat states to.
+ * @param interactions Arrays to write interactions to, see `DrunkCatsInteractions`.
+ */
+void drunk_cats_calculate_interactions(
+    size_t cat_count,
+    const OpenGlPositionF32 *cat_positions,
+    unsigned int window_width,
+    unsigned int window_height,
+    float scale,
+    uint8_t *states,
+    DrunkCatsInteractions *interactions
+);
+
 /**
  * Free allocated memory for the given states.
  *
@@ -63,5 +229,167 @@ int *drunk_cats_calculate_states(
  */
 void drunk_cats_free_states(int *states);
 
+/**
+ * Get backend counters and stage timings.
+ *
+ * @param stats Pointer to the struct to write counters and timings to.
+ */
+void drunk_cats_get_stats(DrunkCatsStats *stats);
+
+/**
+ * Reset backend counters and stage timings.
+ */
+void drunk_cats_reset_stats(void);
+
+
+/**
+ * Create a world, the global API above works with its own default world.
+ *
+ * @param fight_radius The radius between any two cats at which they always start fighting.
+ * @param hiss_radius The radius between any two cats at which they may start hissing.
+ *
+ * @returns World, must be destroyed with `drunk_cats_world_destroy`.
+ */
+DrunkCatsWorld *drunk_cats_world_create(
+    double fight_radius,
+    double hiss_radius
+);
+
+/**
+ * Destroy the world and free all its memory.
+ *
+ * @param world World created by `drunk_cats_world_create`.
+ */
+void drunk_cats_world_destroy(DrunkCatsWorld *world);
+
+/**
+ * Set radii of the world, see `drunk_cats_configure`.
+ */
+void drunk_cats_world_configure(
+    DrunkCatsWorld *world,
+    double fight_radius,
+    double hiss_radius
+);
+
+/**
+ * Set neighbor list configuration of the world, see `drunk_cats_configure_neighbor_list`.
+ */
+int drunk_cats_world_configure_neighbor_list(DrunkCatsWorld *world, double skin);
+
+/**
+ * Set the seed of hiss rolls of the world, see `drunk_cats_configure_random`.
+ */
+void drunk_cats_world_configure_random(DrunkCatsWorld *world, uint64_t seed);
+
+/**
+ * Get the tick of the next calculation in the world, see `drunk_cats_get_random_tick`.
+ */
+uint64_t drunk_cats_world_get_random_tick(const DrunkCatsWorld *world);
+
+/**
+ * Set the tick of the next calculation in the world, see `drunk_cats_set_random_tick`.
+ */
+void drunk_cats_world_set_random_tick(DrunkCatsWorld *world, uint64_t tick);
+
+/**
+ * Calculate cat states in the world, see `drunk_cats_calculate_states`.
+ *
+ * @returns Cat states, must be freed with `drunk_cats_free_states`.
+ */
+int *drunk_cats_world_calculate_states(
+    DrunkCatsWorld *world,
+    size_t cat_count,
+    const OpenGlPosition *cat_positions,
+    unsigned int window_width,
+    unsigned int window_height,
+    float scale
+);
+
+/**
+ * Calculate states of a subset of cats in the world, see `drunk_cats_calculate_states`.
+ *
+ * Hiss rolls are counted by the given ids instead of the indices of cats, so a cat gets
+ * the same rolls in every subset it is calculated in, e.g. in overlapping tiles of a larger world.
+ *
+ * @param cat_ids Array of `cat_count` ids of the given cats, or `NULL` to use their indices.
+ *
+ * @returns Cat states, must be freed with `drunk_cats_free_states`.
+ */
+int *drunk_cats_world_calculate_states_of_cats(
+    DrunkCatsWorld *world,
+    size_t cat_count,
+    const OpenGlPosition *cat_positions,
+    const uint64_t *cat_ids,
+    unsigned int window_width,
+    unsigned int window_height,
+    float scale
+);
+
+/**
+ * Calculate cat states in the world into a caller-owned array, see `drunk_cats_calculate_states_f32`.
+ */
+void drunk_cats_world_calculate_states_f32(
+    DrunkCatsWorld *world,
+    size_t cat_count,
+    const OpenGlPositionF32 *cat_positions,
+    unsigned int window_width,
+    unsigned int window_height,
+    float scale,
+    uint8_t *states
+);
+
+/**
+ * Calculate cat states and their interactions in the world, see `drunk_cats_calculate_interactions`.
+ */
+void drunk_cats_world_calculate_interactions(
+    DrunkCatsWorld *world,
+    size_t cat_count,
+    const OpenGlPositionF32 *cat_positions,
+    unsigned int window_width,
+    unsigned int window_height,
+    float scale,
+    uint8_t *states,
+    DrunkCatsInteractions *interactions
+);
+
+/**
+ * Get counters and stage timings of the world, see `drunk_cats_get_stats`.
+ */
+void drunk_cats_world_get_stats(const DrunkCatsWorld *world, DrunkCatsStats *stats);
+
+/**
+ * Reset counters and stage timings of the world.
+ */
+void drunk_cats_world_reset_stats(DrunkCatsWorld *world);
+
+/**
+ * Calculate cat states for each of the given radius pairs over the same positions.
+ *
+ * Neighbors are searched once within the largest hiss radius,
+ * then every radius pair costs only a pass over the found neighbors.
+ * All radius pairs use the same hiss rolls: the ones of the next calculation in the default world.
+ * Neither the default world nor its stats are changed.
+ *
+ * @param cat_count Number of cat positions given.
+ * @param cat_positions Array of cat positions in the OpenGL coordinate system.
+ * @param window_width Window width, must be positive.
+ * @param window_height Window height, must be positive.
+ * @param scale Window scale (e.g. 1.0 - no scale, 2.0 - two times scale), must be positive.
+ * @param radii_count Number of radius pairs given.
+ * @param radii Array of radius pairs, every fight radius must be less than its hiss radius.
+ *
+ * @returns `radii_count` consecutive arrays of `cat_count` cat states (see `drunk_cats_calculate_states`),
+ *          must be freed with `drunk_cats_free_states`.
+ */
+int *drunk_cats_calculate_states_sweep(
+    size_t cat_count,
+    const OpenGlPosition *cat_positions,
+    unsigned int window_width,
+    unsigned int window_height,
+    float scale,
+    size_t radii_count,
+    const DrunkCatsRadii *radii
+);
+
 
 #endif // LIBRARY_H
@@ -0,0 +1,244 @@
+#include <math.h>
+#include <stddef.h>
+#include <stdlib.h>
+
+
+/**
+ * Maximum average number of neighbor candidates per cat for which neighbor lists are still worth building.
+ *
+ * In denser crowds almost every cat fights, and the lists would take much more memory and time
+ * than the direct kd-tree search.
+ */
+static const size_t NEIGHBOR_LIST_MAX_CANDIDATES_PER_CAT = 256;
+
+
+/**
+ * Verlet neighbor list.
+ *
+ * For every cat it stores the indices of all other cats that were not farther than `radius + skin`
+ * at the moment of the build (CSR layout: neighbors of the cat `i` are
+ * `neighbors[offsets[i]], ..., neighbors[offsets[i + 1] - 1]`).
+ *
+ * The list stays valid until any cat moves farther than `skin / 2` from its position at the build time.
+ */
+typedef struct NeighborList {
+    size_t cat_count;
+    double radius;
+    double skin;
+    double *reference_positions;
+    size_t *offsets;
+    size_t *neighbors;
+    size_t neighbors_capacity;
+    int is_built;
+
+    // Uniform grid used to build the list
+    size_t *cell_starts;
+    size_t *cell_cursors;
+    size_t cell_capacity;
+    size_t *cat_cells;
+    size_t *sorted_cats;
+} NeighborList;
+
+
+/**
+ * Mark the neighbor list as outdated, so it will be rebuilt before the next use.
+ *
+ * @param list Neighbor list.
+ */
+static void neighbor_list_invalidate(NeighborList *list) {
+    list->is_built = 0;
+}
+
+/**
+ * Check whether the neighbor list can be reused for the given positions.
+ *
+ * @param list Neighbor list.
+ * @param cat_count Number of cat positions given.
+ * @param positions Cat positions as plain flatten coordinates.
+ * @param radius Interaction radius the list must cover.
+ *
+ * @returns Non-zero if the list is still valid.
+ */
+static int neighbor_list_is_valid(
+    const NeighborList *list,
+    const size_t cat_count,
+    const double *positions,
+    const double radius
+) {
+    if (!list->is_built || list->cat_count != cat_count || list->radius != radius) return 0;
+
+    const double max_displacement = 0.5 * list->skin;
+    const double max_displacement_sq = max_displacement * max_displacement;
+
+    for (size_t i = 0; i < 2 * cat_count; i += 2) {
+        const double dx = positions[i] - list->reference_positions[i];
+        const double dy = positions[i + 1] - list->reference_positions[i + 1];
+        if (dx * dx + dy * dy > max_displacement_sq) return 0;
+    }
+
+    return 1;
+}
+
+/**
+ * Try to rebuild the neighbor list from scratch.
+ *
+ * Cats are sorted into a uniform grid with cells not smaller than `radius + skin`,
+ * so all neighbors of a cat are located in the 3x3 block of cells around it.
+ *
+ * @param list Neighbor list.
+ * @param cat_count Number of cat positions given.
+ * @param positions Cat positions as plain flatten coordinates.
+ * @param radius Interaction radius the list must cover.
+ *
+ * @returns Non-zero if the list was built, or zero if cats are too crowded for neighbor lists.
+ */
+static int neighbor_list_build(
+    NeighborList *list,
+    const size_t cat_count,
+    const double *positions,
+    const double radius
+) {
+    neighbor_list_invalidate(list);
+    if (cat_count == 0) return 0;
+
+    const double build_radius = radius + list->skin;
+    const double build_radius_sq = build_radius * build_radius;
+
+    // Calculate grid bounds
+
+    double min_x = positions[0], max_x = positions[0];
+    double min_y = positions[1], max_y = positions[1];
+    for (size_t i = 0; i < 2 * cat_count; i += 2) {
+        if (positions[i] < min_x) min_x = positions[i];
+        if (positions[i] > max_x) max_x = positions[i];
+        if (positions[i + 1] < min_y) min_y = positions[i + 1];
+        if (positions[i + 1] > max_y) max_y = positions[i + 1];
+    }
+
+    // Keep the number of cells proportional to the number of cats
+    const size_t max_cells_per_side = (size_t) sqrt((double) cat_count) + 1;
+    double cell_size = build_radius;
+    if ((max_x - min_x) / max_cells_per_side > cell_size) cell_size = (max_x - min_x) / max_cells_per_side;
+    if ((max_y - min_y) / max_cells_per_side > cell_size) cell_size = (max_y - min_y) / max_cells_per_side;
+    if (cell_size <= 0.0) cell_size = 1.0;
+
+    const size_t columns = (size_t) ((max_x - min_x) / cell_size) + 1;
+    const size_t rows = (size_t) ((max_y - min_y) / cell_size) + 1;
+    const size_t cell_count = columns * rows;
+
+    // Sort cats by cells
+
+    if (cell_count + 1 > list->cell_capacity) {
+        list->cell_capacity = cell_count + 1;
+        list->cell_starts = realloc(list->cell_starts, list->cell_capacity * sizeof(size_t));
+        list->cell_cursors = realloc(list->cell_cursors, list->cell_capacity * sizeof(size_t));
+    }
+    list->cat_cells = realloc(list->cat_cells, cat_count * sizeof(size_t));
+    list->sorted_cats = realloc(list->sorted_cats, cat_count * sizeof(size_t));
+    if (list->cell_starts == NULL || list->cell_cursors == NULL) exit(1);
+    if (list->cat_cells == NULL || list->sorted_cats == NULL) exit(1);
+
+    size_t *cell_starts = list->cell_starts;
+    for (size_t c = 0; c <= cell_count; c++) {
+        cell_starts[c] = 0;
+    }
+    for (size_t i = 0; i < cat_count; i++) {
+        const size_t column = (size_t) ((positions[2 * i] - min_x) / cell_size);
+        const size_t row = (size_t) ((positions[2 * i + 1] - min_y) / cell_size);
+        list->cat_cells[i] = (row < rows ? row : rows - 1) * columns + (column < columns ? column : columns - 1);
+        cell_starts[list->cat_cells[i] + 1]++;
+    }
+    for (size_t c = 0; c < cell_count; c++) {
+        cell_starts[c + 1] += cell_starts[c];
+    }
+
+    // Estimate the amount of work using cell occupancy only
+    size_t candidate_count = 0;
+    for (size_t c = 0; c < cell_count; c++) {
+        const size_t column = c % columns;
+        const size_t row = c / columns;
+        const size_t cats_in_cell = cell_starts[c + 1] - cell_starts[c];
+        if (cats_in_cell == 0) continue;
+
+        for (size_t r = row > 0 ? row - 1 : 0; r <= row + 1 && r < rows; r++) {
+            const size_t first = r * columns + (column > 0 ? column - 1 : 0);
+            const size_t last = r * columns + (column + 1 < columns ? column + 1 : column);
+            candidate_count += cats_in_cell * (cell_starts[last + 1] - cell_starts[first]);
+        }
+    }
+    if (candidate_count > NEIGHBOR_LIST_MAX_CANDIDATES_PER_CAT * cat_count) return 0;
+
+    for (size_t c = 0; c < cell_count; c++) {
+        list->cell_cursors[c] = cell_starts[c];
+    }
+    for (size_t i = 0; i < cat_count; i++) {
+        list->sorted_cats[list->cell_cursors[list->cat_cells[i]]++] = i;
+    }
+
+    list->offsets = realloc(list->offsets, (cat_count + 1) * sizeof(size_t));
+    if (list->offsets == NULL) exit(1);
+
+    // Collect neighbors from the 3x3 block of cells around every cat
+
+    size_t neighbor_count = 0;
+    for (size_t i = 0; i < cat_count; i++) {
+        list->offsets[i] = neighbor_count;
+
+        const size_t column = list->cat_cells[i] % columns;
+        const size_t row = list->cat_cells[i] / columns;
+
+        for (size_t r = row > 0 ? row - 1 : 0; r <= row + 1 && r < rows; r++) {
+            const size_t first = r * columns + (column > 0 ? column - 1 : 0);
+            const size_t last = r * columns + (column + 1 < columns ? column + 1 : column);
+
+            for (size_t k = cell_starts[first]; k < cell_starts[last + 1]; k++) {
+                const size_t other_cat_i = list->sorted_cats[k];
+                if (i == other_cat_i) continue;
+
+                const double dx = positions[2 * i] - positions[2 * other_cat_i];
+                const double dy = positions[2 * i + 1] - positions[2 * other_cat_i + 1];
+                if (dx * dx + dy * dy > build_radius_sq) continue;
+
+                if (neighbor_count == list->neighbors_capacity) {
+                    list->neighbors_capacity = list->neighbors_capacity == 0 ? cat_count : 2 * list->neighbors_capacity;
+                    list->neighbors = realloc(list->neighbors, list->neighbors_capacity * sizeof(size_t));
+                    if (list->neighbors == NULL) exit(1);
+                }
+                list->neighbors[neighbor_count++] = other_cat_i;
+            }
+        }
+    }
+    list->offsets[cat_count] = neighbor_count;
+
+    list->reference_positions = realloc(list->reference_positions, cat_count * 2 * sizeof(double));
+    if (list->reference_positions == NULL) exit(1);
+    for (size_t i = 0; i < 2 * cat_count; i++) {
+        list->reference_positions[i] = positions[i];
+    }
+
+    list->cat_count = cat_count;
+    list->radius = radius;
+    list->is_built = 1;
+
+    return 1;
+}
+
+/**
+ * Free memory owned by the neighbor list and reset it to the empty state.
+ *
+ * @param list Neighbor list.
+ */
+static void neighbor_list_free(NeighborList *list) {
+    free(list->reference_positions);
+    free(list->offsets);
+    free(list->neighbors);
+    free(list->cell_starts);
+    free(list->cell_cursors);
+    free(list->cat_cells);
+    free(list->sorted_cats);
+
+    const double skin = list->skin;
+    const NeighborList empty_list = {0};
+    *list = empty_list;
+    list->skin = skin;
+}
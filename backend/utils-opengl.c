@@ -38,3 +38,26 @@ static double *convert_opengl_to_plain_coordinates(
 
     return flat_cat_positions;
 }
+
+/**
+ * Convert single precision cat positions in the OpenGL coordinate system to the plain flatten coordinates.
+ *
+ * Same as `convert_opengl_to_plain_coordinates`.
+ */
+static double *convert_opengl_f32_to_plain_coordinates(
+    const size_t cat_count,
+    const OpenGlPositionF32 *cat_positions,
+    const unsigned int window_width,
+    const unsigned int window_height,
+    const float scale
+) {
+    double *flat_cat_positions = malloc(cat_count * 2 * sizeof(double));
+
+    for (size_t i = 0; i < cat_count; i++) {
+        const OpenGlPositionF32 cat_pos = cat_positions[i];
+        flat_cat_positions[2 * i] = cat_pos.x * 0.5 * window_width * scale;
+        flat_cat_positions[2 * i + 1] = cat_pos.y * 0.5 * window_height * scale;
+    }
+
+    return flat_cat_positions;
+}
@@ -1,16 +1,77 @@
-#include <stdlib.h>
+#include <stddef.h>
+#include <stdint.h>
 
 
 /**
- * Generate random unsigned double in the range of `[0.0, 1.0]`.
+ * Key of counter-based random numbers: every number depends only on the key and its counter,
+ * so results don't depend on the order or the thread the numbers are generated in.
+ */
+typedef struct RandomKey {
+    uint64_t seed;
+    uint64_t tick;
+    /** Ids of cats by their indices, or `NULL` if the indices are the ids. */
+    const uint64_t *cat_ids;
+} RandomKey;
+
+#ifndef TEST
+/**
+ * Philox4x32-10 block function (Salmon et al., "Parallel random numbers: as easy as 1, 2, 3").
+ *
+ * @param counter Counter to encrypt in place.
+ * @param key Key of the block.
+ */
+static void philox4x32_10(uint32_t counter[4], const uint64_t key) {
+    uint32_t k0 = (uint32_t) key;
+    uint32_t k1 = (uint32_t) (key >> 32);
+
+    for (int round = 0; round < 10; round++) {
+        const uint64_t p0 = (uint64_t) 0xD2511F53u * counter[0];
+        const uint64_t p1 = (uint64_t) 0xCD9E8D57u * counter[2];
+        const uint32_t c1 = counter[1];
+        const uint32_t c3 = counter[3];
+
+        counter[0] = (uint32_t) (p1 >> 32) ^ c1 ^ k0;
+        counter[1] = (uint32_t) p1;
+        counter[2] = (uint32_t) (p0 >> 32) ^ c3 ^ k1;
+        counter[3] = (uint32_t) p0;
+
+        k0 += 0x9E3779B9u;
+        k1 += 0xBB67AE85u;
+    }
+}
+#endif
+
+/**
+ * Generate random unsigned double in the range of `[0.0, 1.0)` for a pair of cats.
+ *
+ * The number is keyed by the seed and the tick and counted by the ids of both cats,
+ * so the roll of `cat_i` against `other_cat_i` is the same in every engine,
+ * and in every subset of cats calculated with their ids.
+ *
+ * @param key Seed, tick and cat ids of the roll.
+ * @param cat_i Index of the rolling cat.
+ * @param other_cat_i Index of the other cat.
  *
- * @returns By default: random double in `[0.0, 1.0]`,
+ * @returns By default: random double in `[0.0, 1.0)`,
  *          or if `TEST` defined: `0.0`.
  */
-static double rand_ud(void) {
+static double rand_ud(const RandomKey *key, const size_t cat_i, const size_t other_cat_i) {
 #ifndef TEST
-    return (double) rand() / (double) RAND_MAX;
+    const uint64_t cat_id = key->cat_ids != NULL ? key->cat_ids[cat_i] : cat_i;
+    const uint64_t other_cat_id = key->cat_ids != NULL ? key->cat_ids[other_cat_i] : other_cat_i;
+    uint32_t counter[4] = {
+        (uint32_t) cat_id,
+        (uint32_t) other_cat_id,
+        (uint32_t) key->tick,
+        (uint32_t) (key->tick >> 32),
+    };
+    philox4x32_10(counter, key->seed);
+    const uint64_t bits = ((uint64_t) counter[0] << 21) ^ (counter[1] >> 11);
+    return (double) bits * 0x1.0p-53;
 #else
+    (void) key;
+    (void) cat_i;
+    (void) other_cat_i;
     return 0.0;
 #endif
 }
@@ -0,0 +1,38 @@
+#include "library.h"
+
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <time.h>
+#endif
+
+
+/**
+ * Get current time of a monotonic clock.
+ *
+ * @returns Time in seconds since an arbitrary fixed point.
+ */
+static double now_seconds(void) {
+#ifdef _WIN32
+    LARGE_INTEGER frequency;
+    LARGE_INTEGER counter;
+    QueryPerformanceFrequency(&frequency);
+    QueryPerformanceCounter(&counter);
+    return (double) counter.QuadPart / (double) frequency.QuadPart;
+#else
+    struct timespec time;
+    clock_gettime(CLOCK_MONOTONIC, &time);
+    return (double) time.tv_sec + (double) time.tv_nsec * 1e-9;
+#endif
+}
+
+/**
+ * Record time spent in a stage during the current call.
+ *
+ * @param stage Stage timings to update.
+ * @param started_at Time when the stage started, see `now_seconds`.
+ */
+static void stage_time_record(DrunkCatsStageTime *stage, const double started_at) {
+    stage->last = now_seconds() - started_at;
+    stage->total += stage->last;
+}
@@ -12,11 +12,21 @@ class RenderingConstants:
     DEFAULT_R2: float = 0.1
 
 
+@dataclass
+class CatStates:
+    CALM: int = 0
+    HISSES: int = 1
+    WANTS_TO_FIGHT: int = 2
+
+
 @dataclass
 class UpdateIntervals:
     POSITION_UPDATE: int = 1  # milliseconds
     TARGET_UPDATE: int = 500  # milliseconds
     STATE_UPDATE: int = 500  # milliseconds
+    BACKGROUND_SLOWDOWN: float = (
+        4.0  # timers of a window in the background are this many times slower
+    )
 
 
 @dataclass
@@ -32,3 +42,11 @@ class OpenGLSettings:
     SAMPLES: int = 4
     DEPTH_BUFFER_SIZE: int = 24
     STENCIL_BUFFER_SIZE: int = 8
+
+
+@dataclass
+class ViewSettings:
+    SIZE: int = 240  # pixels, side of the follow view and of the minimap
+    FOLLOW_MAGNIFICATION: float = 4.0  # zoom relative to the main view
+    MINIMAP_EXTENT: float = 1.1  # half-size of the world area shown on the minimap
+    MINIMAP_POINT_RADIUS: float = 1.0
@@ -0,0 +1,124 @@
+import threading
+from typing import Optional
+
+import numpy as np
+
+from frontend.core.world import Rect
+
+# Calm, hisses and wants to fight, see `CatStates`
+STATE_COUNT = 3
+DEFAULT_RESOLUTION = 64
+# Share of the extent of the cats added on every side of fitted bounds,
+# so that wandering cats refit them only rarely
+BOUNDS_MARGIN = 0.5
+
+
+class StateGrid:
+    """Number of cats in every state on a coarse grid, with O(1) rectangle queries
+
+    Cats are binned into `resolution x resolution` cells over `bounds`,
+    cats outside of them fall into the nearest border cell. Without given bounds
+    they are fitted around the cats and refitted once any cat leaves them.
+    Every state has a summed-area table of its cell counts, so any rectangle costs
+    four lookups. Queries count whole cells, so rectangle edges are precise up to a cell.
+
+    `update` rebins only cats whose cell or state changed and swaps in new tables
+    together with their bounds in a single assignment. It is called from both the
+    state update thread and the UI thread, so updates hold a lock, while queries
+    read the swapped tables lock-free.
+    """
+
+    def __init__(
+        self, resolution: int = DEFAULT_RESOLUTION, bounds: Optional[Rect] = None
+    ):
+        self.resolution = resolution
+        self.fitted = bounds is None
+        self.bounds = bounds if bounds is not None else Rect(-1.0, -1.0, 1.0, 1.0)
+        self._lock = threading.Lock()
+        self._cell_count = resolution * resolution
+        # `state * cell_count + cell` of every cat at the last update
+        self._keys: Optional[np.ndarray] = None
+        self._counts = np.zeros(STATE_COUNT * self._cell_count, dtype=np.int64)
+        tables = np.zeros((STATE_COUNT, resolution + 1, resolution + 1), dtype=np.int64)
+        # Tables with the bounds they were binned over, read by queries
+        self._tables = (self.bounds, tables)
+        self.changed_cats = 0  # Cats rebinned by the last update
+
+    def update(self, positions: np.ndarray, states: np.ndarray):
+        """Rebin cats from their new positions and states and rebuild the tables"""
+        with self._lock:
+            if self.fitted and len(positions) > 0:
+                self._fit_bounds(positions)
+            keys = np.asarray(states, dtype=np.intp) * self._cell_count + self._cells(
+                positions, self.bounds
+            )
+            length = STATE_COUNT * self._cell_count
+            if self._keys is None or len(self._keys) != len(keys):
+                self._counts = np.bincount(keys, minlength=length)
+                self.changed_cats = len(keys)
+            else:
+                changed = keys != self._keys
+                self._counts -= np.bincount(self._keys[changed], minlength=length)
+                self._counts += np.bincount(keys[changed], minlength=length)
+                self.changed_cats = int(np.count_nonzero(changed))
+            self._keys = keys
+
+            tables = np.zeros_like(self._tables[1])
+            grid = self._counts.reshape(STATE_COUNT, self.resolution, self.resolution)
+            tables[:, 1:, 1:] = grid.cumsum(axis=1).cumsum(axis=2)
+            self._tables = (self.bounds, tables)
+
+    def _fit_bounds(self, positions: np.ndarray):
+        """Refit bounds around the cats if any of them left, all cats are rebinned then"""
+        low = positions.min(axis=0)
+        high = positions.max(axis=0)
+        bounds = self.bounds
+        if (
+            self._keys is not None
+            and low[0] >= bounds.min_x
+            and low[1] >= bounds.min_y
+            and high[0] <= bounds.max_x
+            and high[1] <= bounds.max_y
+        ):
+            return
+        margin = np.maximum(high - low, 1e-6) * BOUNDS_MARGIN
+        low, high = low - margin, high + margin
+        self.bounds = Rect(float(low[0]), float(low[1]), float(high[0]), float(high[1]))
+        self._keys = None
+
+    def totals(self) -> np.ndarray:
+        """Number of cats in every state"""
+        return self._tables[1][:, -1, -1].copy()
+
+    def counts(self, rect: Rect) -> np.ndarray:
+        """Number of cats in every state in the cells the rectangle touches"""
+        bounds, tables = self._tables
+        x0, x1 = self._cell_range(rect.min_x, rect.max_x, bounds.min_x, bounds.max_x)
+        y0, y1 = self._cell_range(rect.min_y, rect.max_y, bounds.min_y, bounds.max_y)
+        return (
+            tables[:, y1, x1]
+            - tables[:, y0, x1]
+            - tables[:, y1, x0]
+            + tables[:, y0, x0]
+        )
+
+    def counts_around(self, center: np.ndarray, radius: float) -> np.ndarray:
+        """Number of cats in every state in the cells of the circle's bounding square"""
+        x, y = center
+        return self.counts(Rect(x - radius, y - radius, x + radius, y + radius))
+
+    def _cells(self, positions: np.ndarray, bounds: Rect) -> np.ndarray:
+        columns = self._cell_indices(positions[:, 0], bounds.min_x, bounds.max_x)
+        rows = self._cell_indices(positions[:, 1], bounds.min_y, bounds.max_y)
+        return rows * self.resolution + columns
+
+    def _cell_indices(self, values: np.ndarray, low: float, high: float) -> np.ndarray:
+        cells = np.floor((values - low) * (self.resolution / (high - low)))
+        return np.clip(cells, 0, self.resolution - 1).astype(np.intp)
+
+    def _cell_range(
+        self, first: float, last: float, low: float, high: float
+    ) -> tuple[int, int]:
+        """Table indices of the first and past the last cell of the span"""
+        first_cell, last_cell = self._cell_indices(np.array([first, last]), low, high)
+        return int(first_cell), int(last_cell) + 1
@@ -0,0 +1,195 @@
+import importlib.machinery
+import importlib.util
+import os
+from functools import cache
+from pathlib import Path
+from types import ModuleType
+from typing import *
+
+from cffi import FFI
+
+BACKEND_DIR = Path(__file__).parent.parent.parent / "backend"
+
+# Out-of-line (API mode) extension built by `backend/build_ffi.py`
+EXTENSION_MODULE = "_drunk_cats_backend"
+
+# Set to "abi" to ignore the compiled extension, or to "api" to require it
+BACKEND_MODE_ENV = "DRUNK_CATS_BACKEND"
+
+
+class Backend(Protocol):
+    """Protocol defining the interface for the backend library"""
+
+    def drunk_cats_configure(self, fight_radius: float, hiss_radius: float): ...
+
+    def drunk_cats_configure_neighbor_list(self, skin: float) -> int: ...
+
+    def drunk_cats_configure_random(self, seed: int): ...
+
+    def drunk_cats_get_random_tick(self) -> int: ...
+
+    def drunk_cats_set_random_tick(self, tick: int): ...
+
+    def drunk_cats_calculate_states(
+        self,
+        cat_count: int,
+        cat_positions: Any,
+        window_width: int,
+        window_height: int,
+        scale: float,
+    ) -> Any: ...
+
+    def drunk_cats_calculate_states_f32(
+        self,
+        cat_count: int,
+        cat_positions: Any,
+        window_width: int,
+        window_height: int,
+        scale: float,
+        states: Any,
+    ): ...
+
+    def drunk_cats_calculate_interactions(
+        self,
+        cat_count: int,
+        cat_positions: Any,
+        window_width: int,
+        window_height: int,
+        scale: float,
+        states: Any,
+        interactions: Any,
+    ): ...
+
+    def drunk_cats_free_states(self, states: Any): ...
+
+    def drunk_cats_get_stats(self, stats: Any): ...
+
+    def drunk_cats_reset_stats(self): ...
+
+    def drunk_cats_world_create(
+        self, fight_radius: float, hiss_radius: float
+    ) -> Any: ...
+
+    def drunk_cats_world_destroy(self, world: Any): ...
+
+    def drunk_cats_world_configure(
+        self, world: Any, fight_radius: float, hiss_radius: float
+    ): ...
+
+    def drunk_cats_world_configure_neighbor_list(
+        self, world: Any, skin: float
+    ) -> int: ...
+
+    def drunk_cats_world_configure_random(self, world: Any, seed: int): ...
+
+    def drunk_cats_world_get_random_tick(self, world: Any) -> int: ...
+
+    def drunk_cats_world_set_random_tick(self, world: Any, tick: int): ...
+
+    def drunk_cats_world_calculate_states(
+        self,
+        world: Any,
+        cat_count: int,
+        cat_positions: Any,
+        window_width: int,
+        window_height: int,
+        scale: float,
+    ) -> Any: ...
+
+    def drunk_cats_world_calculate_states_of_cats(
+        self,
+        world: Any,
+        cat_count: int,
+        cat_positions: Any,
+        cat_ids: Any,
+        window_width: int,
+        window_height: int,
+        scale: float,
+    ) -> Any: ...
+
+    def drunk_cats_world_calculate_states_f32(
+        self,
+        world: Any,
+        cat_count: int,
+        cat_positions: Any,
+        window_width: int,
+        window_height: int,
+        scale: float,
+        states: Any,
+    ): ...
+
+    def drunk_cats_world_calculate_interactions(
+        self,
+        world: Any,
+        cat_count: int,
+        cat_positions: Any,
+        window_width: int,
+        window_height: int,
+        scale: float,
+        states: Any,
+        interactions: Any,
+    ): ...
+
+    def drunk_cats_world_get_stats(self, world: Any, stats: Any): ...
+
+    def drunk_cats_world_reset_stats(self, world: Any): ...
+
+    def drunk_cats_calculate_states_sweep(
+        self,
+        cat_count: int,
+        cat_positions: Any,
+        window_width: int,
+        window_height: int,
+        scale: float,
+        radii_count: int,
+        radii: Any,
+    ) -> Any: ...
+
+
+def read_declarations(header: Path = BACKEND_DIR / "library.h") -> str:
+    """Read C declarations of the backend without preprocessor directives"""
+    with open(header, mode="r") as f:
+        return "".join(line for line in f if not line.startswith("#"))
+
+
+@cache
+def load_compiled_backend() -> Optional[ModuleType]:
+    """Import the compiled API mode extension, or return `None` if it is not available"""
+    mode = os.environ.get(BACKEND_MODE_ENV, "")
+    if mode == "abi":
+        return None
+
+    for suffix in importlib.machinery.EXTENSION_SUFFIXES:
+        path = BACKEND_DIR / f"{EXTENSION_MODULE}{suffix}"
+        if not path.exists():
+            continue
+        spec = importlib.util.spec_from_file_location(EXTENSION_MODULE, path)
+        if spec is None or spec.loader is None:
+            continue
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    if mode == "api":
+        raise ImportError(f"{EXTENSION_MODULE} is not built, run `make build`")
+    return None
+
+
+def create_ffi() -> FFI:
+    """Create FFI using the compiled extension, or parse the header for the ABI mode"""
+    module = load_compiled_backend()
+    if module is not None:
+        return module.ffi
+
+    ffi = FFI()
+    ffi.cdef(read_declarations())
+    return ffi
+
+
+def load_backend_library(ffi: FFI) -> Backend:
+    """Load the compiled extension, or `libbackend.so` in the ABI mode"""
+    module = load_compiled_backend()
+    if module is not None:
+        return cast(Backend, module.lib)
+
+    return cast(Backend, ffi.dlopen(str(BACKEND_DIR / "libbackend.so")))
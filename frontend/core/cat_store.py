@@ -0,0 +1,90 @@
+from typing import Optional
+
+import numpy as np
+
+# Fixed dtypes of the store: views are passed to the backend and to the GPU as is
+POSITION_DTYPE = np.float32
+STATE_DTYPE = np.uint8
+
+
+class CatStore:
+    """Struct-of-arrays storage of all cats with preallocated capacity
+
+    Positions and movement deltas are `(capacity, 2)` float32 arrays, states are
+    a uint8 array. `positions`, `deltas` and `states` are views of the first
+    `count` rows, so they can be handed to `drunk_cats_calculate_states_f32`
+    and written to vertex buffers without any conversion.
+    Resizing within the capacity only moves the end of the views, growing
+    beyond it reallocates with a geometric margin.
+    """
+
+    GROWTH_FACTOR = 1.5
+
+    def __init__(self, count: int = 0, capacity: Optional[int] = None):
+        capacity = max(count, capacity if capacity is not None else count)
+        self._positions = np.zeros((capacity, 2), dtype=POSITION_DTYPE)
+        self._deltas = np.zeros((capacity, 2), dtype=POSITION_DTYPE)
+        self._states = np.zeros(capacity, dtype=STATE_DTYPE)
+        self.count = count
+
+    @property
+    def capacity(self) -> int:
+        return len(self._states)
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions[: self.count]
+
+    @property
+    def deltas(self) -> np.ndarray:
+        return self._deltas[: self.count]
+
+    @property
+    def states(self) -> np.ndarray:
+        return self._states[: self.count]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory allocated for all cats, including the unused capacity"""
+        return self._positions.nbytes + self._deltas.nbytes + self._states.nbytes
+
+    def resize(self, count: int):
+        """Change the number of cats, new cats are zeroed"""
+        if count > self.capacity:
+            self._reserve(max(count, int(self.capacity * self.GROWTH_FACTOR)))
+        if count > self.count:
+            self._positions[self.count : count] = 0
+            self._deltas[self.count : count] = 0
+            self._states[self.count : count] = 0
+        self.count = count
+
+    def reset(self, positions: np.ndarray):
+        """Replace all cats with calm ones at the given positions and without movement"""
+        self.resize(len(positions))
+        self.positions[:] = positions
+        self.deltas[:] = 0
+        self.states[:] = 0
+
+    def adopt(self, positions: np.ndarray, deltas: np.ndarray, states: np.ndarray):
+        """Use the given arrays as the storage without copying, e.g. memory-mapped ones"""
+        count = len(states)
+        if positions.shape != (count, 2) or deltas.shape != (count, 2):
+            raise ValueError(
+                f"Expected positions and deltas of shape ({count}, 2), "
+                f"got {positions.shape} and {deltas.shape}"
+            )
+        if (positions.dtype, deltas.dtype, states.dtype) != (
+            POSITION_DTYPE,
+            POSITION_DTYPE,
+            STATE_DTYPE,
+        ):
+            raise ValueError("Arrays must match the dtypes of the store")
+        self._positions, self._deltas, self._states = positions, deltas, states
+        self.count = count
+
+    def _reserve(self, capacity: int):
+        for name in ("_positions", "_deltas", "_states"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, *old.shape[1:]), dtype=old.dtype)
+            new[: self.count] = old[: self.count]
+            setattr(self, name, new)
@@ -0,0 +1,121 @@
+"""Checkpoints of the whole simulation in a single memory-mappable file
+
+The file starts with a header: magic `DCKP`, `u32` version and `u32` size of
+the JSON metadata that follows it. The metadata holds scalars (seed, ticks,
+view) and the dtype, shape and offset of every array. Raw arrays follow,
+each aligned to `ALIGNMENT` bytes, so they are mapped as is on restore.
+"""
+
+import json
+import os
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+MAGIC = b"DCKP"
+VERSION = 1
+ALIGNMENT = 64
+ARRAYS = ("positions", "deltas", "states")
+DEFAULT_PATH = Path("drunk-cats.ckpt")
+
+_HEADER = struct.Struct("<4sII")
+
+
+@dataclass
+class Checkpoint:
+    positions: np.ndarray  # float32 (N, 2)
+    deltas: np.ndarray  # float32 (N, 2)
+    states: np.ndarray  # uint8 (N,)
+    seed: int
+    # Tick of the next hiss roll calculation in the backend
+    random_tick: int
+    # Number of movement target updates and of state updates done
+    target_tick: int
+    state_tick: int
+    # JSON-compatible camera state: zoom, pan, followed cat, speed
+    view: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def num_cats(self) -> int:
+        return len(self.states)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_checkpoint(path: Path, checkpoint: Checkpoint):
+    """Write the checkpoint to a temporary file and replace `path` with it
+
+    A crash while saving never leaves a broken checkpoint, and processes that
+    have the previous file mapped keep reading it.
+    """
+    arrays = {name: np.ascontiguousarray(getattr(checkpoint, name)) for name in ARRAYS}
+    layout: dict[str, dict[str, Any]] = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _aligned(offset + array.nbytes)
+    metadata = json.dumps(
+        {
+            "seed": checkpoint.seed,
+            "random_tick": checkpoint.random_tick,
+            "target_tick": checkpoint.target_tick,
+            "state_tick": checkpoint.state_tick,
+            "view": checkpoint.view,
+            "arrays": layout,
+        }
+    ).encode()
+    # Array offsets are relative to the aligned end of the metadata
+    data_start = _aligned(_HEADER.size + len(metadata))
+
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, len(metadata)))
+        file.write(metadata)
+        for name, array in arrays.items():
+            file.seek(data_start + layout[name]["offset"])
+            file.write(array.data)
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path: Path) -> Checkpoint:
+    """Map the checkpoint copy-on-write: nothing is read upfront, and the file is never modified"""
+    buffer = np.memmap(path, dtype=np.uint8, mode="c")
+    if len(buffer) < _HEADER.size:
+        raise ValueError(f"Not a checkpoint: {path}")
+    magic, version, metadata_size = _HEADER.unpack(bytes(buffer[: _HEADER.size]))
+    if magic != MAGIC:
+        raise ValueError(f"Not a checkpoint: {path}")
+    if version != VERSION:
+        raise ValueError(f"Unsupported checkpoint version {version}: {path}")
+    metadata_end = _HEADER.size + metadata_size
+    metadata = json.loads(bytes(buffer[_HEADER.size : metadata_end]))
+    data_start = _aligned(metadata_end)
+
+    arrays = {}
+    for name in ARRAYS:
+        layout = metadata["arrays"][name]
+        dtype = np.dtype(layout["dtype"])
+        start = data_start + layout["offset"]
+        count = int(np.prod(layout["shape"]))
+        end = start + count * dtype.itemsize
+        if end > len(buffer):
+            raise ValueError(f"Truncated checkpoint: {path}")
+        arrays[name] = buffer[start:end].view(dtype).reshape(layout["shape"])
+
+    return Checkpoint(
+        **arrays,
+        seed=metadata["seed"],
+        random_tick=metadata["random_tick"],
+        target_tick=metadata["target_tick"],
+        state_tick=metadata["state_tick"],
+        view=metadata["view"],
+    )
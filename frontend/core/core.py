@@ -1,42 +1,101 @@
+from __future__ import annotations
+
 import argparse
+import asyncio
 import logging
 import sys
+from contextlib import contextmanager
 from pathlib import Path
 from typing import *
 
 import numpy as np
 from cffi import FFI
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QSurfaceFormat
-from PyQt6.QtWidgets import QApplication
 
-from frontend.ui.widgets.moving_points_canvas import (
-    MovingPointsCanvas,
-    create_surface_format,
+from frontend.constants import RenderingConstants, UpdateIntervals
+from frontend.core.backend import Backend, create_ffi, load_backend_library
+from frontend.core.checkpoint import DEFAULT_PATH as DEFAULT_CHECKPOINT_PATH
+from frontend.core.checkpoint import Checkpoint, load_checkpoint
+from frontend.core.history import MAX_CAPACITY as MAX_HISTORY_TICKS
+from frontend.core.interactions import (
+    FIGHT_PAIR_DTYPE,
+    MAX_FIGHT_PAIRS,
+    NEAREST_RIVAL_DTYPE,
+    NEIGHBOR_COUNT_DTYPE,
+    Interactions,
+)
+from frontend.core.metrics import metrics
+from frontend.core.population import SCENARIOS, load_population, generate_scenario
+from frontend.core.profiler import enable_profiling, disable_profiling, trace_span
+from frontend.core.state_diff import StateDiff
+from frontend.core.rng import (
+    STREAM_MOTION,
+    STREAM_POSITIONS,
+    counter_rng,
+    random_seed,
 )
-from frontend.ui.widgets.main_window import MainWindow
-from frontend.constants import RenderingConstants
+from frontend.core.world import Rect, StateScheduler, TiledWorld, VisibilityScheduler
+
+# GUI modules are imported lazily, so headless use of `Core` stays cheap
+if TYPE_CHECKING:
+    from PyQt6.QtWidgets import QApplication
+
+    from frontend.ui.widgets.moving_points_canvas import MovingPointsCanvas
+    from frontend.ui.widgets.main_window import MainWindow
 
 # Set up logger
 logging.basicConfig()
 logger = logging.getLogger()
 
+# Stages and counters of `DrunkCatsStats`
+BACKEND_STAGES = ("conversion", "neighbor_search", "fight_pass", "hiss_pass", "total")
+INTERACTION_STAGES = ("conversion", "neighbor_search", "interaction_pass", "total")
+BACKEND_COUNTERS = (
+    "calls",
+    "neighbor_list_builds",
+    "neighbor_list_reuses",
+    "kd_tree_searches",
+    "neighbor_count",
+)
 
-class Backend(Protocol):
-    """Protocol defining the interface for the backend library"""
 
-    def drunk_cats_configure(self, fight_radius: float, hiss_radius: float): ...
+def non_negative_float(value: str) -> float:
+    number = float(value)
+    if not number >= 0:
+        raise argparse.ArgumentTypeError(f"must not be negative, got {value}")
+    return number
 
-    def drunk_cats_calculate_states(
-        self,
-        cat_count: int,
-        cat_positions: Any,
-        window_width: int,
-        window_height: int,
-        scale: float,
-    ) -> Any: ...
 
-    def drunk_cats_free_states(self, states: Any): ...
+def positive_float(value: str) -> float:
+    number = float(value)
+    # Also rejects nan
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be positive, got {value}")
+    return number
+
+
+def seed_value(value: str) -> int:
+    number = int(value)
+    # The backend keeps seeds of hiss rolls in uint64_t
+    if not 0 <= number < 2**64:
+        raise argparse.ArgumentTypeError(f"must be in [0, 2**64), got {value}")
+    return number
+
+
+def history_ticks(value: str) -> int:
+    number = int(value)
+    if not 0 <= number <= MAX_HISTORY_TICKS:
+        raise argparse.ArgumentTypeError(
+            f"must be in [0, {MAX_HISTORY_TICKS}], got {value}"
+        )
+    return number
+
+
+def slowdown_factor(value: str) -> float:
+    number = float(value)
+    # Also rejects nan
+    if not number >= 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
 
 class ArgumentParser:
@@ -63,6 +122,25 @@ class ArgumentParser:
             default=RenderingConstants.DEFAULT_NUM_POINTS,
             help="set the number of points (cats) in the simulation",
         )
+        parser.add_argument(
+            "--population",
+            type=Path,
+            default=None,
+            metavar="PATH",
+            help="memory-map initial positions of cats from a .npy file or a raw .f32/.f64 file",
+        )
+        parser.add_argument(
+            "--population-dtype",
+            choices=["float32", "float64"],
+            default=None,
+            help="read the population file as raw positions of the given type",
+        )
+        parser.add_argument(
+            "--scenario",
+            choices=list(SCENARIOS),
+            default="uniform",
+            help="set the generator of initial positions of cats",
+        )
         parser.add_argument(
             "--fight-radius",
             type=int,
@@ -75,6 +153,112 @@ class ArgumentParser:
             default=30,
             help="set the radius of the hissing zone for cats, must be larger than fight-radius",
         )
+        parser.add_argument(
+            "--neighbor-skin",
+            type=non_negative_float,
+            default=15.0,
+            help="set the margin beyond hiss-radius for reusing neighbor lists between state updates",
+        )
+        parser.add_argument(
+            "--world-size",
+            type=int,
+            default=None,
+            metavar="UNITS",
+            help="use fixed world units instead of window pixels: the visible area at zoom 1 is UNITS wide and high",
+        )
+        # Both choose which cats get new states, so only one of them may be given
+        scheduling = parser.add_mutually_exclusive_group()
+        scheduling.add_argument(
+            "--tile-size",
+            type=float,
+            default=None,
+            metavar="UNITS",
+            help="split the world into square tiles of UNITS and calculate their states independently",
+        )
+        parser.add_argument(
+            "--far-tile-interval",
+            type=int,
+            default=4,
+            metavar="TICKS",
+            help="update states of tiles outside the view only once per TICKS state updates",
+        )
+        scheduling.add_argument(
+            "--offscreen-budget",
+            type=int,
+            default=None,
+            metavar="CATS",
+            help="update visible cats on every state update and refresh about CATS off-screen cats round-robin",
+        )
+        parser.add_argument(
+            "--target-staleness",
+            type=positive_float,
+            default=None,
+            metavar="MS",
+            help="tune the state update interval, so that shown states are at most MS milliseconds old",
+        )
+        parser.add_argument(
+            "--target-fps",
+            type=positive_float,
+            default=None,
+            metavar="FPS",
+            help="lower the rendering quality step by step while the frame rate is below FPS",
+        )
+        parser.add_argument(
+            "--history-ticks",
+            type=history_ticks,
+            default=120,
+            metavar="TICKS",
+            help="keep states of all cats for the last TICKS state updates, 2 bits per state",
+        )
+        parser.add_argument(
+            "--seed",
+            type=seed_value,
+            default=None,
+            help="seed initial positions, movement and hiss rolls, so that runs are reproducible",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            type=Path,
+            default=DEFAULT_CHECKPOINT_PATH,
+            metavar="PATH",
+            help="file the S key saves the simulation to and the L key restores it from",
+        )
+        parser.add_argument(
+            "--restore",
+            type=Path,
+            default=None,
+            metavar="PATH",
+            help="start from a checkpoint saved with the S key",
+        )
+        parser.add_argument(
+            "--serve",
+            default=None,
+            metavar="ADDRESS",
+            help="run the simulation without a window and stream it to viewers on unix:PATH or [HOST:]PORT",
+        )
+        parser.add_argument(
+            "--connect",
+            default=None,
+            metavar="ADDRESS",
+            help="view the simulation streamed by a --serve instance instead of running one",
+        )
+        parser.add_argument(
+            "--stream-fps",
+            type=positive_float,
+            default=30.0,
+            metavar="FPS",
+            help="frames streamed per second by --serve",
+        )
+        parser.add_argument(
+            "--stream-quantize",
+            action=argparse.BooleanOptionalAction,
+            help="stream positions as 16-bit integers within the bounds of the frame",
+        )
+        parser.add_argument(
+            "--stream-delta",
+            action=argparse.BooleanOptionalAction,
+            help="stream only the states changed since the previous frame sent to the viewer",
+        )
         parser.add_argument(
             "--window-width",
             type=int,
@@ -87,6 +271,52 @@ class ArgumentParser:
             default=800,
             help="set the height of the application window",
         )
+        parser.add_argument(
+            "--show-stats",
+            action=argparse.BooleanOptionalAction,
+            help="show per-stage timings in the status bar and counts of cats by state",
+        )
+        parser.add_argument(
+            "--fight-lines",
+            action=argparse.BooleanOptionalAction,
+            help="draw lines between fighting cats, all cats are updated on every tick while shown",
+        )
+        parser.add_argument(
+            "--gpu-motion",
+            action=argparse.BooleanOptionalAction,
+            help="move cats in the vertex shader between changes of their movement, positions are uploaded only then",
+        )
+        parser.add_argument(
+            "--background-slowdown",
+            type=slowdown_factor,
+            default=UpdateIntervals.BACKGROUND_SLOWDOWN,
+            metavar="FACTOR",
+            help="run timers FACTOR times slower while the window is inactive or hidden, nothing is drawn while hidden",
+        )
+        parser.add_argument(
+            "--follow-view",
+            action=argparse.BooleanOptionalAction,
+            help="show a close-up of the followed cat or of the cursor next to the main view",
+        )
+        parser.add_argument(
+            "--minimap",
+            action=argparse.BooleanOptionalAction,
+            help="show the whole world with the outline of the main view, a click moves the view",
+        )
+        parser.add_argument(
+            "--profile",
+            type=Path,
+            default=None,
+            metavar="PATH",
+            help="record a timeline of the app to PATH in the Chrome trace-event format",
+        )
+        parser.add_argument(
+            "--profile-sampling-interval",
+            type=float,
+            default=None,
+            metavar="MS",
+            help="also sample Python stacks of all threads every MS milliseconds while profiling",
+        )
         parser.add_argument(
             "--debug",
             action=argparse.BooleanOptionalAction,
@@ -98,56 +328,158 @@ class ArgumentParser:
 class Core:
     """Main application core handling backend integration and UI coordination"""
 
-    def __init__(self):
+    def __init__(self, argv: Optional[Sequence[str]] = None):
         self.ffi = self._initialize_ffi()
         self.lib = self._load_backend_library()
         self.parser = ArgumentParser.create_parser()
-        self.args = self.parser.parse_args()
+        self.args = self.parser.parse_args(argv)
         self.global_scale = 1.0
+        self.checkpoint = self._load_checkpoint()
+        self.seed = self._initial_seed()
+        self.population = self._load_population()
+        self.world = self._create_world()
+        # Backend worlds of the regions of `world`, each keeps its own neighbor list
+        self._region_worlds: dict[int, Any] = {}
 
         self._configure_logging()
+        self._configure_profiling()
         self._configure_backend()
 
     def _initialize_ffi(self) -> FFI:
-        ffi = FFI()
-        backend_dir = Path(__file__).parent.parent.parent / "backend"
-
-        with open(backend_dir / "library.h", mode="r") as f:
-            declarations = "".join(line for line in f if not line.startswith("#"))
-            ffi.cdef(declarations)
-        return ffi
+        return create_ffi()
 
     def _load_backend_library(self) -> Backend:
-        backend_path = Path(__file__).parent.parent.parent / "backend" / "libbackend.so"
-        return cast(Backend, self.ffi.dlopen(str(backend_path)))
+        return load_backend_library(self.ffi)
+
+    def _load_population(self) -> Optional[np.ndarray]:
+        if self.args.population is None:
+            return None
+        return load_population(self.args.population, self.args.population_dtype)
+
+    def _load_checkpoint(self) -> Optional[Checkpoint]:
+        if self.args.restore is None:
+            return None
+        return load_checkpoint(self.args.restore)
+
+    def _initial_seed(self) -> int:
+        if self.checkpoint is not None:
+            return self.checkpoint.seed
+        return self.args.seed if self.args.seed is not None else random_seed()
+
+    def _create_world(self) -> Optional[StateScheduler]:
+        if self.args.offscreen_budget is not None:
+            return VisibilityScheduler(
+                self.args.hiss_radius, self.args.offscreen_budget
+            )
+        if self.args.tile_size is None:
+            return None
+        return TiledWorld(
+            self.args.tile_size, self.args.hiss_radius, self.args.far_tile_interval
+        )
 
     def _configure_logging(self):
         if self.args.debug:
             logger.setLevel(logging.DEBUG)
 
+    def _configure_profiling(self):
+        if self.args.profile is not None:
+            interval = self.args.profile_sampling_interval
+            enable_profiling(
+                self.args.profile, interval / 1000 if interval is not None else None
+            )
+
     def _configure_backend(self):
         self.lib.drunk_cats_configure(self.args.fight_radius, self.args.hiss_radius)
+        self.lib.drunk_cats_configure_neighbor_list(self.args.neighbor_skin)
+        self.lib.drunk_cats_configure_random(self.seed)
+        if self.checkpoint is not None:
+            self.lib.drunk_cats_set_random_tick(self.checkpoint.random_tick)
 
     def main(self):
+        if self.args.serve is not None:
+            self.serve()
+            return
+
+        from PyQt6.QtWidgets import QApplication
+
         self._configure_qt()
         app = QApplication(sys.argv)
+        app.aboutToQuit.connect(disable_profiling)
         window = self._create_main_window()
         self.global_scale = app.devicePixelRatio()
         self.start_ui(app, window)
 
     @staticmethod
     def _configure_qt():
+        from PyQt6.QtCore import Qt
+        from PyQt6.QtGui import QSurfaceFormat
+        from PyQt6.QtWidgets import QApplication
+
+        from frontend.ui.widgets.moving_points_canvas import create_surface_format
+
         QSurfaceFormat.setDefaultFormat(create_surface_format())
         QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts, True)
         QApplication.setAttribute(Qt.ApplicationAttribute.AA_UseDesktopOpenGL)
 
+    def serve(self):
+        """Stream a headless simulation to viewers until interrupted"""
+        from frontend.core.frame_server import FrameServer
+        from frontend.core.simulation import Simulation
+
+        num_points = (
+            len(self.population)
+            if self.population is not None
+            else self.args.num_points
+        )
+        simulation = Simulation(
+            self,
+            num_points,
+            width=self.args.window_width,
+            height=self.args.window_height,
+        )
+        server = FrameServer(
+            simulation,
+            self.args.stream_fps,
+            quantize=bool(self.args.stream_quantize),
+            delta=bool(self.args.stream_delta),
+        )
+        logger.setLevel(min(logger.level, logging.INFO))
+        try:
+            asyncio.run(server.serve(self.args.serve))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            disable_profiling()
+
     def _create_main_window(self) -> MainWindow:
+        from frontend.ui.widgets.main_window import MainWindow
+
         return MainWindow(
             point_radius=self.args.radius,
-            num_points=self.args.num_points,
-            use_texture=self.args.use_texture is not None,
+            num_points=(
+                len(self.population)
+                if self.population is not None
+                else self.args.num_points
+            ),
+            use_texture=bool(self.args.use_texture),
             width=self.args.window_width,
             height=self.args.window_height,
+            show_stats=bool(self.args.show_stats),
+            target_staleness=(
+                self.args.target_staleness / 1000
+                if self.args.target_staleness is not None
+                else None
+            ),
+            target_fps=self.args.target_fps,
+            history_ticks=self.args.history_ticks,
+            connect_address=self.args.connect,
+            checkpoint_path=self.args.checkpoint,
+            checkpoint=self.checkpoint,
+            show_follow_view=bool(self.args.follow_view),
+            show_minimap=bool(self.args.minimap),
+            fight_lines=bool(self.args.fight_lines),
+            gpu_motion=bool(self.args.gpu_motion),
+            background_slowdown=self.args.background_slowdown,
             core=self,
         )
 
@@ -162,30 +494,358 @@ class Core:
         window.update_speed(speed)
 
     def update_states(
-        self, num_points: int, points: np.ndarray, width: int, height: int
+        self,
+        num_points: int,
+        points: np.ndarray,
+        width: int,
+        height: int,
+        states: Optional[np.ndarray] = None,
+        visible_rect: Optional[Rect] = None,
+        tick: int = 0,
+    ) -> np.ndarray:
+        """Calculate states of all cats, or only of the cats scheduled by `world`
+
+        Scheduling needs current `states` of all cats and the `visible_rect` in the OpenGL coordinate system.
+        """
+        if self.world is not None and states is not None and visible_rect is not None:
+            result = self._update_scheduled_states(
+                points, states, width, height, visible_rect, tick
+            )
+        else:
+            result = self._calculate_states(
+                num_points, points, *self.plain_size(width, height)
+            )
+        self._log_debug_backend_stats()
+
+        return result
+
+    def plain_size(self, width: int, height: int) -> tuple[int, int, float]:
+        """Size and scale used to convert the OpenGL coordinates to the plain ones"""
+        if self.args.world_size is not None:
+            return self.args.world_size, self.args.world_size, 1.0
+        return width, height, self.global_scale
+
+    def _update_scheduled_states(
+        self,
+        points: np.ndarray,
+        states: np.ndarray,
+        width: int,
+        height: int,
+        visible_rect: Rect,
+        tick: int,
+    ) -> np.ndarray:
+        assert self.world is not None
+        plain_width, plain_height, scale = self.plain_size(width, height)
+        scale_x, scale_y = 0.5 * plain_width * scale, 0.5 * plain_height * scale
+
+        # Every region of the pass rolls with the same tick, like a single call
+        # over all cats in the default world, which then advances it once
+        random_tick = self.random_tick()
+
+        def calculate(positions: np.ndarray, cat_ids: np.ndarray, region: int):
+            return self._calculate_region_states(
+                positions, cat_ids, region, random_tick
+            )
+
+        with metrics.measure("core.scheduled_update"):
+            plain_points = np.asarray(points, dtype=np.float64) * (scale_x, scale_y)
+            result = self.world.update_states(
+                calculate,
+                plain_points,
+                states,
+                visible_rect.scaled(scale_x, scale_y),
+                tick,
+            )
+        self.lib.drunk_cats_set_random_tick(random_tick + 1)
+        for counter, value in self.world.counters().items():
+            metrics.set_counter(f"world.{counter}", value)
+        self._record_region_counters()
+        return result
+
+    def _calculate_region_states(
+        self, positions: np.ndarray, cat_ids: np.ndarray, region: int, tick: int
+    ) -> np.ndarray:
+        """Calculate states of a region of the world in its own backend world
+
+        A single neighbor list would be rebuilt for every region and invalidated
+        by the next one, a list per region is reused between ticks instead.
+        Hiss rolls are counted by the indices of cats in the whole world at the given tick,
+        so every cat gets the same rolls as in a single call over all cats.
+        """
+        world = self._region_world(region)
+        self.lib.drunk_cats_world_set_random_tick(world, tick)
+        positions = np.ascontiguousarray(positions, dtype=np.float64)
+        cat_ids = np.ascontiguousarray(cat_ids, dtype=np.uint64)
+        points_ptr = self.ffi.cast("OpenGlPosition *", self.ffi.from_buffer(positions))
+        ids_ptr = self.ffi.cast("uint64_t *", self.ffi.from_buffer(cat_ids))
+        # Plain positions are passed as is: a 2x2 window without scale keeps them intact
+        with self._backend_call(
+            "drunk_cats_world_calculate_states_of_cats", world=world
+        ):
+            result_ptr = self.lib.drunk_cats_world_calculate_states_of_cats(
+                world, len(positions), points_ptr, ids_ptr, 2, 2, 1.0
+            )
+
+        with metrics.measure("core.result_copy"):
+            result = self._process_state_results(result_ptr, len(positions))
+            self.lib.drunk_cats_free_states(result_ptr)
+        return result
+
+    def _region_world(self, region: int) -> Any:
+        world = self._region_worlds.get(region)
+        if world is None:
+            world = self.ffi.gc(
+                self.lib.drunk_cats_world_create(
+                    self.args.fight_radius, self.args.hiss_radius
+                ),
+                self.lib.drunk_cats_world_destroy,
+            )
+            self.lib.drunk_cats_world_configure_neighbor_list(
+                world, self.args.neighbor_skin
+            )
+            self.lib.drunk_cats_world_configure_random(world, self.seed)
+            self._region_worlds[region] = world
+        return world
+
+    def _calculate_states(
+        self, num_points: int, points: np.ndarray, width: int, height: int, scale: float
     ) -> np.ndarray:
+        """Calculate states, single precision positions give single byte states"""
+        if points.dtype == np.float32:
+            return self._calculate_states_f32(num_points, points, width, height, scale)
+
+        points = np.ascontiguousarray(points, dtype=np.float64)
         points_ptr = self.ffi.cast("OpenGlPosition *", self.ffi.from_buffer(points))
-        result_ptr = self.lib.drunk_cats_calculate_states(
-            num_points, points_ptr, width, height, self.global_scale
+        with self._backend_call("drunk_cats_calculate_states"):
+            result_ptr = self.lib.drunk_cats_calculate_states(
+                num_points, points_ptr, width, height, scale
+            )
+
+        with metrics.measure("core.result_copy"):
+            result = self._process_state_results(result_ptr, num_points)
+            self.lib.drunk_cats_free_states(result_ptr)
+        return result
+
+    def _calculate_states_f32(
+        self, num_points: int, points: np.ndarray, width: int, height: int, scale: float
+    ) -> np.ndarray:
+        points = np.ascontiguousarray(points)
+        states = np.empty(num_points, dtype=np.uint8)
+        points_ptr = self.ffi.cast("OpenGlPositionF32 *", self.ffi.from_buffer(points))
+        states_ptr = self.ffi.cast("uint8_t *", self.ffi.from_buffer(states))
+        with self._backend_call("drunk_cats_calculate_states_f32"):
+            self.lib.drunk_cats_calculate_states_f32(
+                num_points, points_ptr, width, height, scale, states_ptr
+            )
+        return states
+
+    def calculate_interactions(
+        self,
+        points: np.ndarray,
+        width: int,
+        height: int,
+        neighbor_counts: bool = True,
+        nearest_rivals: bool = True,
+        max_fight_pairs: int = MAX_FIGHT_PAIRS,
+    ) -> Interactions:
+        """Calculate states of all cats and the requested interactions in one backend pass
+
+        Outputs that are not requested are not collected, zero `max_fight_pairs`
+        skips the fighting pairs. Scheduling by `world` is not applied.
+        """
+        points = np.ascontiguousarray(points, dtype=np.float32)
+        num_points = len(points)
+        states = np.empty(num_points, dtype=np.uint8)
+        counts = (
+            np.empty(num_points, dtype=NEIGHBOR_COUNT_DTYPE)
+            if neighbor_counts
+            else None
+        )
+        rivals = (
+            np.empty(num_points, dtype=NEAREST_RIVAL_DTYPE) if nearest_rivals else None
+        )
+        pairs = (
+            np.empty((max_fight_pairs, 2), dtype=FIGHT_PAIR_DTYPE)
+            if max_fight_pairs > 0
+            else None
         )
 
-        result = self._process_state_results(result_ptr, num_points)
-        self.lib.drunk_cats_free_states(result_ptr)
-        self._log_debug_states(result)
+        interactions = self.ffi.new("DrunkCatsInteractions *")
+        if counts is not None:
+            interactions.neighbor_counts = self.ffi.from_buffer("uint32_t[]", counts)
+        if rivals is not None:
+            interactions.nearest_rivals = self.ffi.from_buffer("int64_t[]", rivals)
+        if pairs is not None:
+            interactions.fight_pairs = self.ffi.from_buffer("uint32_t[]", pairs)
+            interactions.fight_pairs_capacity = max_fight_pairs
+        points_ptr = self.ffi.cast("OpenGlPositionF32 *", self.ffi.from_buffer(points))
+        states_ptr = self.ffi.cast("uint8_t *", self.ffi.from_buffer(states))
+        with self._backend_call(
+            "drunk_cats_calculate_interactions", INTERACTION_STAGES
+        ):
+            self.lib.drunk_cats_calculate_interactions(
+                num_points,
+                points_ptr,
+                *self.plain_size(width, height),
+                states_ptr,
+                interactions,
+            )
+        self._log_debug_backend_stats()
+
+        fight_pair_count = int(interactions.fight_pair_count)
+        return Interactions(
+            states=states,
+            neighbor_counts=counts,
+            nearest_rivals=rivals,
+            fight_pairs=(
+                pairs[: min(fight_pair_count, max_fight_pairs)].copy()
+                if pairs is not None
+                else None
+            ),
+            fight_pair_count=fight_pair_count,
+        )
 
-        return result
+    def calculate_states_sweep(
+        self,
+        points: np.ndarray,
+        radii: Sequence[tuple[float, float]],
+        width: int,
+        height: int,
+    ) -> np.ndarray:
+        """Calculate states for every `(fight_radius, hiss_radius)` pair in one backend call
+
+        Returns an array of shape `(len(radii), len(points))`.
+        """
+        points = np.ascontiguousarray(points, dtype=np.float64)
+        points_ptr = self.ffi.cast("OpenGlPosition *", self.ffi.from_buffer(points))
+        radii_ptr = self.ffi.new("DrunkCatsRadii[]", [tuple(r) for r in radii])
+        with trace_span("backend.drunk_cats_calculate_states_sweep", "backend"):
+            result_ptr = self.lib.drunk_cats_calculate_states_sweep(
+                len(points),
+                points_ptr,
+                *self.plain_size(width, height),
+                len(radii),
+                radii_ptr,
+            )
+
+        result = self._process_state_results(result_ptr, len(radii) * len(points))
+        self.lib.drunk_cats_free_states(result_ptr)
+        return result.reshape(len(radii), len(points))
+
+    def get_backend_stats(self) -> dict[str, float]:
+        """Get backend counters, including neighbor list rebuild and reuse rates."""
+        stats = self._read_backend_stats()
+        calls = int(stats.calls)
+        return {
+            "calls": calls,
+            "neighbor_list_builds": int(stats.neighbor_list_builds),
+            "neighbor_list_reuses": int(stats.neighbor_list_reuses),
+            "kd_tree_searches": int(stats.kd_tree_searches),
+            "neighbor_list_hit_rate": (
+                int(stats.neighbor_list_reuses) / calls if calls > 0 else 0.0
+            ),
+            "neighbor_count": int(stats.neighbor_count),
+        }
+
+    def _read_backend_stats(self, world: Any = None) -> Any:
+        stats = self.ffi.new("DrunkCatsStats *")
+        if world is None:
+            self.lib.drunk_cats_get_stats(stats)
+        else:
+            self.lib.drunk_cats_world_get_stats(world, stats)
+        return stats
+
+    @contextmanager
+    def _backend_call(
+        self,
+        function: str,
+        stages: Sequence[str] = BACKEND_STAGES,
+        world: Any = None,
+    ) -> Iterator[None]:
+        """Trace a backend call, its stage timings are recorded even if the call fails"""
+        try:
+            with trace_span(f"backend.{function}", "backend"):
+                yield
+        finally:
+            self._record_backend_stats(stages, world)
+
+    def _record_backend_stats(
+        self, stages: Sequence[str] = BACKEND_STAGES, world: Any = None
+    ):
+        """Record backend stage timings of the last call into the shared metrics
+
+        Counters of region worlds are recorded once per update, see `_record_region_counters`.
+        """
+        stats = self._read_backend_stats(world)
+        for stage in stages:
+            metrics.record(f"backend.{stage}", float(getattr(stats, stage).last))
+        if world is not None:
+            return
+        for counter in BACKEND_COUNTERS:
+            metrics.set_counter(f"backend.{counter}", int(getattr(stats, counter)))
+
+    def _record_region_counters(self):
+        """Record backend counters summed over the region worlds"""
+        region_stats = [
+            self._read_backend_stats(w) for w in self._region_worlds.values()
+        ]
+        for counter in BACKEND_COUNTERS:
+            metrics.set_counter(
+                f"backend.{counter}",
+                sum(int(getattr(stats, counter)) for stats in region_stats),
+            )
 
     def _process_state_results(self, result_ptr: Any, num_points: int) -> np.ndarray:
         buffer = self.ffi.buffer(result_ptr, num_points * self.ffi.sizeof("int"))
         return np.frombuffer(buffer=buffer, dtype=np.int32).copy()
 
     @staticmethod
-    def _log_debug_states(result: np.ndarray):
-        if logger.isEnabledFor(logging.DEBUG):
+    def log_state_transitions(diff: StateDiff):
+        """Log new states of the cats that changed, subscribed to state updates of the canvas"""
+        if logger.isEnabledFor(logging.DEBUG) and len(diff) > 0:
             mapping = {0: "calm", 1: "hisses", 2: "wants to fight"}
-            log_obj = {i: mapping[state] for i, state in enumerate(result)}
+            log_obj = {
+                i: mapping[state]
+                for i, state in zip(diff.indices.tolist(), diff.states.tolist())
+            }
             logger.debug(str(log_obj))
 
+    def _log_debug_backend_stats(self):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(str(self.get_backend_stats()))
+
+    def initial_points(self, count: int, zoom_factor: float) -> np.ndarray:
+        """Get the loaded population if it has `count` cats, or generate the scenario.
+
+        The population is returned as mapped, callers copy it into their own storage
+        before moving cats, so a restart begins from the loaded positions.
+        """
+        if self.population is not None and len(self.population) == count:
+            return self.population
+        return generate_scenario(
+            self.args.scenario,
+            count,
+            zoom_factor,
+            rng=counter_rng(self.seed, STREAM_POSITIONS),
+        )
+
+    def random_tick(self) -> int:
+        """Tick of the next hiss roll calculation in the backend"""
+        return int(self.lib.drunk_cats_get_random_tick())
+
+    def restore_random(self, seed: int, tick: int):
+        """Continue hiss rolls, positions and movement of a saved run"""
+        self.seed = seed
+        self.lib.drunk_cats_configure_random(seed)
+        self.lib.drunk_cats_set_random_tick(tick)
+        # Region worlds take the tick of every pass, but keep their own seed
+        for world in self._region_worlds.values():
+            self.lib.drunk_cats_world_configure_random(world, seed)
+
+    def motion_rng(self, tick: int) -> np.random.Generator:
+        """Generator of movement deltas for the `tick`-th target update"""
+        return counter_rng(self.seed, STREAM_MOTION, tick)
+
     @staticmethod
     def generate_points(count: int, zoom_factor: float) -> np.ndarray:
         """Generate random point positions."""
@@ -195,9 +855,11 @@ class Core:
 
     @staticmethod
     def generate_deltas(
-        widget: MovingPointsCanvas, count: int, speed: float
+        widget: Optional[MovingPointsCanvas],
+        count: int,
+        speed: float,
+        rng: Optional[np.random.Generator] = None,
     ) -> np.ndarray:
         """Generate random movement deltas for points."""
-        return np.random.uniform(-speed / 20, speed / 20, size=(count, 2)).astype(
-            np.float64
-        )
+        uniform = rng.uniform if rng is not None else np.random.uniform
+        return uniform(-speed / 20, speed / 20, size=(count, 2)).astype(np.float64)
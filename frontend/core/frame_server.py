@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+
+from frontend.core.frame_stream import Frame, FrameEncoder, parse_address
+from frontend.core.simulation import Simulation, frame_milliseconds
+
+logger = logging.getLogger(__name__)
+
+
+class _Viewer:
+    """Connected viewer with a single-frame mailbox: a newer frame replaces an unsent one"""
+
+    def __init__(self, name: str, encoder: FrameEncoder):
+        self.name = name
+        self.encoder = encoder
+        self.frame: Optional[Frame] = None
+        self.ready = asyncio.Event()
+        self.sent_frames = 0
+        self.dropped_frames = 0
+
+    def offer(self, frame: Frame):
+        if self.frame is not None:
+            self.dropped_frames += 1
+        self.frame = frame
+        self.ready.set()
+
+    def take(self) -> Frame:
+        frame, self.frame = self.frame, None
+        self.ready.clear()
+        assert frame is not None
+        return frame
+
+
+class FrameServer:
+    """Runs one headless simulation and streams its frames to any number of viewers
+
+    The simulation advances to the time of every frame, rounded to milliseconds,
+    in a worker thread, so it keeps up with the wall clock at any `fps`.
+    Every viewer is written to by its own task and only gets the newest frame,
+    so frames are dropped for slow viewers instead of slowing down the simulation.
+    """
+
+    def __init__(
+        self,
+        simulation: Simulation,
+        fps: float = 30.0,
+        quantize: bool = False,
+        delta: bool = False,
+    ):
+        self.simulation = simulation
+        self.fps = fps
+        self.frame_interval = 1.0 / fps
+        self.quantize = quantize
+        self.delta = delta
+        self.viewers: set[_Viewer] = set()
+        self.frame: Optional[Frame] = None
+        self.tick = 0
+        self.listening = asyncio.Event()
+
+    async def serve(self, address: str, ticks: Optional[int] = None):
+        """Listen on `address` and stream until cancelled, or for `ticks` frames"""
+        _, target = parse_address(address)
+        if isinstance(target, str):
+            # A socket file left by a previous run
+            if os.path.exists(target):
+                os.unlink(target)
+            server = await asyncio.start_unix_server(self._handle_viewer, target)
+        else:
+            host, port = target
+            server = await asyncio.start_server(self._handle_viewer, host, port)
+
+        logger.info(f"Streaming {self.simulation.num_points} cats on {address}")
+        self.listening.set()
+        async with server:
+            await self._run_simulation(ticks)
+
+    async def _run_simulation(self, ticks: Optional[int]):
+        loop = asyncio.get_running_loop()
+        next_frame_at = loop.time()
+        while ticks is None or self.tick < ticks:
+            milliseconds = frame_milliseconds(self.tick, self.fps)
+            await asyncio.to_thread(self.simulation.advance, milliseconds)
+            self._publish()
+            next_frame_at += self.frame_interval
+            await asyncio.sleep(max(0.0, next_frame_at - loop.time()))
+
+    def _publish(self):
+        self.frame = Frame(
+            self.tick,
+            self.simulation.points.astype(np.float32),
+            self.simulation.states.astype(np.uint8),
+        )
+        self.tick += 1
+        for viewer in self.viewers:
+            viewer.offer(self.frame)
+
+    async def _handle_viewer(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        viewer = _Viewer(
+            str(writer.get_extra_info("peername") or "unix socket"),
+            FrameEncoder(self.quantize, self.delta),
+        )
+        self.viewers.add(viewer)
+        if self.frame is not None:
+            viewer.offer(self.frame)
+        logger.info(f"Viewer {viewer.name} connected")
+        try:
+            while True:
+                await viewer.ready.wait()
+                writer.write(viewer.encoder.encode(viewer.take()))
+                await writer.drain()
+                viewer.sent_frames += 1
+        except ConnectionError:
+            pass
+        finally:
+            self.viewers.discard(viewer)
+            writer.close()
+            logger.info(
+                f"Viewer {viewer.name} disconnected: {viewer.sent_frames} frames sent, "
+                f"{viewer.dropped_frames} dropped"
+            )
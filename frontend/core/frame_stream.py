@@ -0,0 +1,170 @@
+"""Binary frames of the simulation streamed from `frame_server` to viewers
+
+Every message is a little-endian `u32` body size followed by the body:
+
+- header: magic `DCAT`, `u8` flags, `u32` tick, `u32` number of cats;
+- positions: `float32` `(x, y)` pairs, or with `QUANTIZED` the `float32`
+  bounds `min_x, min_y, max_x, max_y` and `uint16` pairs within them;
+- states: `uint8` state of every cat, or with `DELTA` a `u32` number of
+  changed cats, their `uint32` indices and `uint8` states relative to
+  the previous frame of the same stream.
+"""
+
+import socket
+import struct
+from dataclasses import dataclass, replace
+from typing import BinaryIO, Optional, Union
+
+import numpy as np
+
+from frontend.core.state_diff import StateDiff
+
+MAGIC = b"DCAT"
+QUANTIZED = 1
+DELTA = 2
+
+_SIZE = struct.Struct("<I")
+_HEADER = struct.Struct("<4sBII")
+_BOUNDS = struct.Struct("<4f")
+_QUANTIZATION_LEVELS = np.iinfo(np.uint16).max
+
+Address = Union[str, tuple[str, int]]
+
+
+@dataclass(frozen=True)
+class Frame:
+    tick: int
+    positions: np.ndarray  # float32 (N, 2)
+    states: np.ndarray  # uint8 (N,)
+    # Cats changed since the previous decoded frame, `None` for key frames
+    diff: Optional[StateDiff] = None
+
+
+def parse_address(address: str) -> tuple[int, Address]:
+    """Socket family and address of `unix:PATH`, `HOST:PORT` or `PORT` (localhost)"""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address.removeprefix("unix:")
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def connect(address: str) -> socket.socket:
+    family, target = parse_address(address)
+    if family == socket.AF_UNIX:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(target)
+        return sock
+    return socket.create_connection(target)  # type: ignore[arg-type]
+
+
+class FrameEncoder:
+    """Encodes frames of a single stream, delta frames refer to the previous encoded frame"""
+
+    def __init__(self, quantize: bool = False, delta: bool = False):
+        self.quantize = quantize
+        self.delta = delta
+        self._states: Optional[np.ndarray] = None
+
+    def encode(self, frame: Frame) -> bytes:
+        count = len(frame.states)
+        is_delta = (
+            self.delta and self._states is not None and len(self._states) == count
+        )
+        flags = (QUANTIZED if self.quantize else 0) | (DELTA if is_delta else 0)
+        parts = [_HEADER.pack(MAGIC, flags, frame.tick, count)]
+
+        if self.quantize:
+            parts += self._quantize(frame.positions)
+        else:
+            parts.append(np.ascontiguousarray(frame.positions, dtype="<f4").tobytes())
+
+        if is_delta:
+            assert self._states is not None
+            diff = StateDiff.between(self._states, frame.states)
+            parts += [
+                _SIZE.pack(len(diff)),
+                diff.indices.astype("<u4").tobytes(),
+                diff.states.astype(np.uint8).tobytes(),
+            ]
+        else:
+            parts.append(np.ascontiguousarray(frame.states, dtype=np.uint8).tobytes())
+        if self.delta:
+            self._states = np.array(frame.states, dtype=np.uint8)
+
+        body = b"".join(parts)
+        return _SIZE.pack(len(body)) + body
+
+    @staticmethod
+    def _quantize(positions: np.ndarray) -> list[bytes]:
+        if len(positions) == 0:
+            return [_BOUNDS.pack(0.0, 0.0, 0.0, 0.0)]
+        low = positions.min(axis=0).astype(np.float32)
+        high = positions.max(axis=0).astype(np.float32)
+        span = np.maximum(high - low, np.finfo(np.float32).tiny)
+        quantized = np.rint((positions - low) / span * _QUANTIZATION_LEVELS)
+        return [
+            _BOUNDS.pack(*low, *high),
+            quantized.astype("<u2").tobytes(),
+        ]
+
+
+class FrameDecoder:
+    """Decodes frames of a single stream, keeping the states delta frames refer to"""
+
+    def __init__(self):
+        self._states: Optional[np.ndarray] = None
+
+    def read(self, stream: BinaryIO) -> Optional[Frame]:
+        """Read and decode the next frame, `None` if the stream ended"""
+        size = stream.read(_SIZE.size)
+        if len(size) < _SIZE.size:
+            return None
+        body = stream.read(_SIZE.unpack(size)[0])
+        return self.decode(body)
+
+    def decode(self, body: bytes) -> Frame:
+        magic, flags, tick, count = _HEADER.unpack_from(body)
+        if magic != MAGIC:
+            raise ValueError(f"Not a frame: {magic!r}")
+        offset = _HEADER.size
+
+        if flags & QUANTIZED:
+            low_x, low_y, high_x, high_y = _BOUNDS.unpack_from(body, offset)
+            offset += _BOUNDS.size
+            quantized = np.frombuffer(body, dtype="<u2", count=2 * count, offset=offset)
+            offset += quantized.nbytes
+            low = np.array([low_x, low_y], dtype=np.float32)
+            span = np.array([high_x, high_y], dtype=np.float32) - low
+            positions = (
+                quantized.reshape(count, 2) * (span / _QUANTIZATION_LEVELS) + low
+            ).astype(np.float32)
+        else:
+            positions = np.frombuffer(
+                body, dtype="<f4", count=2 * count, offset=offset
+            ).reshape(count, 2)
+            offset += positions.nbytes
+
+        diff = None
+        if flags & DELTA:
+            if self._states is None or len(self._states) != count:
+                raise ValueError("Delta frame without a preceding key frame")
+            (changed,) = _SIZE.unpack_from(body, offset)
+            offset += _SIZE.size
+            indices = np.frombuffer(body, dtype="<u4", count=changed, offset=offset)
+            offset += indices.nbytes
+            diff = StateDiff(
+                indices.astype(np.intp),
+                np.frombuffer(body, dtype=np.uint8, count=changed, offset=offset),
+            )
+            diff.apply(self._states)
+        else:
+            self._states = np.frombuffer(
+                body, dtype=np.uint8, count=count, offset=offset
+            ).copy()
+
+        return Frame(tick, positions, self._states.copy(), diff)
+
+
+def without_diff(frame: Frame) -> Frame:
+    """The frame as a key frame, e.g. when frames before it were skipped"""
+    return replace(frame, diff=None)
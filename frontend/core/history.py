@@ -0,0 +1,104 @@
+import threading
+from typing import Optional
+
+import numpy as np
+
+from frontend.constants import CatStates
+
+# Every state takes 2 bits: calm - 00, hisses - 01, wants to fight - 10,
+# so four cats share a byte, the cat `4 * j + k` is in bits `2k, 2k + 1` of the byte `j`
+STATE_BITS = 2
+CATS_PER_BYTE = 8 // STATE_BITS
+_SHIFTS = np.arange(0, 8, STATE_BITS, dtype=np.uint8)
+# Bit of the state in a 2-bit slot: hissing and fighting are told apart by a single bit,
+# so unpacked bits of a row give a state of every cat at the stride of 2
+_STATE_BITS = {CatStates.HISSES: 0, CatStates.WANTS_TO_FIGHT: 1}
+# Ticks in a state are counted in uint16
+MAX_CAPACITY = int(np.iinfo(np.uint16).max)
+
+
+class StateHistory:
+    """Ring buffer of the last `capacity` state ticks of every cat, 2 bits per state
+
+    Every tick is a packed row of `ceil(num_cats / 4)` bytes in a preallocated
+    `(capacity, row_size)` array, the oldest row is overwritten by the next push.
+    Queries work on the packed rows, unpacking a single row at a time.
+    Ticks are pushed by the state update thread and reset or queried by the UI thread.
+    """
+
+    def __init__(self, capacity: int, num_cats: int):
+        if not 0 <= capacity <= MAX_CAPACITY:
+            raise ValueError(f"Capacity must be in [0, {MAX_CAPACITY}]")
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._allocate(num_cats)
+
+    def _allocate(self, num_cats: int):
+        self.num_cats = num_cats
+        self.row_size = -(-num_cats // CATS_PER_BYTE)
+        self._rows = np.zeros((self.capacity, self.row_size), dtype=np.uint8)
+        self._next = 0  # Row the next tick is written to
+        self.count = 0  # Number of stored ticks
+
+    @property
+    def nbytes(self) -> int:
+        return self._rows.nbytes
+
+    def reset(self, num_cats: Optional[int] = None):
+        """Forget all ticks, reallocating only if the number of cats changes"""
+        with self._lock:
+            if num_cats is not None and num_cats != self.num_cats:
+                self._allocate(num_cats)
+            self._next = self.count = 0
+
+    def push(self, states: np.ndarray) -> bool:
+        """Store states of all cats as the newest tick, states of another number of cats are ignored"""
+        with self._lock:
+            if len(states) != self.num_cats or self.capacity == 0:
+                return False
+            row = self._rows[self._next]
+            row[:] = 0
+            full = self.num_cats - self.num_cats % CATS_PER_BYTE
+            slots = np.asarray(states[:full], dtype=np.uint8).reshape(-1, CATS_PER_BYTE)
+            for k, shift in enumerate(_SHIFTS):
+                row[: len(slots)] |= slots[:, k] << shift
+            for k, state in enumerate(states[full:]):
+                row[-1] |= np.uint8(state) << _SHIFTS[k]
+
+            self._next = (self._next + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            return True
+
+    def states_at(self, ago: int = 0) -> np.ndarray:
+        """States of all cats `ago` ticks before the newest one"""
+        with self._lock:
+            slots = (self._row(ago)[:, None] >> _SHIFTS) & 0b11
+            return slots.reshape(-1)[: self.num_cats]
+
+    def ever_in_state(self, state: int, last: Optional[int] = None) -> np.ndarray:
+        """Mask of cats that were in the state at least once during the `last` ticks"""
+        with self._lock:
+            packed = np.zeros(self.row_size, dtype=np.uint8)
+            for ago in range(self._window(last)):
+                packed |= self._row(ago)
+            return self._state_bits(packed, state).astype(bool)
+
+    def ticks_in_state(self, state: int, last: Optional[int] = None) -> np.ndarray:
+        """Number of ticks every cat spent in the state during the `last` ticks"""
+        with self._lock:
+            counts = np.zeros(self.num_cats, dtype=np.uint16)
+            for ago in range(self._window(last)):
+                counts += self._state_bits(self._row(ago), state)
+            return counts
+
+    def _window(self, last: Optional[int]) -> int:
+        return self.count if last is None else min(last, self.count)
+
+    def _row(self, ago: int) -> np.ndarray:
+        if not 0 <= ago < self.count:
+            raise IndexError(f"No tick {ago} ticks ago, {self.count} ticks stored")
+        return self._rows[(self._next - 1 - ago) % self.capacity]
+
+    def _state_bits(self, row: np.ndarray, state: int) -> np.ndarray:
+        bits = np.unpackbits(row, bitorder="little")[_STATE_BITS[state] :: STATE_BITS]
+        return bits[: self.num_cats]
@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+# Dtypes of the arrays written by `drunk_cats_calculate_interactions`
+NEIGHBOR_COUNT_DTYPE = np.uint32
+NEAREST_RIVAL_DTYPE = np.int64
+# Pairs are written to the index buffer of fight lines as is
+FIGHT_PAIR_DTYPE = np.uint32
+# Capacity for fighting pairs, only the touched part of it is ever committed to memory
+MAX_FIGHT_PAIRS = 1 << 20
+
+
+@dataclass(frozen=True)
+class Interactions:
+    """States of all cats and their interactions found in the same backend pass
+
+    Outputs that were not requested are `None`. `fight_pairs` holds indices
+    `i < j` of the cats in every fighting pair, ordered by `i`;
+    `fight_pair_count` is the number of pairs found, it exceeds
+    `len(fight_pairs)` if they did not fit into the capacity.
+    """
+
+    states: np.ndarray
+    neighbor_counts: Optional[np.ndarray]
+    # Nearest other cat within the hiss radius, -1 if there is none
+    nearest_rivals: Optional[np.ndarray]
+    fight_pairs: Optional[np.ndarray]  # (K, 2)
+    fight_pair_count: int
+
+    @property
+    def truncated(self) -> bool:
+        """Whether some fighting pairs did not fit into the capacity"""
+        return self.fight_pairs is not None and self.fight_pair_count > len(
+            self.fight_pairs
+        )
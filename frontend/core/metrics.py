@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Sequence
+
+import numpy as np
+
+from frontend.core.profiler import get_tracer
+
+
+@dataclass
+class StageSummary:
+    """Timings of a single stage, all values are in seconds"""
+
+    count: int
+    last: float
+    total: float
+    p50: float
+    p95: float
+    p99: float
+
+
+class StageTimings:
+    """Cumulative and rolling timings of a single stage"""
+
+    def __init__(self, window_size: int):
+        self.count = 0
+        self.last = 0.0
+        self.total = 0.0
+        self.window: deque[float] = deque(maxlen=window_size)
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.last = seconds
+        self.total += seconds
+        self.window.append(seconds)
+
+    def summary(self) -> StageSummary:
+        if self.window:
+            p50, p95, p99 = np.percentile(self.window, [50, 95, 99])
+        else:
+            p50 = p95 = p99 = 0.0
+        return StageSummary(
+            count=self.count,
+            last=self.last,
+            total=self.total,
+            p50=float(p50),
+            p95=float(p95),
+            p99=float(p99),
+        )
+
+
+class Metrics:
+    """Thread-safe registry of stage timings and counters"""
+
+    def __init__(self, window_size: int = 256):
+        self.window_size = window_size
+        self._lock = threading.Lock()
+        self._stages: dict[str, StageTimings] = {}
+        self._counters: dict[str, int] = {}
+
+    def record(self, stage: str, seconds: float):
+        """Record time spent in the stage"""
+        with self._lock:
+            timings = self._stages.get(stage)
+            if timings is None:
+                timings = self._stages[stage] = StageTimings(self.window_size)
+            timings.record(seconds)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Measure time spent in the `with` block as the stage, also traced while profiling"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started_at
+            self.record(stage, seconds)
+            tracer = get_tracer()
+            if tracer is not None:
+                tracer.record_span(stage, started_at, seconds, category="stage")
+
+    def increment(self, counter: str, value: int = 1):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def set_counter(self, counter: str, value: int):
+        with self._lock:
+            self._counters[counter] = value
+
+    def stages(self) -> dict[str, StageSummary]:
+        with self._lock:
+            return {name: t.summary() for name, t in self._stages.items()}
+
+    def counters(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def format_report(self, stages: Sequence[str]) -> str:
+        """Format rolling p50/p95/p99 of the given stages in milliseconds"""
+        summaries = self.stages()
+        parts = []
+        for stage in stages:
+            summary = summaries.get(stage)
+            if summary is None:
+                continue
+            parts.append(
+                f"{stage}: {summary.p50 * 1000:.2f}/{summary.p95 * 1000:.2f}"
+                f"/{summary.p99 * 1000:.2f} ms"
+            )
+        return " | ".join(parts)
+
+
+# Metrics shared by the backend integration and the UI
+metrics = Metrics()
@@ -0,0 +1,131 @@
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+# Number of cats generated at once, bounds memory used by temporary arrays
+CHUNK_SIZE = 1 << 18
+
+# Suffixes of raw positions files: flat `x_1, y_1, ..., x_n, y_n` arrays without a header
+RAW_DTYPES = {".f32": np.float32, ".f64": np.float64}
+
+
+def load_population(path: Path, dtype: Optional[str] = None) -> np.ndarray:
+    """Memory-map cat positions from a `.npy` or a raw float32/float64 file
+
+    The file is mapped copy-on-write, so nothing is read or copied upfront,
+    and moving cats never modifies the file. The dtype of a `.npy` file is
+    taken from its header, an explicit `dtype` must match it.
+    """
+    if path.suffix == ".npy":
+        points = np.load(path, mmap_mode="c")
+        if dtype is not None and points.dtype != np.dtype(dtype):
+            raise ValueError(
+                f"{path} holds {points.dtype} positions, not {np.dtype(dtype)}"
+            )
+    else:
+        raw_dtype = (
+            np.dtype(dtype) if dtype is not None else RAW_DTYPES.get(path.suffix)
+        )
+        if raw_dtype is None:
+            raise ValueError(
+                f"Unknown positions file format: {path}, "
+                f"expected .npy, {', '.join(RAW_DTYPES)}, or an explicit dtype"
+            )
+        points = np.memmap(path, dtype=raw_dtype, mode="c")
+        if points.size % 2 != 0:
+            raise ValueError(f"Odd number of coordinates in {path}")
+        points = points.reshape(-1, 2)
+
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError(f"Expected positions of shape (N, 2), got {points.shape}")
+    if points.dtype not in (np.float32, np.float64):
+        raise ValueError(f"Expected float32 or float64 positions, got {points.dtype}")
+    return points
+
+
+# Scenario generators: given the total number of cats, each returns a function,
+# that fills a chunk of the output array starting at the given index
+
+ChunkFiller = Callable[[np.ndarray, int], None]
+
+
+def _uniform(count: int, rng: np.random.Generator) -> ChunkFiller:
+    def fill(out: np.ndarray, start: int):
+        rng.random(out=out)
+        out *= 2.0
+        out -= 1.0
+
+    return fill
+
+
+def _clusters(count: int, rng: np.random.Generator) -> ChunkFiller:
+    centers = rng.uniform(-0.8, 0.8, size=(16, 2))
+
+    def fill(out: np.ndarray, start: int):
+        cluster_ids = rng.integers(0, len(centers), size=len(out))
+        rng.standard_normal(size=out.shape, out=out)
+        out *= 0.04
+        out += centers[cluster_ids]
+
+    return fill
+
+
+def _rings(count: int, rng: np.random.Generator) -> ChunkFiller:
+    ring_radii = np.array([0.2, 0.45, 0.7, 0.95])
+
+    def fill(out: np.ndarray, start: int):
+        radii = ring_radii[rng.integers(0, len(ring_radii), size=len(out))]
+        radii += rng.normal(0.0, 0.01, size=len(out))
+        angles = rng.uniform(0.0, 2 * np.pi, size=len(out))
+        out[:, 0] = radii * np.cos(angles)
+        out[:, 1] = radii * np.sin(angles)
+
+    return fill
+
+
+def _hotspot(count: int, rng: np.random.Generator) -> ChunkFiller:
+    def fill(out: np.ndarray, start: int):
+        rng.standard_normal(size=out.shape, out=out)
+        out *= 0.03
+
+    return fill
+
+
+def _grid(count: int, rng: np.random.Generator) -> ChunkFiller:
+    side = max(1, int(np.ceil(np.sqrt(count))))
+    step = 2.0 / side
+
+    def fill(out: np.ndarray, start: int):
+        indices = np.arange(start, start + len(out))
+        out[:, 0] = -1.0 + step * (indices % side + 0.5)
+        out[:, 1] = -1.0 + step * (indices // side + 0.5)
+
+    return fill
+
+
+SCENARIOS: dict[str, Callable[[int, np.random.Generator], ChunkFiller]] = {
+    "uniform": _uniform,
+    "clusters": _clusters,
+    "rings": _rings,
+    "hotspot": _hotspot,
+    "grid": _grid,
+}
+
+
+def generate_scenario(
+    name: str,
+    count: int,
+    zoom_factor: float = 1.0,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """Generate cat positions for a scenario in vectorized chunks"""
+    rng = rng if rng is not None else np.random.default_rng()
+    fill = SCENARIOS[name](count, rng)
+
+    points = np.empty((count, 2), dtype=np.float64)
+    for start in range(0, count, CHUNK_SIZE):
+        chunk = points[start : start + CHUNK_SIZE]
+        fill(chunk, start)
+        chunk /= zoom_factor
+    return points
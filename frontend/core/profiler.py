@@ -0,0 +1,201 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Iterator, Optional
+
+
+class Tracer:
+    """Recorder of a timeline in the Chrome trace-event format
+
+    Every span becomes a complete ("X") event on the thread it was recorded on.
+    If `sampling_interval` is given, a background thread also samples Python stacks
+    of all other threads, so the time can be attributed to functions in a trace viewer.
+    """
+
+    def __init__(self, path: Path, sampling_interval: Optional[float] = None):
+        self.path = path
+        self.sampling_interval = sampling_interval
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._events: list[dict[str, Any]] = []
+        self._named_threads: set[int] = set()
+        self._stack_frames: dict[tuple[Optional[int], str], int] = {}
+        self._samples: list[dict[str, Any]] = []
+        self._sampler: Optional[threading.Thread] = None
+        self._sampler_stop = threading.Event()
+
+    @staticmethod
+    def now() -> float:
+        """Current time in trace units (microseconds)"""
+        return time.perf_counter() * 1e6
+
+    def record_span(
+        self, name: str, started_at: float, duration: float, category: str = "app"
+    ):
+        """Record a complete event, `started_at` and `duration` are in seconds"""
+        tid = threading.get_native_id()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": started_at * 1e6,
+            "dur": duration * 1e6,
+            "pid": self.pid,
+            "tid": tid,
+        }
+        with self._lock:
+            self._name_current_thread(tid)
+            self._events.append(event)
+
+    @contextmanager
+    def span(self, name: str, category: str = "app") -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(
+                name, started_at, time.perf_counter() - started_at, category
+            )
+
+    def _name_current_thread(self, tid: int):
+        if tid in self._named_threads:
+            return
+        self._named_threads.add(tid)
+        thread = threading.current_thread()
+        name = "GUI" if thread is threading.main_thread() else thread.name
+        self._events.append(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self.pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+        )
+
+    # Sampling
+
+    def start(self):
+        if self.sampling_interval is None or self._sampler is not None:
+            return
+        self._sampler_stop.clear()
+        self._sampler = threading.Thread(
+            target=self._sample_loop, name="ProfilerSampler", daemon=True
+        )
+        self._sampler.start()
+
+    def stop(self):
+        if self._sampler is None:
+            return
+        self._sampler_stop.set()
+        self._sampler.join()
+        self._sampler = None
+
+    def _sample_loop(self):
+        assert self.sampling_interval is not None
+        sampler_id = threading.get_ident()
+        while not self._sampler_stop.wait(self.sampling_interval):
+            self.sample(ignored_thread_id=sampler_id)
+
+    def sample(self, ignored_thread_id: Optional[int] = None):
+        """Record Python stacks of all threads"""
+        ts = self.now()
+        native_ids = {t.ident: t.native_id for t in threading.enumerate()}
+        frames = sys._current_frames()
+        with self._lock:
+            for thread_id, frame in frames.items():
+                if thread_id == ignored_thread_id:
+                    continue
+                self._samples.append(
+                    {
+                        "cpu": 0,
+                        "tid": native_ids.get(thread_id) or thread_id,
+                        "ts": ts,
+                        "name": "sample",
+                        "sf": self._intern_stack(frame),
+                        "weight": 1,
+                    }
+                )
+
+    def _intern_stack(self, frame: Any) -> Optional[int]:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({Path(code.co_filename).name})")
+            frame = frame.f_back
+
+        parent: Optional[int] = None
+        for name in reversed(names):
+            key = (parent, name)
+            frame_id = self._stack_frames.get(key)
+            if frame_id is None:
+                frame_id = self._stack_frames[key] = len(self._stack_frames)
+            parent = frame_id
+        return parent
+
+    # Export
+
+    def to_json(self) -> dict[str, Any]:
+        with self._lock:
+            stack_frames: dict[str, dict[str, Any]] = {}
+            for (parent, name), frame_id in self._stack_frames.items():
+                stack_frame: dict[str, Any] = {"name": name, "category": "python"}
+                if parent is not None:
+                    stack_frame["parent"] = str(parent)
+                stack_frames[str(frame_id)] = stack_frame
+
+            samples = [
+                {**sample, "sf": str(sample["sf"])}
+                for sample in self._samples
+                if sample["sf"] is not None
+            ]
+            return {
+                "traceEvents": list(self._events),
+                "stackFrames": stack_frames,
+                "samples": samples,
+                "displayTimeUnit": "ms",
+            }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, mode="w") as f:
+            json.dump(self.to_json(), f)
+
+
+# Active tracer, `None` while profiling is disabled
+_tracer: Optional[Tracer] = None
+
+_NO_SPAN: ContextManager[None] = nullcontext()
+
+
+def enable_profiling(path: Path, sampling_interval: Optional[float] = None) -> Tracer:
+    global _tracer
+    _tracer = Tracer(path, sampling_interval)
+    _tracer.start()
+    return _tracer
+
+
+def disable_profiling(save: bool = True):
+    """Stop profiling and write the recorded timeline"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None:
+        return
+    tracer.stop()
+    if save:
+        tracer.save()
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def trace_span(name: str, category: str = "app") -> ContextManager[None]:
+    """Record the `with` block as a span, does nothing while profiling is disabled"""
+    if _tracer is None:
+        return _NO_SPAN
+    return _tracer.span(name, category)
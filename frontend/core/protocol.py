@@ -1,14 +1,50 @@
-from typing import Protocol, Any
+from __future__ import annotations
+
+from typing import Protocol, Any, Optional, TYPE_CHECKING
 import numpy as np
-from PyQt6.QtWidgets import QApplication
+
+from frontend.core.interactions import Interactions
+from frontend.core.state_diff import StateDiff
+from frontend.core.world import Rect
+
+if TYPE_CHECKING:
+    from PyQt6.QtWidgets import QApplication
 
 
 class Core(Protocol):
+    seed: int
+
     def start_ui(self, app: QApplication, window: Any): ...
     def update_num_points(self, window: Any, num_points: int): ...
     def update_speed(self, window: Any, speed: int): ...
     def generate_points(self, count: int, zoom_factor: float) -> np.ndarray: ...
-    def generate_deltas(self, widget: Any, count: int, speed: float) -> np.ndarray: ...
+    def initial_points(self, count: int, zoom_factor: float) -> np.ndarray: ...
+    def generate_deltas(
+        self,
+        widget: Any,
+        count: int,
+        speed: float,
+        rng: Optional[np.random.Generator] = None,
+    ) -> np.ndarray: ...
+    def motion_rng(self, tick: int) -> np.random.Generator: ...
+    def random_tick(self) -> int: ...
+    def restore_random(self, seed: int, tick: int): ...
+    def log_state_transitions(self, diff: StateDiff): ...
     def update_states(
-        self, num_points: int, points: np.ndarray, width: int, height: int
+        self,
+        num_points: int,
+        points: np.ndarray,
+        width: int,
+        height: int,
+        states: Optional[np.ndarray] = None,
+        visible_rect: Optional[Rect] = None,
+        tick: int = 0,
     ) -> np.ndarray: ...
+    def calculate_interactions(
+        self,
+        points: np.ndarray,
+        width: int,
+        height: int,
+        neighbor_counts: bool = True,
+        nearest_rivals: bool = True,
+    ) -> Interactions: ...
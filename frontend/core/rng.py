@@ -0,0 +1,26 @@
+"""Counter-based random streams shared by all NumPy draws of the app
+
+Every stream is a Philox generator keyed by the seed and the stream id and started
+at a counter (e.g. the tick), so a draw depends only on where it is made, not on
+how many numbers were drawn before it or in which thread.
+"""
+
+import secrets
+
+import numpy as np
+
+# Stream ids, the backend keys hiss rolls by the same seed on its own
+STREAM_POSITIONS = 0
+STREAM_MOTION = 1
+
+
+def random_seed() -> int:
+    """Seed for runs without `--seed`"""
+    return secrets.randbits(64)
+
+
+def counter_rng(seed: int, stream: int, counter: int = 0) -> np.random.Generator:
+    """Generator of the `stream` draws at `counter`, independent of any other draws"""
+    return np.random.Generator(
+        np.random.Philox(key=[seed, stream], counter=[0, 0, counter, 0])
+    )
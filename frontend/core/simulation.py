@@ -0,0 +1,123 @@
+import time
+from concurrent.futures import Executor, Future
+from typing import Optional
+
+import numpy as np
+
+from frontend.constants import RenderingConstants, UpdateIntervals
+from frontend.core.core import Core
+
+
+def frame_milliseconds(frame: int, fps: float) -> int:
+    """Milliseconds the simulation advances by for the frame, they add up to the time of all frames"""
+    return round((frame + 1) * 1000 / fps) - round(frame * 1000 / fps)
+
+
+class Simulation:
+    """Headless stepping of cats, mirroring the timers of `MovingPointsCanvas`
+
+    A tick is one state update: positions are moved by all position updates
+    since the previous state update, movement deltas are regenerated when their
+    interval elapses, then new states are calculated. `advance` moves by any
+    number of milliseconds for callers that need positions between ticks.
+    """
+
+    def __init__(
+        self,
+        core: Core,
+        num_points: int,
+        speed: float = 1.0,
+        width: int = 1000,
+        height: int = 800,
+        points: Optional[np.ndarray] = None,
+        state_executor: Optional[Executor] = None,
+    ):
+        self.core = core
+        # With an executor states are calculated in the background during the next tick
+        self.state_executor = state_executor
+        self._pending_states: Optional[Future] = None
+        self.num_points = num_points
+        self.speed = speed
+        self.width = width
+        self.height = height
+        self.time = 0  # milliseconds
+        self.target_tick = 0
+        # The only copy of a memory-mapped population, cats move in float64
+        self.points = np.array(
+            (
+                points
+                if points is not None
+                else core.initial_points(
+                    num_points, RenderingConstants.DEFAULT_ZOOM_FACTOR
+                )
+            ),
+            dtype=np.float64,
+        )
+        self.deltas = self._generate_deltas()
+        self.states = np.zeros(num_points, dtype=np.int32)
+        self.last_step_seconds = 0.0
+
+    def step(self) -> np.ndarray:
+        """Advance by one state update and return the new states"""
+        self.advance(
+            UpdateIntervals.STATE_UPDATE - self.time % UpdateIntervals.STATE_UPDATE
+        )
+        return self.states
+
+    def advance(self, milliseconds: int) -> bool:
+        """Move cats by `milliseconds`, calculating states at every state update on the way
+
+        Returns whether states were updated.
+        """
+        updated = False
+        remaining = milliseconds
+        while remaining > 0:
+            # Deltas are constant until the next target update, so the moves are merged
+            elapsed = min(
+                remaining,
+                UpdateIntervals.TARGET_UPDATE
+                - self.time % UpdateIntervals.TARGET_UPDATE,
+                UpdateIntervals.STATE_UPDATE - self.time % UpdateIntervals.STATE_UPDATE,
+            )
+            position_updates = elapsed / UpdateIntervals.POSITION_UPDATE
+            self.points += self.deltas * (position_updates / RenderingConstants.FPS)
+            self.time += elapsed
+            remaining -= elapsed
+            if self.time % UpdateIntervals.TARGET_UPDATE == 0:
+                self.deltas = self._generate_deltas()
+            if self.time % UpdateIntervals.STATE_UPDATE == 0:
+                self._update_states()
+                updated = True
+        return updated
+
+    def _update_states(self):
+        if self.state_executor is None:
+            self.states, self.last_step_seconds = self._calculate_states(self.points)
+            return
+
+        # States of the previous tick are shown from now on, a tick later than without an executor,
+        # so the result doesn't depend on how fast the executor is
+        if self._pending_states is not None:
+            self.states, self.last_step_seconds = self._pending_states.result()
+        self._pending_states = self.state_executor.submit(
+            self._calculate_states, self.points.copy()
+        )
+
+    def _calculate_states(self, points: np.ndarray) -> tuple[np.ndarray, float]:
+        started_at = time.perf_counter()
+        states = self.core.update_states(
+            self.num_points, points, self.width, self.height
+        )
+        return states, time.perf_counter() - started_at
+
+    def _generate_deltas(self) -> np.ndarray:
+        deltas = self.core.generate_deltas(
+            None, self.num_points, self.speed, self.core.motion_rng(self.target_tick)
+        )
+        self.target_tick += 1
+        return deltas
+
+    def state_fractions(self) -> np.ndarray:
+        """Fractions of calm, hissing and fighting cats"""
+        counts = np.bincount(self.states, minlength=3)[:3]
+        return counts / max(1, self.num_points)
@@ -0,0 +1,56 @@
+from typing import Optional
+
+
+class StalenessController:
+    """Picks the state update interval, so that shown states meet a target staleness
+
+    Staleness of shown states is the age of the positions they were calculated from.
+    It peaks right before the next result arrives, at about the update interval
+    plus the calculation time, so the interval is set to the target minus
+    the smoothed calculation time. If calculations are too slow for the target,
+    updates run back to back and the staleness degrades to twice the calculation time.
+    All times are in seconds.
+    """
+
+    def __init__(
+        self,
+        target: Optional[float],
+        interval: float,
+        min_interval: float = 0.01,
+        smoothing: float = 0.3,
+        margin: float = 0.1,
+    ):
+        self.target = target
+        self.interval = interval
+        self.min_interval = min_interval
+        self.smoothing = smoothing
+        self.margin = margin
+        self.calculation_time: Optional[float] = None
+        self.staleness = 0.0
+        self.skipped_ticks = 0
+        self._shown_started_at: Optional[float] = None
+
+    def skip_tick(self):
+        """Count a tick skipped because the previous update is still running"""
+        self.skipped_ticks += 1
+
+    def record_update(self, started_at: float, finished_at: float) -> float:
+        """Record an update calculated from positions taken at `started_at`, returns the next interval"""
+        seconds = finished_at - started_at
+        if self.calculation_time is None:
+            self.calculation_time = seconds
+        else:
+            self.calculation_time += self.smoothing * (seconds - self.calculation_time)
+
+        # The replaced states were shown until now
+        if self._shown_started_at is not None:
+            self.staleness = finished_at - self._shown_started_at
+        self._shown_started_at = started_at
+
+        if self.target is not None:
+            self.interval = max(
+                self.target - self.calculation_time * (1 + self.margin),
+                self.calculation_time,
+                self.min_interval,
+            )
+        return self.interval
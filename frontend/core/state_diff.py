@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class StateDiff:
+    """Cats whose states changed between two ticks: ascending indices and their new states"""
+
+    indices: np.ndarray
+    states: np.ndarray
+
+    @classmethod
+    def between(cls, old: np.ndarray, new: np.ndarray) -> "StateDiff":
+        indices = np.flatnonzero(old != new)
+        return cls(indices, new[indices])
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def apply(self, states: np.ndarray):
+        states[self.indices] = self.states
+
+    def ranges(self, max_gap: int = 0) -> list[tuple[int, int]]:
+        """Half-open `[start, end)` runs covering all changed cats
+
+        Runs closer than `max_gap` unchanged cats are merged, so a few
+        unchanged cats are rewritten instead of starting a new write.
+        """
+        if len(self.indices) == 0:
+            return []
+        breaks = np.flatnonzero(np.diff(self.indices) > max_gap + 1)
+        starts = self.indices[np.concatenate([[0], breaks + 1])]
+        ends = self.indices[np.concatenate([breaks, [len(self.indices) - 1]])] + 1
+        return list(zip(starts.tolist(), ends.tolist()))
@@ -0,0 +1,326 @@
+from dataclasses import dataclass
+from typing import Callable, Iterator, Protocol
+
+import numpy as np
+
+# Packing of tile coordinates into a single int64 key
+_TILE_OFFSET = 1 << 30
+_TILE_SHIFT = 1 << 31
+
+# Calculates states of cats given their positions in the plain coordinate system,
+# their indices in the whole world, and the key of the region they belong to,
+# stable between ticks for the same region
+StatesCalculator = Callable[[np.ndarray, np.ndarray, int], np.ndarray]
+
+# Region keys of the visibility scheduler, tile keys are never negative
+VISIBLE_REGION = -1
+OFFSCREEN_REGION = -2
+
+
+@dataclass
+class Rect:
+    """Axis-aligned rectangle"""
+
+    min_x: float
+    min_y: float
+    max_x: float
+    max_y: float
+
+    def scaled(self, scale_x: float, scale_y: float) -> "Rect":
+        return Rect(
+            self.min_x * scale_x,
+            self.min_y * scale_y,
+            self.max_x * scale_x,
+            self.max_y * scale_y,
+        )
+
+    def expanded(self, margin: float) -> "Rect":
+        return Rect(
+            self.min_x - margin,
+            self.min_y - margin,
+            self.max_x + margin,
+            self.max_y + margin,
+        )
+
+    def contains(self, positions: np.ndarray) -> np.ndarray:
+        """Mask of positions inside the rectangle"""
+        return (
+            (positions[:, 0] >= self.min_x)
+            & (positions[:, 0] <= self.max_x)
+            & (positions[:, 1] >= self.min_y)
+            & (positions[:, 1] <= self.max_y)
+        )
+
+
+@dataclass
+class Tile:
+    """Cats of a single tile, indices are sorted by tiles in `TileIndex.order`"""
+
+    key: int
+    x: int
+    y: int
+    start: int
+    end: int
+
+
+class TileIndex:
+    """Cats grouped by square tiles of the plain coordinate system"""
+
+    def __init__(self, positions: np.ndarray, tile_size: float):
+        self.positions = positions
+        self.tile_size = tile_size
+
+        tile_coords = np.floor(positions / tile_size).astype(np.int64)
+        keys = (tile_coords[:, 0] + _TILE_OFFSET) * _TILE_SHIFT + (
+            tile_coords[:, 1] + _TILE_OFFSET
+        )
+        self.order = np.argsort(keys, kind="stable")
+        unique_keys, starts, counts = np.unique(
+            keys[self.order], return_index=True, return_counts=True
+        )
+        self._tiles = {
+            int(key): (int(start), int(start + count))
+            for key, start, count in zip(unique_keys, starts, counts)
+        }
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def __iter__(self) -> Iterator[Tile]:
+        for key in self._tiles:
+            yield self.tile(key)
+
+    def keys(self) -> list[int]:
+        """Keys of all non-empty tiles in ascending order"""
+        return list(self._tiles)
+
+    def tile(self, key: int) -> Tile:
+        start, end = self._tiles[key]
+        x, y = divmod(key, _TILE_SHIFT)
+        return Tile(key, x - _TILE_OFFSET, y - _TILE_OFFSET, start, end)
+
+    def cats(self, tile: Tile) -> np.ndarray:
+        return self.order[tile.start : tile.end]
+
+    def cats_with_halo(self, tile: Tile, halo: float) -> np.ndarray:
+        """Cats of the tile followed by the other cats not farther than `halo` from it"""
+        own = self.cats(tile)
+        neighbors = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if dx == 0 and dy == 0:
+                    continue
+                bounds = self._tiles.get(self._key(tile.x + dx, tile.y + dy))
+                if bounds is not None:
+                    neighbors.append(self.order[bounds[0] : bounds[1]])
+        if not neighbors:
+            return own
+
+        candidates = np.concatenate(neighbors)
+        in_halo = self.bounds(tile).expanded(halo).contains(self.positions[candidates])
+        return np.concatenate([own, candidates[in_halo]])
+
+    def bounds(self, tile: Tile) -> Rect:
+        return Rect(
+            tile.x * self.tile_size,
+            tile.y * self.tile_size,
+            (tile.x + 1) * self.tile_size,
+            (tile.y + 1) * self.tile_size,
+        )
+
+    def intersects(self, tile: Tile, rect: Rect) -> bool:
+        bounds = self.bounds(tile)
+        return (
+            bounds.max_x >= rect.min_x
+            and bounds.min_x <= rect.max_x
+            and bounds.max_y >= rect.min_y
+            and bounds.min_y <= rect.max_y
+        )
+
+    @staticmethod
+    def _key(x: int, y: int) -> int:
+        return (x + _TILE_OFFSET) * _TILE_SHIFT + (y + _TILE_OFFSET)
+
+
+class StateScheduler(Protocol):
+    """Policy choosing which cats get new states on a tick"""
+
+    def update_states(
+        self,
+        calculate: StatesCalculator,
+        positions: np.ndarray,
+        states: np.ndarray,
+        visible_rect: Rect,
+        tick: int,
+    ) -> np.ndarray:
+        """Calculate new states of cats, positions and the rectangle are in the plain coordinate system"""
+        ...
+
+    def counters(self) -> dict[str, int]:
+        """Counters of the last update"""
+        ...
+
+
+def _update_tile(
+    calculate: StatesCalculator,
+    index: TileIndex,
+    tile: Tile,
+    halo: float,
+    states: np.ndarray,
+):
+    own_count = tile.end - tile.start
+    cats = index.cats_with_halo(tile, halo)
+    tile_states = calculate(np.ascontiguousarray(index.positions[cats]), cats, tile.key)
+    states[cats[:own_count]] = tile_states[:own_count]
+
+
+class TiledWorld:
+    """World split into tiles, whose states are calculated independently
+
+    Tiles intersecting the visible rectangle are updated on every tick,
+    other tiles only on every `far_tile_interval`-th tick (staggered between tiles).
+    """
+
+    def __init__(self, tile_size: float, halo: float, far_tile_interval: int):
+        if halo > tile_size:
+            raise ValueError("Tile size must not be smaller than the hiss radius")
+        self.tile_size = tile_size
+        self.halo = halo
+        self.far_tile_interval = max(1, far_tile_interval)
+        self.updated_tiles = 0
+        self.skipped_tiles = 0
+
+    def update_states(
+        self,
+        calculate: StatesCalculator,
+        positions: np.ndarray,
+        states: np.ndarray,
+        visible_rect: Rect,
+        tick: int,
+    ) -> np.ndarray:
+        index = TileIndex(positions, self.tile_size)
+        new_states = states.copy()
+        self.updated_tiles = self.skipped_tiles = 0
+
+        for tile in index:
+            if not self._is_due(index, tile, visible_rect, tick):
+                self.skipped_tiles += 1
+                continue
+            self.updated_tiles += 1
+            _update_tile(calculate, index, tile, self.halo, new_states)
+
+        return new_states
+
+    def counters(self) -> dict[str, int]:
+        return {
+            "updated_tiles": self.updated_tiles,
+            "skipped_tiles": self.skipped_tiles,
+        }
+
+    def _is_due(self, index: TileIndex, tile: Tile, visible_rect: Rect, tick: int):
+        if index.intersects(tile, visible_rect):
+            return True
+        return (tick + tile.x + 3 * tile.y) % self.far_tile_interval == 0
+
+
+class VisibilityScheduler:
+    """Visible cats get new states on every tick, the others are refreshed round-robin
+
+    Cats inside the visible rectangle and its `halo` are calculated together with
+    the cats around them, so their latency depends only on how many cats are visible.
+    Off-screen cats are refreshed in vertical strips of `offscreen_budget` cats,
+    sweeping the world from left to right over consecutive ticks.
+    """
+
+    def __init__(self, halo: float, offscreen_budget: int):
+        self.halo = halo
+        self.offscreen_budget = offscreen_budget
+        self.visible_cats = 0
+        self.refreshed_cats = 0
+        self._strip_start = -np.inf
+
+    def update_states(
+        self,
+        calculate: StatesCalculator,
+        positions: np.ndarray,
+        states: np.ndarray,
+        visible_rect: Rect,
+        tick: int,
+    ) -> np.ndarray:
+        new_states = states.copy()
+        self.refreshed_cats = self._refresh_offscreen(calculate, positions, new_states)
+        self.visible_cats = self._update_visible(
+            calculate, positions, new_states, visible_rect
+        )
+        return new_states
+
+    def _refresh_offscreen(
+        self, calculate: StatesCalculator, positions: np.ndarray, states: np.ndarray
+    ) -> int:
+        if self.offscreen_budget <= 0 or len(positions) == 0:
+            return 0
+
+        xs = positions[:, 0]
+        remaining = xs[xs >= self._strip_start]
+        if len(remaining) == 0:
+            self._strip_start = -np.inf
+            remaining = xs
+        if len(remaining) > self.offscreen_budget:
+            strip_end = float(
+                np.partition(remaining, self.offscreen_budget)[self.offscreen_budget]
+            )
+            if strip_end == remaining.min():
+                # More cats than the budget share the first x, the strip would be empty
+                beyond = remaining[remaining > strip_end]
+                strip_end = float(beyond.min()) if len(beyond) > 0 else np.inf
+        else:
+            strip_end = np.inf
+
+        strip = Rect(self._strip_start, -np.inf, strip_end, np.inf)
+        self._strip_start = strip_end
+        return self._update_rect(
+            calculate, positions, states, strip, OFFSCREEN_REGION, inclusive=False
+        )
+
+    def _update_visible(
+        self,
+        calculate: StatesCalculator,
+        positions: np.ndarray,
+        states: np.ndarray,
+        visible_rect: Rect,
+    ) -> int:
+        return self._update_rect(
+            calculate,
+            positions,
+            states,
+            visible_rect.expanded(self.halo),
+            VISIBLE_REGION,
+        )
+
+    def _update_rect(
+        self,
+        calculate: StatesCalculator,
+        positions: np.ndarray,
+        states: np.ndarray,
+        rect: Rect,
+        region: int,
+        inclusive: bool = True,
+    ) -> int:
+        """Update cats inside the rectangle, calculating them with the cats within the halo"""
+        context = np.flatnonzero(rect.expanded(self.halo).contains(positions))
+        if len(context) == 0:
+            return 0
+
+        context_positions = np.ascontiguousarray(positions[context])
+        updated = rect.contains(context_positions)
+        if not inclusive:
+            updated &= context_positions[:, 0] < rect.max_x
+        context_states = calculate(context_positions, context, region)
+        states[context[updated]] = context_states[updated]
+        return int(np.count_nonzero(updated))
+
+    def counters(self) -> dict[str, int]:
+        return {
+            "visible_cats": self.visible_cats,
+            "refreshed_cats": self.refreshed_cats,
+        }
@@ -0,0 +1,282 @@
+"""Render a headless run to a video file without a display.
+
+A standalone OpenGL context (software rasterization by default) draws every frame
+with the shaders of the app. Frames are read back through a ring of pixel buffers,
+then flipped, converted and encoded by OpenCV on worker threads, while states of
+the next tick are calculated in the background, so the render loop only draws.
+
+Run with `python -m frontend.tools.render_video --help`, options after `--`
+are passed to the app, e.g. `-- --num-points 500000 --seed 1`.
+"""
+
+import argparse
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import moderngl
+import numpy as np
+
+from frontend.constants import OpenGLSettings, RenderingConstants
+from frontend.ui.renderer import TEXTURE_PATHS, PointRenderer, RenderState
+from frontend.ui.shader_source import FRAGMENT_SHADER, VERTEX_SHADER
+
+# Frames read back, but not encoded yet, before the render loop has to wait
+MAX_QUEUED_FRAMES = 32
+# Pixel buffers in flight: a frame is mapped two frames after its readback was issued
+READBACK_BUFFERS = 3
+
+
+def create_offscreen_context(software: bool = True) -> moderngl.Context:
+    """Standalone EGL context, no display or window system is needed"""
+    if software:
+        os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
+    return moderngl.create_standalone_context(
+        require=OpenGLSettings.VERSION_MAJOR * 100 + OpenGLSettings.VERSION_MINOR * 10,
+        backend="egl",  # type: ignore[arg-type]
+    )
+
+
+def load_textures(ctx: moderngl.Context) -> list[moderngl.Texture]:
+    textures = []
+    for path in TEXTURE_PATHS.values():
+        image = cv2.imread(path.as_posix(), cv2.IMREAD_UNCHANGED)
+        if image is None:
+            raise Exception(f"Failed to load texture {path}")
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA)
+        texture = ctx.texture((image.shape[1], image.shape[0]), 4, image.tobytes())
+        texture.build_mipmaps()
+        textures.append(texture)
+    return textures
+
+
+class OffscreenRenderer:
+    """Draws cats into a multisampled framebuffer and reads frames back asynchronously"""
+
+    def __init__(
+        self,
+        ctx: moderngl.Context,
+        width: int,
+        height: int,
+        num_points: int,
+        samples: int = OpenGLSettings.SAMPLES,
+    ):
+        self.ctx = ctx
+        self.size = (width, height)
+        ctx.enable(moderngl.PROGRAM_POINT_SIZE)
+        ctx.enable(moderngl.BLEND)
+
+        self.program = ctx.program(
+            vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER
+        )
+        self.renderer = PointRenderer(ctx, self.program, load_textures(ctx))
+        samples = min(samples, ctx.max_samples)
+        self.fbo = ctx.framebuffer(
+            color_attachments=[ctx.renderbuffer(self.size, samples=samples)]
+        )
+        # Multisampled pixels can't be read directly, they are resolved here first
+        self.resolved_fbo = (
+            ctx.framebuffer(color_attachments=[ctx.renderbuffer(self.size)])
+            if samples > 0
+            else self.fbo
+        )
+
+        self.vbo = ctx.buffer(reserve=num_points * 8)
+        self.state_buffer = ctx.buffer(reserve=num_points)
+        self.vao = ctx.vertex_array(
+            self.program,
+            [(self.vbo, "2f", "position"), (self.state_buffer, "1u1", "state")],
+        )
+
+        frame_size = width * height * 3
+        self._readback = [
+            ctx.buffer(reserve=frame_size) for _ in range(READBACK_BUFFERS)
+        ]
+        self._issued = 0  # Readbacks issued
+        self._collected = 0  # Readbacks collected
+
+    def draw(self, points: np.ndarray, states: np.ndarray, state: RenderState):
+        self.vbo.write(np.ascontiguousarray(points, dtype=np.float32))
+        self.state_buffer.write(np.ascontiguousarray(states, dtype=np.uint8))
+        self.fbo.use()
+        self.fbo.clear()
+        self.renderer.setup_uniforms(state)
+        self.vao.render(moderngl.POINTS, vertices=len(points))
+        if self.resolved_fbo is not self.fbo:
+            self.ctx.copy_framebuffer(self.resolved_fbo, self.fbo)
+
+        buffer = self._readback[self._issued % READBACK_BUFFERS]
+        self.resolved_fbo.read_into(buffer, components=3, alignment=1)
+        self._issued += 1
+
+    def collect(self, all_frames: bool = False) -> list[bytes]:
+        """Pixels of frames whose readback had time to finish, bottom row first"""
+        frames = []
+        keep_in_flight = 0 if all_frames else READBACK_BUFFERS - 1
+        while self._issued - self._collected > keep_in_flight:
+            frames.append(self._readback[self._collected % READBACK_BUFFERS].read())
+            self._collected += 1
+        return frames
+
+
+class VideoEncoder:
+    """Converts and writes frames in order on worker threads"""
+
+    def __init__(self, path: Path, fps: float, width: int, height: int, workers: int):
+        self.size = (width, height)
+        self.writer = cv2.VideoWriter(
+            path.as_posix(), cv2.VideoWriter_fourcc(*"mp4v"), fps, self.size
+        )
+        if not self.writer.isOpened():
+            raise RuntimeError(f"Failed to open {path} for writing")
+        self.converters = ThreadPoolExecutor(max_workers=workers)
+        self.frames: queue.Queue = queue.Queue(maxsize=MAX_QUEUED_FRAMES)
+        self.waits = 0  # Frames the render loop had to wait for a free queue slot
+        self.thread = threading.Thread(target=self._write)
+        self.thread.start()
+
+    def submit(self, pixels: bytes):
+        future = self.converters.submit(self._convert, pixels)
+        if self.frames.full():
+            self.waits += 1
+        self.frames.put(future)
+
+    def close(self):
+        self.frames.put(None)
+        self.thread.join()
+        self.converters.shutdown()
+        self.writer.release()
+
+    def _convert(self, pixels: bytes) -> np.ndarray:
+        width, height = self.size
+        image = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 3)
+        # OpenGL rows start at the bottom
+        return cv2.cvtColor(image[::-1], cv2.COLOR_RGB2BGR)
+
+    def _write(self):
+        while (future := self.frames.get()) is not None:
+            self.writer.write(future.result())
+
+
+def render_run(
+    core,
+    output: Path,
+    seconds: float,
+    fps: float,
+    width: int,
+    height: int,
+    software: bool = True,
+    workers: Optional[int] = None,
+    samples: int = OpenGLSettings.SAMPLES,
+) -> dict[str, float]:
+    """Render `seconds` of a simulation of `core` to `output`, returns timings"""
+    from frontend.core.simulation import Simulation, frame_milliseconds
+
+    workers = workers or os.cpu_count() or 1
+    num_points = (
+        len(core.population) if core.population is not None else core.args.num_points
+    )
+    ctx = create_offscreen_context(software)
+    renderer = OffscreenRenderer(ctx, width, height, num_points, samples)
+    encoder = VideoEncoder(output, fps, width, height, workers)
+    state_executor = ThreadPoolExecutor(max_workers=1)
+    simulation = Simulation(
+        core,
+        num_points,
+        width=width,
+        height=height,
+        state_executor=state_executor,
+    )
+    render_state = RenderState(
+        points=simulation.points,
+        states=simulation.states,
+        followed_cat_id=None,
+        zoom_factor=RenderingConstants.DEFAULT_ZOOM_FACTOR,
+        pan_offset=np.zeros(2),
+        point_radius=core.args.radius,
+        follow_radius=RenderingConstants.DEFAULT_FOLLOW_RADIUS,
+        use_texture=bool(core.args.use_texture),
+    )
+
+    frame_count = round(seconds * fps)
+    started_at = time.perf_counter()
+    try:
+        for frame in range(frame_count):
+            simulation.advance(frame_milliseconds(frame, fps))
+            renderer.draw(simulation.points, simulation.states, render_state)
+            for pixels in renderer.collect():
+                encoder.submit(pixels)
+        for pixels in renderer.collect(all_frames=True):
+            encoder.submit(pixels)
+        rendered_at = time.perf_counter()
+    finally:
+        encoder.close()
+        state_executor.shutdown()
+        ctx.release()
+    finished_at = time.perf_counter()
+
+    return {
+        "frames": frame_count,
+        "render_seconds": rendered_at - started_at,
+        "total_seconds": finished_at - started_at,
+        "realtime_factor": seconds / (finished_at - started_at),
+        "encoder_waits": encoder.waits,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render a headless run to a video file",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("output", type=Path, help="video file, e.g. run.mp4")
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--width", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=800)
+    parser.add_argument(
+        "--hardware",
+        action=argparse.BooleanOptionalAction,
+        help="use the GPU driver instead of software rasterization",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=OpenGLSettings.SAMPLES,
+        help="multisampling samples per pixel, 0 draws faster with software rasterization",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="frame conversion threads, all CPUs by default",
+    )
+    args, app_args = parser.parse_known_args()
+
+    from frontend.core.core import Core
+
+    core = Core([arg for arg in app_args if arg != "--"])
+    stats = render_run(
+        core,
+        args.output,
+        args.seconds,
+        args.fps,
+        args.width,
+        args.height,
+        software=args.hardware is None,
+        workers=args.workers,
+        samples=args.samples,
+    )
+    print(
+        f"{stats['frames']} frames written to {args.output} in {stats['total_seconds']:.1f} s "
+        f"({stats['realtime_factor']:.2f}x real time)"
+    )
+
+
+if __name__ == "__main__":
+    main()
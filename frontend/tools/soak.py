@@ -0,0 +1,405 @@
+"""Run the app or the headless simulation for a long time and fail if its resources keep growing.
+
+A scripted sequence of actions (resizes, speed changes, texture toggles, follow
+and unfollow, changes of the number of cats) is applied at a fixed interval,
+while the resident memory, live Python objects, OS threads and OpenGL buffers
+of the process are sampled. A line is fitted to every series after a warm-up,
+and the run fails if any of the slopes exceeds its limit.
+
+The headless target steps a `Simulation` with states calculated in the background
+and uploads its cats to `SharedPointBuffers` of an offscreen context, like the canvas
+does every frame. `--gui` drives `MainWindow` instead and needs a display.
+
+Run with `python -m frontend.tools.soak --help`, options after `--` are passed
+to the app, e.g. `python -m frontend.tools.soak --minutes 120 -- --num-points 100000`.
+"""
+
+import argparse
+import gc
+import os
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Optional, Protocol
+
+import moderngl
+import numpy as np
+
+# Seconds of a run the growth rates are not fitted to: buffers, caches and pools fill up first
+DEFAULT_WARMUP = 60.0
+
+
+@dataclass(frozen=True)
+class ResourceSample:
+    seconds: float
+    rss_bytes: int
+    python_objects: int
+    threads: int
+    gl_buffers: int
+
+
+@dataclass(frozen=True)
+class GrowthLimits:
+    """Growth of every sampled series per minute the run may have"""
+
+    rss_bytes: float = 2 * 1024 * 1024
+    python_objects: float = 500.0
+    threads: float = 0.1
+    gl_buffers: float = 0.1
+
+
+SAMPLED = [field.name for field in fields(ResourceSample)][1:]
+
+
+def rss_bytes() -> int:
+    """Resident memory of the process, the peak one where `/proc` is missing"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def thread_count() -> int:
+    """OS threads of the process, Python threads only where `/proc` is missing
+
+    Threads of Qt and of the OpenGL driver are not Python threads.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return threading.active_count()
+
+
+class GlBufferCounter:
+    """Counts buffer names alive in a context and all contexts sharing it
+
+    Buffers dropped without `release()` are never deleted by moderngl, so live
+    `moderngl.Buffer` objects are no measure: every name up to the highest
+    generated one is asked with `glIsBuffer` instead.
+    """
+
+    def __init__(self):
+        self.highest_name = 0
+
+    def count(self, ctx: moderngl.Context) -> int:
+        from OpenGL.GL import glIsBuffer
+
+        probe = ctx.buffer(reserve=4)
+        self.highest_name = max(self.highest_name, probe.glo)
+        probe.release()
+        return sum(1 for name in range(1, self.highest_name + 1) if glIsBuffer(name))
+
+
+class SoakTarget(Protocol):
+    # Names of the actions `apply` takes, applied in turn
+    actions: tuple[str, ...]
+
+    def run_for(self, seconds: float): ...
+
+    def apply(self, action: str): ...
+
+    def gl_buffers(self) -> int: ...
+
+    def close(self): ...
+
+
+class HeadlessTarget:
+    """`Simulation` with background states, drawn cats are uploaded to buffers of an offscreen context"""
+
+    actions: tuple[str, ...] = ("resize", "speed", "num_points", "fight_lines")
+
+    def __init__(self, core, num_points: int, ctx: Optional[moderngl.Context] = None):
+        from frontend.ui.shared_buffers import SharedPointBuffers
+
+        self.core = core
+        self.initial_num_points = num_points
+        self.num_points = num_points
+        self.size = (core.args.window_width, core.args.window_height)
+        self.speed = 1.0
+        self.fight_lines = False
+        self.state_executor = ThreadPoolExecutor(max_workers=1)
+        self.simulation = self._create_simulation()
+        self.ctx = ctx
+        self.buffers = (
+            SharedPointBuffers(ctx, *self._drawn()) if ctx is not None else None
+        )
+        self.counter = GlBufferCounter()
+
+    def _create_simulation(self):
+        from frontend.core.simulation import Simulation
+
+        return Simulation(
+            self.core,
+            self.num_points,
+            self.speed,
+            *self.size,
+            state_executor=self.state_executor,
+        )
+
+    def _drawn(self) -> tuple[np.ndarray, np.ndarray]:
+        return (
+            self.simulation.points.astype(np.float32),
+            self.simulation.states.astype(np.uint8),
+        )
+
+    def run_for(self, seconds: float):
+        finish_at = time.perf_counter() + seconds
+        while time.perf_counter() < finish_at:
+            self.simulation.step()
+            if self.buffers is None:
+                continue
+            points, states = self._drawn()
+            self.buffers.write_positions(points)
+            self.buffers.write_states(states)
+            if self.fight_lines:
+                # The backend world is not thread-safe, so interactions wait for
+                # the states calculated in the background, like in the canvas
+                interactions = self.state_executor.submit(
+                    self.core.calculate_interactions,
+                    self.simulation.points.copy(),
+                    *self.size,
+                    neighbor_counts=False,
+                    nearest_rivals=False,
+                ).result()
+                self.buffers.write_fight_pairs(interactions.fight_pairs)
+
+    def apply(self, action: str):
+        if action == "resize":
+            self.size = (self.size[1], self.size[0])
+            self.simulation.width, self.simulation.height = self.size
+        elif action == "speed":
+            self.speed = 2.0 if self.speed == 1.0 else 1.0
+            self.simulation.speed = self.speed
+        elif action == "num_points":
+            # Like the canvas, a new number of cats starts a new simulation
+            self.num_points = (
+                self.initial_num_points * 2
+                if self.num_points == self.initial_num_points
+                else self.initial_num_points
+            )
+            self.simulation = self._create_simulation()
+            if self.buffers is not None:
+                self.buffers.reallocate(*self._drawn())
+        elif action == "fight_lines":
+            self.fight_lines = not self.fight_lines
+            if not self.fight_lines and self.buffers is not None:
+                self.buffers.write_fight_pairs(np.empty((0, 2)))
+
+    def gl_buffers(self) -> int:
+        return self.counter.count(self.ctx) if self.ctx is not None else 0
+
+    def close(self):
+        self.state_executor.shutdown()
+        if self.ctx is not None:
+            self.ctx.release()
+
+
+class AppTarget:
+    """`MainWindow` of the app driven by its own event loop"""
+
+    actions: tuple[str, ...] = ("resize", "speed", "texture", "follow", "num_points")
+
+    def __init__(self, core):
+        from PyQt6.QtWidgets import QApplication
+
+        core._configure_qt()
+        self.app = QApplication(sys.argv[:1])
+        self.window = core._create_main_window()
+        self.window.show()
+        self.canvas = self.window.canvas
+        self.initial_size = (self.window.width(), self.window.height())
+        self.initial_num_points = self.canvas.num_points
+        self.counter = GlBufferCounter()
+
+    def run_for(self, seconds: float):
+        from PyQt6.QtCore import QEventLoop, QTimer
+
+        loop = QEventLoop()
+        QTimer.singleShot(round(seconds * 1000), loop.quit)
+        loop.exec()
+
+    def apply(self, action: str):
+        canvas = self.canvas
+        if action == "resize":
+            width, height = self.initial_size
+            if self.window.width() == width:
+                width += 100
+            self.window.resize(width, height)
+        elif action == "speed":
+            self.window.update_speed(300 if canvas.state.speed_factor == 1.0 else 200)
+        elif action == "texture":
+            self.window.toggle_use_texture(not canvas.use_texture)
+        elif action == "follow":
+            if canvas.state.followed_cat_id is None:
+                canvas.follow_cat(0)
+            else:
+                canvas.stop_following()
+        elif action == "num_points":
+            self.window.update_num_points(
+                self.initial_num_points * 2
+                if canvas.num_points == self.initial_num_points
+                else self.initial_num_points
+            )
+
+    def gl_buffers(self) -> int:
+        if getattr(self.canvas, "ctx", None) is None:
+            return 0
+        self.canvas.makeCurrent()
+        try:
+            return self.counter.count(self.canvas.ctx)
+        finally:
+            self.canvas.doneCurrent()
+
+    def close(self):
+        self.window.close()
+        self.app.processEvents()
+
+
+def take_sample(seconds: float, target: SoakTarget) -> ResourceSample:
+    # Garbage not collected yet is no leak
+    gc.collect()
+    return ResourceSample(
+        seconds=seconds,
+        rss_bytes=rss_bytes(),
+        python_objects=len(gc.get_objects()),
+        threads=thread_count(),
+        gl_buffers=target.gl_buffers(),
+    )
+
+
+def soak(
+    target: SoakTarget,
+    seconds: float,
+    action_interval: float,
+    sample_interval: float,
+    on_sample=None,
+) -> list[ResourceSample]:
+    """Run `target` for `seconds` applying its actions in turn, returns the samples"""
+    started_at = time.perf_counter()
+    samples = [take_sample(0.0, target)]
+    step = 0
+    next_action_at = action_interval
+    while (elapsed := time.perf_counter() - started_at) < seconds:
+        target.run_for(min(sample_interval, seconds - elapsed))
+        elapsed = time.perf_counter() - started_at
+        while elapsed >= next_action_at:
+            target.apply(target.actions[step % len(target.actions)])
+            step += 1
+            next_action_at += action_interval
+        samples.append(take_sample(elapsed, target))
+        if on_sample is not None:
+            on_sample(samples[-1])
+    return samples
+
+
+def growth_rates(
+    samples: list[ResourceSample], warmup: float = DEFAULT_WARMUP
+) -> dict[str, float]:
+    """Least squares slope of every sampled series per minute, samples of the warm-up are skipped"""
+    settled = [sample for sample in samples if sample.seconds >= warmup]
+    if len(settled) < 2:
+        return {name: 0.0 for name in SAMPLED}
+    minutes = np.array([sample.seconds for sample in settled]) / 60
+    return {
+        name: float(
+            np.polyfit(minutes, [getattr(sample, name) for sample in settled], 1)[0]
+        )
+        for name in SAMPLED
+    }
+
+
+def exceeded_limits(
+    rates: dict[str, float], limits: GrowthLimits = GrowthLimits()
+) -> list[str]:
+    """Names of the series growing faster than their limits"""
+    return [name for name in SAMPLED if rates[name] > getattr(limits, name)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the app for a long time and fail if its resources keep growing",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--minutes", type=float, default=30.0)
+    parser.add_argument(
+        "--gui",
+        action=argparse.BooleanOptionalAction,
+        help="drive the app window instead of the headless simulation",
+    )
+    parser.add_argument(
+        "--action-interval", type=float, default=5.0, help="seconds between actions"
+    )
+    parser.add_argument(
+        "--sample-interval", type=float, default=10.0, help="seconds between samples"
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=DEFAULT_WARMUP,
+        help="seconds not used for the growth rates",
+    )
+    defaults = GrowthLimits()
+    for name in SAMPLED:
+        parser.add_argument(
+            f"--max-{name.replace('_', '-')}-growth",
+            type=float,
+            default=getattr(defaults, name),
+            help=f"largest allowed growth of {name} per minute",
+        )
+    args, app_args = parser.parse_known_args()
+
+    from frontend.core.core import Core
+
+    core = Core([arg for arg in app_args if arg != "--"])
+    target: SoakTarget
+    if bool(args.gui):
+        target = AppTarget(core)
+    else:
+        from frontend.tools.render_video import create_offscreen_context
+
+        num_points = (
+            len(core.population)
+            if core.population is not None
+            else core.args.num_points
+        )
+        target = HeadlessTarget(core, num_points, create_offscreen_context())
+
+    print(f"{'seconds':>8}{'rss MiB':>10}{'objects':>10}{'threads':>9}{'buffers':>9}")
+    try:
+        samples = soak(
+            target,
+            args.minutes * 60,
+            args.action_interval,
+            args.sample_interval,
+            on_sample=lambda sample: print(
+                f"{sample.seconds:>8.0f}{sample.rss_bytes / 2**20:>10.1f}"
+                f"{sample.python_objects:>10}{sample.threads:>9}{sample.gl_buffers:>9}"
+            ),
+        )
+    finally:
+        target.close()
+
+    rates = growth_rates(samples, args.warmup)
+    limits = GrowthLimits(
+        **{name: getattr(args, f"max_{name}_growth") for name in SAMPLED}
+    )
+    exceeded = exceeded_limits(rates, limits)
+    for name in SAMPLED:
+        verdict = "FAIL" if name in exceeded else "ok"
+        print(
+            f"{name:<16}{rates[name]:>14.1f}/min  limit {getattr(limits, name):g}  {verdict}"
+        )
+    if exceeded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measure cold start of the headless core: from process launch to the first computed state.
+
+Run with `python -m frontend.tools.startup_benchmark`.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from frontend.core.backend import BACKEND_MODE_ENV
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+
+CHILD_SCRIPT = """
+import sys, time
+started_at = time.perf_counter()
+from frontend.core.core import Core
+imported_at = time.perf_counter()
+core = Core([])
+created_at = time.perf_counter()
+num_points = int(sys.argv[1])
+core.update_states(num_points, Core.generate_points(num_points, 1.0), 1000, 800)
+computed_at = time.perf_counter()
+print(imported_at - started_at, created_at - imported_at, computed_at - created_at)
+"""
+
+
+def measure(mode: str, num_points: int) -> tuple[float, list[float]]:
+    """Run a fresh interpreter and return its total wall time and internal stage times"""
+    env = {**os.environ, BACKEND_MODE_ENV: mode}
+    started_at = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, str(num_points)],
+        cwd=ROOT_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    wall_time = time.perf_counter() - started_at
+    return wall_time, [float(value) for value in output.split()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure cold start to the first computed state",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--runs", type=int, default=5, help="runs per backend mode")
+    parser.add_argument("--num-points", type=int, default=500, help="number of cats")
+    args = parser.parse_args()
+
+    print(f"{'mode':<6}{'total':>10}{'import':>10}{'init':>10}{'first state':>14}")
+    for mode in ("api", "abi"):
+        try:
+            runs = [measure(mode, args.num_points) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{mode:<6}failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        total = statistics.median(wall_time for wall_time, _ in runs)
+        stages = [statistics.median(stage) for stage in zip(*(s for _, s in runs))]
+        print(
+            f"{mode:<6}{total * 1000:>8.1f}ms"
+            + "".join(f"{stage * 1000:>8.1f}ms" for stage in stages[:2])
+            + f"{stages[2] * 1000:>12.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
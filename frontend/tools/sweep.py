@@ -0,0 +1,203 @@
+"""Run the headless simulation over a grid of parameters in a process pool.
+
+Every configuration is run for a fixed number of ticks (state updates) and saved
+to its own `.npz` file with per-tick fractions of calm, hissing and fighting cats
+and per-tick calculation times. Configurations with an existing file are skipped,
+so an interrupted sweep continues where it stopped. `summary.csv` with one row
+per configuration is rewritten from all files at the end.
+
+Run with `python -m frontend.tools.sweep --help`.
+"""
+
+import argparse
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from frontend.core.population import SCENARIOS
+
+SUMMARY_FILE = "summary.csv"
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    num_points: int
+    fight_radius: float
+    hiss_radius: float
+    speed: float
+    ticks: int
+    width: int = 1000
+    height: int = 800
+    scenario: str = "uniform"
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return (
+            f"n{self.num_points}_f{self.fight_radius:g}_h{self.hiss_radius:g}"
+            f"_s{self.speed:g}_t{self.ticks}_w{self.width}x{self.height}"
+            f"_{self.scenario}_seed{self.seed}"
+        )
+
+
+def make_configs(
+    num_points: Iterable[int],
+    fight_radii: Iterable[float],
+    hiss_radii: Iterable[float],
+    speeds: Iterable[float],
+    ticks: int,
+    width: int = 1000,
+    height: int = 800,
+    scenario: str = "uniform",
+    seed: int = 0,
+) -> list[SweepConfig]:
+    """Cartesian product of the parameters, skipping fight radii not less than hiss radii"""
+    return [
+        SweepConfig(n, fight, hiss, speed, ticks, width, height, scenario, seed)
+        for n, fight, hiss, speed in itertools.product(
+            num_points, fight_radii, hiss_radii, speeds
+        )
+        if fight < hiss
+    ]
+
+
+def run_config(config: SweepConfig, output_dir: Path) -> Path:
+    """Run a single configuration and save its time series, returns the result file"""
+    from frontend.core.core import Core
+    from frontend.core.simulation import Simulation
+
+    # Configurations with the same seed start from the same positions and get the same random draws
+    core = Core(["--seed", str(config.seed), "--scenario", config.scenario])
+    points = core.initial_points(config.num_points, 1.0)
+    # Radii of the sweep are not limited to integers like the command line options
+    core.lib.drunk_cats_configure(config.fight_radius, config.hiss_radius)
+    simulation = Simulation(
+        core, config.num_points, config.speed, config.width, config.height, points
+    )
+
+    fractions = np.empty((config.ticks, 3), dtype=np.float64)
+    seconds = np.empty(config.ticks, dtype=np.float64)
+    for tick in range(config.ticks):
+        simulation.step()
+        fractions[tick] = simulation.state_fractions()
+        seconds[tick] = simulation.last_step_seconds
+
+    # Written under a temporary name first, so an interrupted run never looks finished
+    path = output_dir / f"{config.name}.npz"
+    temporary_path = output_dir / f"{config.name}.partial.npz"
+    with open(temporary_path, mode="wb") as f:
+        np.savez(
+            f,
+            fractions=fractions,
+            seconds=seconds,
+            **{key: np.array(value) for key, value in asdict(config).items()},
+        )
+    os.replace(temporary_path, path)
+    return path
+
+
+def pending_configs(configs: list[SweepConfig], output_dir: Path) -> list[SweepConfig]:
+    return [c for c in configs if not (output_dir / f"{c.name}.npz").exists()]
+
+
+def run_sweep(
+    configs: list[SweepConfig], output_dir: Path, workers: Optional[int] = None
+) -> list[SweepConfig]:
+    """Run configurations without results in a process pool, returns the configurations run"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    pending = pending_configs(configs, output_dir)
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for path in executor.map(run_config, pending, itertools.repeat(output_dir)):
+                print(f"finished {path.name}")
+    write_summary(output_dir)
+    return pending
+
+
+def write_summary(output_dir: Path):
+    """Write one row of aggregate statistics per finished configuration"""
+    fields = list(SweepConfig.__dataclass_fields__)
+    rows = []
+    for path in sorted(output_dir.glob("*.npz")):
+        if path.name.endswith(".partial.npz"):
+            continue
+        with np.load(path) as data:
+            fractions, seconds = data["fractions"], data["seconds"]
+            rows.append(
+                {
+                    **{field: data[field].item() for field in fields},
+                    "calm": fractions[:, 0].mean(),
+                    "hisses": fractions[:, 1].mean(),
+                    "wants_to_fight": fractions[:, 2].mean(),
+                    "tick_mean_ms": seconds.mean() * 1000,
+                    "tick_p50_ms": np.percentile(seconds, 50) * 1000,
+                    "tick_p95_ms": np.percentile(seconds, 95) * 1000,
+                }
+            )
+
+    with open(output_dir / SUMMARY_FILE, mode="w", newline="") as f:
+        writer = csv.DictWriter(
+            f,
+            fieldnames=fields
+            + [
+                "calm",
+                "hisses",
+                "wants_to_fight",
+                "tick_mean_ms",
+                "tick_p50_ms",
+                "tick_p95_ms",
+            ],
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the simulation over a grid of parameters",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--num-points", type=int, nargs="+", default=[500])
+    parser.add_argument("--fight-radius", type=float, nargs="+", default=[15.0])
+    parser.add_argument("--hiss-radius", type=float, nargs="+", default=[30.0])
+    parser.add_argument(
+        "--speed", type=float, nargs="+", default=[1.0], help="speed factors"
+    )
+    parser.add_argument(
+        "--ticks", type=int, default=100, help="state updates per configuration"
+    )
+    parser.add_argument("--window-width", type=int, default=1000)
+    parser.add_argument("--window-height", type=int, default=800)
+    parser.add_argument("--scenario", choices=list(SCENARIOS), default="uniform")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes, all CPUs by default"
+    )
+    parser.add_argument("--output", type=Path, default=Path("sweep-results"))
+    args = parser.parse_args()
+
+    configs = make_configs(
+        args.num_points,
+        args.fight_radius,
+        args.hiss_radius,
+        args.speed,
+        args.ticks,
+        args.window_width,
+        args.window_height,
+        args.scenario,
+        args.seed,
+    )
+    skipped = len(configs) - len(pending_configs(configs, args.output))
+    print(f"{len(configs)} configurations, {skipped} already finished")
+    run_sweep(configs, args.output, args.workers)
+    print(f"summary written to {args.output / SUMMARY_FILE}")
+
+
+if __name__ == "__main__":
+    main()
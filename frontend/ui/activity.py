@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Activity:
+    name: str
+    paints: bool  # Frames are painted and positions are uploaded
+    throttled: bool  # Timers run `slowdown` times less often
+
+
+# The window is shown and active
+FOREGROUND = Activity("foreground", True, False)
+# The window is shown, but another one is active
+BACKGROUND = Activity("background", True, True)
+# The window is minimized or, where the window system reports it, fully covered
+HIDDEN = Activity("hidden", False, True)
+
+
+def window_activity(exposed: bool, active: bool) -> Activity:
+    if not exposed:
+        return HIDDEN
+    return FOREGROUND if active else BACKGROUND
+
+
+class BackgroundThrottle:
+    """Rates of the canvas timers for the activity of its window
+
+    Throttled position updates are merged into `slowdown` times larger steps,
+    so the cats keep their speed, and state and target updates run `slowdown` times less often.
+    """
+
+    def __init__(self, slowdown: float):
+        if not slowdown >= 1:
+            raise ValueError(f"Expected a slowdown of at least 1, got {slowdown}")
+        self.slowdown = slowdown
+        self.activity = FOREGROUND
+
+    @property
+    def factor(self) -> float:
+        return self.slowdown if self.activity.throttled else 1.0
+
+    def set_activity(self, activity: Activity) -> bool:
+        """Returns whether the activity changed"""
+        changed = activity != self.activity
+        self.activity = activity
+        return changed
+
+    def position_substeps(self, substeps: int) -> int:
+        """Position updates merged into a single step, `substeps` of the quality level when not throttled"""
+        return max(1, round(substeps * self.factor))
+
+    def timer_interval(self, interval_ms: int) -> int:
+        """Milliseconds between state or target updates, `interval_ms` when not throttled"""
+        return max(1, round(interval_ms * self.factor))
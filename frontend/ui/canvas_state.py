@@ -2,6 +2,8 @@ from dataclasses import dataclass, field
 import numpy as np
 from typing import Optional
 
+from frontend.core.world import Rect
+
 
 @dataclass
 class CanvasState:
@@ -17,3 +19,13 @@ class CanvasState:
         self.zoom_factor = 1.0
         self.pan_offset = np.array([0.0, 0.0], dtype=np.float64)
         self.followed_cat_id = None
+
+    def visible_rect(self) -> Rect:
+        """Visible part of the scene in the OpenGL coordinate system"""
+        half_extent = 1.0 / self.zoom_factor
+        return Rect(
+            -half_extent - self.pan_offset[0],
+            -half_extent - self.pan_offset[1],
+            half_extent - self.pan_offset[0],
+            half_extent - self.pan_offset[1],
+        )
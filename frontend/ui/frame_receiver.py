@@ -0,0 +1,59 @@
+import threading
+from typing import Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from frontend.core.frame_stream import Frame, FrameDecoder, connect, without_diff
+
+
+class FrameReceiver(QObject):
+    """Reads frames of a `--serve` instance in a background thread
+
+    Only the newest frame is kept: a frame that the UI hasn't taken yet is replaced
+    by the next one, which then becomes a key frame, since its diff doesn't cover
+    the replaced frame.
+    """
+
+    # A frame is ready to be taken with `take_frame`
+    frame_received = pyqtSignal()
+    # The stream ended or failed, with the reason
+    disconnected = pyqtSignal(str)
+
+    def __init__(self, address: str):
+        super().__init__()
+        self.address = address
+        self.received_frames = 0
+        self.dropped_frames = 0
+        self._frame: Optional[Frame] = None
+        self._lock = threading.Lock()
+        # Daemon thread, so a blocking read never delays closing the app
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def take_frame(self) -> Optional[Frame]:
+        with self._lock:
+            frame, self._frame = self._frame, None
+        return frame
+
+    def _run(self):
+        try:
+            with connect(self.address) as sock, sock.makefile("rb") as stream:
+                decoder = FrameDecoder()
+                while (frame := decoder.read(stream)) is not None:
+                    self._offer(frame)
+            self.disconnected.emit("stream ended")
+        except (OSError, ValueError) as error:
+            self.disconnected.emit(str(error))
+
+    def _offer(self, frame: Frame):
+        with self._lock:
+            self.received_frames += 1
+            is_pending = self._frame is not None
+            if is_pending:
+                self.dropped_frames += 1
+                frame = without_diff(frame)
+            self._frame = frame
+        if not is_pending:
+            self.frame_received.emit()
@@ -0,0 +1,87 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    name: str
+    use_texture: bool  # Cat sprites if enabled by the user, colored dots otherwise
+    multisample: bool
+    point_stride: int  # Every `point_stride`-th cat is drawn
+    position_substeps: int  # Position updates merged into a single larger step
+
+
+# Quality levels from the best to the cheapest one
+QUALITY_LEVELS = (
+    QualityLevel("full", True, True, 1, 1),
+    QualityLevel("dots", False, True, 1, 1),
+    QualityLevel("no MSAA", False, False, 1, 1),
+    QualityLevel("1/2 of cats", False, False, 2, 1),
+    QualityLevel("1/4 of cats", False, False, 4, 1),
+    QualityLevel("1/4 of cats, half-rate motion", False, False, 4, 2),
+)
+
+
+class FrameRateGovernor:
+    """Steps through quality levels to keep the frame rate at the target
+
+    Both directions are decided on the median frame cost of the last `window` frames:
+    frame intervals stay at the budget while the frame rate is bound by vsync or
+    the timer, so only the cost tells how much of the budget is used. Quality drops
+    when the cost leaves less than `tolerance` of the budget unused, and recovers
+    once it has left at least half of the budget unused for `recovery_windows`
+    windows in a row. After every change the governor waits for a full window.
+    """
+
+    def __init__(
+        self,
+        target_fps: float,
+        window: int = 30,
+        tolerance: float = 0.1,
+        recovery_windows: int = 3,
+        levels: tuple[QualityLevel, ...] = QUALITY_LEVELS,
+    ):
+        self.frame_budget = 1.0 / target_fps
+        self.window = window
+        self.tolerance = tolerance
+        self.recovery_windows = recovery_windows
+        self.levels = levels
+        self.level_index = 0
+        self._costs: deque[float] = deque(maxlen=window)
+        self._idle_windows = 0
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.levels[self.level_index]
+
+    def record_frame(self, cost: float) -> Optional[QualityLevel]:
+        """Record time spent on a frame, returns a new level if changed"""
+        self._costs.append(cost)
+        if len(self._costs) < self.window:
+            return None
+
+        median_cost = np.median(self._costs)
+        if median_cost > self.frame_budget * (1 - self.tolerance):
+            return self._change_level(1)
+        if median_cost >= self.frame_budget / 2:
+            self._idle_windows = 0
+            return None
+
+        # Windows with headroom are counted without overlapping
+        self._costs.clear()
+        self._idle_windows += 1
+        if self._idle_windows < self.recovery_windows:
+            return None
+        return self._change_level(-1)
+
+    def _change_level(self, step: int) -> Optional[QualityLevel]:
+        index = min(max(self.level_index + step, 0), len(self.levels) - 1)
+        if index == self.level_index:
+            return None
+        self.level_index = index
+        self._costs.clear()
+        self._idle_windows = 0
+        return self.level
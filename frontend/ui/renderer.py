@@ -1,8 +1,20 @@
 from dataclasses import dataclass
+from pathlib import Path
 import numpy as np
 import moderngl
 from typing import *
 
+# Cat sprites by state
+TEXTURE_PATHS = {
+    0: Path(__file__).parent.parent.parent / "data" / "calm_cat.png",
+    1: Path(__file__).parent.parent.parent / "data" / "angry_cat.png",
+    2: Path(__file__).parent.parent.parent / "data" / "fight_cat.png",
+}
+
+
+# Color of the lines between fighting cats
+FIGHT_LINE_COLOR = (1.0, 0.3, 0.3, 0.8)
+
 
 @dataclass
 class RenderState:
@@ -14,6 +26,8 @@ class RenderState:
     point_radius: float
     follow_radius: float
     use_texture: bool
+    # Movement by the velocities since the positions were written to the buffers
+    motion_time: float = 0.0
 
 
 class PointRenderer:
@@ -32,6 +46,7 @@ class PointRenderer:
         self.shader_program["pointRadius"].value = state.point_radius
         self.shader_program["zoom"].value = float(state.zoom_factor)
         self.shader_program["panOffset"].value = tuple(state.pan_offset)
+        self.shader_program["motionTime"].value = float(state.motion_time)
         self.shader_program["useTexture"].value = state.use_texture
         self.shader_program["highlightedIndex"].value = (
             state.followed_cat_id if state.followed_cat_id is not None else -1
@@ -52,3 +67,16 @@ class PointRenderer:
             visible_indices = distances <= state.follow_radius
             return state.points[visible_indices], state.states[visible_indices]
         return state.points, state.states
+
+
+@no_type_check
+def setup_line_uniforms(
+    program: moderngl.Program,
+    state: RenderState,
+    color: tuple[float, float, float, float],
+):
+    """Uniforms of the line program: the camera of the render state and the color"""
+    program["zoom"].value = float(state.zoom_factor)
+    program["panOffset"].value = tuple(state.pan_offset)
+    program["motionTime"].value = float(state.motion_time)
+    program["color"].value = color
@@ -1,21 +1,23 @@
 VERTEX_SHADER = """
 #version 410 core
 
-in vec2 position; // Point position
-in int state; // Point state (0, 1, or 2)
-in int index;
-flat out int fragState; // Pass state to fragment shader
+in vec2 position; // Point position when the buffers were written
+in vec2 velocity; // Movement per unit of motionTime
+in uint state; // Point state (0, 1, or 2)
+flat out uint fragState; // Pass state to fragment shader
 flat out int fragIndex;
 uniform float pointRadius;
 uniform float zoom;
 uniform vec2 panOffset;
+uniform float motionTime; // Motion since the positions were written, 0 unless moved here
 uniform int highlightedIndex; // Index of the highlighted point
 
 void main() {
     gl_PointSize = pointRadius * 2.0 * zoom;
-    gl_Position = vec4((position + panOffset) * zoom, 0.0, 1.0); // Output requires vec4(float)
+    vec2 current = position + velocity * motionTime;
+    gl_Position = vec4((current + panOffset) * zoom, 0.0, 1.0); // Output requires vec4(float)
     fragState = state; // Pass state to fragment shader
-    fragIndex = index;
+    fragIndex = gl_VertexID; // Vertices are drawn in the order of cats
 }
 """
 
@@ -23,7 +25,7 @@ FRAGMENT_SHADER = """
 #version 410 core
 
 flat in int fragIndex;
-flat in int fragState; // State passed from vertex shader
+flat in uint fragState; // State passed from vertex shader
 uniform sampler2D stateTexture0;
 uniform sampler2D stateTexture1;
 uniform sampler2D stateTexture2;
@@ -51,11 +53,11 @@ void main() {
         coord = gl_PointCoord;
         starCoord = 2.0 * gl_PointCoord - 1.0;
 
-         if (fragState == 0) {
+         if (fragState == 0u) {
             fragColor = texture(stateTexture0, coord);
-        } else if (fragState == 1) {
+        } else if (fragState == 1u) {
             fragColor = texture(stateTexture1, coord);
-        } else if (fragState == 2) {
+        } else if (fragState == 2u) {
             fragColor = texture(stateTexture2, coord);
         }
     } else {
@@ -67,11 +69,11 @@ void main() {
             }
 
         // Color based on state
-        if (fragState == 0) {
+        if (fragState == 0u) {
             fragColor = vec4(0.0, 0.7, 1.0, 1.0); // Blue
-        } else if (fragState == 1) {
+        } else if (fragState == 1u) {
             fragColor = vec4(0.0, 1.0, 0.0, 1.0); // Green
-        } else if (fragState == 2) {
+        } else if (fragState == 2u) {
             fragColor = vec4(1.0, 0.0, 0.0, 1.0); // Red
         }
     }
@@ -84,3 +86,30 @@ void main() {
     }
 }
 """
+
+# Single-color lines in world coordinates: fight lines and the viewport outline on the minimap
+LINE_VERTEX_SHADER = """
+#version 410 core
+
+in vec2 position;
+in vec2 velocity; // Fight lines move with the cats, the viewport outline has no velocity
+uniform float zoom;
+uniform vec2 panOffset;
+uniform float motionTime;
+
+void main() {
+    vec2 current = position + velocity * motionTime;
+    gl_Position = vec4((current + panOffset) * zoom, 0.0, 1.0);
+}
+"""
+
+LINE_FRAGMENT_SHADER = """
+#version 410 core
+
+uniform vec4 color;
+out vec4 fragColor;
+
+void main() {
+    fragColor = color;
+}
+"""
@@ -0,0 +1,121 @@
+from typing import Optional
+
+import moderngl
+import numpy as np
+
+from frontend.core.interactions import FIGHT_PAIR_DTYPE
+
+# Bytes of a pair of indices in the fight line buffer
+FIGHT_PAIR_SIZE = 2 * np.dtype(FIGHT_PAIR_DTYPE).itemsize
+
+
+class SharedPointBuffers:
+    """Position, state and fight line buffers of the drawn cats, shared by all views of a simulation
+
+    The buffers are created and written by the canvas that runs the simulation,
+    once per frame. Contexts of all `QOpenGLWidget`s are shared
+    (`AA_ShareOpenGLContexts`), so any view binds the same buffers to a vertex
+    array of its own context: vertex arrays are containers and are never shared.
+    A moderngl buffer belongs to the context that created it, so vertex arrays are
+    built from wrappers of the shared GL names made by the context of the view.
+    Fight lines index the position buffer, so they follow the cats with no uploads.
+    Velocities move the cats in the vertex shaders by the `motionTime` uniform,
+    they are zero unless positions are interpolated on the GPU.
+    """
+
+    def __init__(
+        self,
+        ctx: moderngl.Context,
+        points: np.ndarray,
+        states: np.ndarray,
+        velocities: Optional[np.ndarray] = None,
+    ):
+        self.positions = ctx.buffer(points)
+        self.velocities = ctx.buffer(_velocities_like(points, velocities))
+        self.states = ctx.buffer(states)
+        self.vertex_count = len(states)
+        # Pairs of indices of the drawn cats, drawn as lines
+        self.fight_pairs = ctx.buffer(reserve=FIGHT_PAIR_SIZE)
+        self.fight_pair_count = 0
+
+    def vertex_array(
+        self, ctx: moderngl.Context, program: moderngl.Program
+    ) -> moderngl.VertexArray:
+        """Vertex array of `ctx` reading the shared buffers"""
+        return ctx.vertex_array(
+            program,
+            [
+                (_wrap(ctx, self.positions), "2f", "position"),
+                (_wrap(ctx, self.velocities), "2f", "velocity"),
+                (_wrap(ctx, self.states), "1u1", "state"),
+            ],
+        )
+
+    def line_vertex_array(
+        self, ctx: moderngl.Context, program: moderngl.Program
+    ) -> moderngl.VertexArray:
+        """Vertex array of `ctx` drawing the fight lines, `program` reads no states"""
+        return ctx.vertex_array(
+            program,
+            [
+                (_wrap(ctx, self.positions), "2f", "position"),
+                (_wrap(ctx, self.velocities), "2f", "velocity"),
+            ],
+            index_buffer=_wrap(ctx, self.fight_pairs),
+            index_element_size=4,
+        )
+
+    def write_positions(self, points: np.ndarray):
+        self.positions.write(points)
+
+    def write_velocities(self, velocities: np.ndarray):
+        self.velocities.write(np.ascontiguousarray(velocities, dtype=np.float32))
+
+    def write_states(self, states: np.ndarray, offset: int = 0):
+        """Write states of the cats starting with the cat `offset`"""
+        self.states.write(states, offset=offset)
+
+    def reallocate(
+        self,
+        points: np.ndarray,
+        states: np.ndarray,
+        velocities: Optional[np.ndarray] = None,
+    ):
+        """Replace the contents, the number of drawn cats may change
+
+        Orphaning keeps the names of the buffers, so the vertex arrays of all
+        views stay valid.
+        """
+        velocities = _velocities_like(points, velocities)
+        self.positions.orphan(points.nbytes)
+        self.velocities.orphan(velocities.nbytes)
+        self.states.orphan(states.nbytes)
+        self.positions.write(points)
+        self.velocities.write(velocities)
+        self.states.write(states)
+        self.vertex_count = len(states)
+
+    def write_fight_pairs(self, pairs: np.ndarray):
+        """Replace the fight lines with `(K, 2)` indices of the drawn cats"""
+        pairs = np.ascontiguousarray(pairs, dtype=FIGHT_PAIR_DTYPE)
+        if pairs.nbytes > self.fight_pairs.size:
+            self.fight_pairs.orphan(pairs.nbytes)
+        if len(pairs) > 0:
+            self.fight_pairs.write(pairs)
+        self.fight_pair_count = len(pairs)
+
+
+def _wrap(ctx: moderngl.Context, buffer: moderngl.Buffer) -> moderngl.Buffer:
+    """Buffer of `ctx` with the GL name of a shared buffer, it is never released
+
+    Only the name is bound to vertex arrays, so the size may get outdated by orphaning.
+    """
+    return ctx.external_buffer(buffer.glo, buffer.size)
+
+
+def _velocities_like(
+    points: np.ndarray, velocities: Optional[np.ndarray]
+) -> np.ndarray:
+    if velocities is None:
+        return np.zeros((len(points), 2), dtype=np.float32)
+    return np.ascontiguousarray(velocities, dtype=np.float32)
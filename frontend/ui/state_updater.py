@@ -1,19 +1,58 @@
-from PyQt6.QtCore import QObject, pyqtSignal
+import time
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 import numpy as np
-from typing import Protocol
+from typing import Optional, Protocol
+
+from frontend.core.aggregate import StateGrid
+from frontend.core.history import StateHistory
+from frontend.core.interactions import Interactions
+from frontend.core.profiler import trace_span
+from frontend.core.state_diff import StateDiff
+from frontend.core.world import Rect
 
 
 class Core(Protocol):
     def update_states(
-        self, num_points: int, points: np.ndarray, width: int, height: int
+        self,
+        num_points: int,
+        points: np.ndarray,
+        width: int,
+        height: int,
+        states: Optional[np.ndarray] = None,
+        visible_rect: Optional[Rect] = None,
+        tick: int = 0,
     ) -> np.ndarray: ...
 
+    def calculate_interactions(
+        self,
+        points: np.ndarray,
+        width: int,
+        height: int,
+        neighbor_counts: bool = True,
+        nearest_rivals: bool = True,
+    ) -> Interactions: ...
+
 
 class UpdateStatesWorker(QObject):
-    finished = pyqtSignal(np.ndarray)
+    # New states, their `StateDiff` from the given states (`None` if the number of cats differs),
+    # and the `time.perf_counter()` moment they were emitted at
+    finished = pyqtSignal(np.ndarray, object, float)
+    # `(K, 2)` indices of the fighting cats, emitted before `finished` if fight lines are shown
+    fight_pairs_found = pyqtSignal(np.ndarray)
 
     def __init__(
-        self, core: Core, num_points: int, points: np.ndarray, width: int, height: int
+        self,
+        core: Core,
+        num_points: int,
+        points: np.ndarray,
+        width: int,
+        height: int,
+        states: Optional[np.ndarray] = None,
+        visible_rect: Optional[Rect] = None,
+        tick: int = 0,
+        history: Optional[StateHistory] = None,
+        state_grid: Optional[StateGrid] = None,
+        fight_lines: bool = False,
     ):
         super().__init__()
         self.core = core
@@ -21,9 +60,45 @@ class UpdateStatesWorker(QObject):
         self.points = points
         self.width = width
         self.height = height
+        self.states = states
+        self.visible_rect = visible_rect
+        self.tick = tick
+        self.history = history
+        self.state_grid = state_grid
+        self.fight_lines = fight_lines
 
+    @pyqtSlot()
     def run(self):
-        states = self.core.update_states(
-            self.num_points, self.points, self.width, self.height
-        )
-        self.finished.emit(states)
+        with trace_span("worker.run"):
+            if self.fight_lines:
+                # Pairs are found in the same backend pass as the states of all cats
+                interactions = self.core.calculate_interactions(
+                    self.points,
+                    self.width,
+                    self.height,
+                    neighbor_counts=False,
+                    nearest_rivals=False,
+                )
+                states = interactions.states
+                assert interactions.fight_pairs is not None
+                self.fight_pairs_found.emit(interactions.fight_pairs)
+            else:
+                states = self.core.update_states(
+                    self.num_points,
+                    self.points,
+                    self.width,
+                    self.height,
+                    self.states,
+                    self.visible_rect,
+                    self.tick,
+                )
+            if self.history is not None:
+                self.history.push(states)
+            if self.state_grid is not None:
+                self.state_grid.update(self.points, states)
+            diff = (
+                StateDiff.between(self.states, states)
+                if self.states is not None and len(self.states) == len(states)
+                else None
+            )
+        self.finished.emit(states, diff, time.perf_counter())
@@ -1,4 +1,7 @@
+import math
 from functools import partial
+from pathlib import Path
+from typing import Optional
 from PyQt6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -9,10 +12,36 @@ from PyQt6.QtWidgets import (
     QSizePolicy,
     QCheckBox,
     QHBoxLayout,
+    QStatusBar,
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QEvent, QObject, Qt, QTimer
+from PyQt6.QtGui import QCloseEvent, QHideEvent, QShowEvent
+from frontend.constants import UpdateIntervals
+from frontend.ui.activity import window_activity
 from frontend.ui.widgets.moving_points_canvas import MovingPointsCanvas
+from frontend.ui.widgets.scene_view import FollowView, Minimap
+from frontend.core.checkpoint import DEFAULT_PATH as DEFAULT_CHECKPOINT_PATH
+from frontend.core.checkpoint import Checkpoint
 from frontend.core.protocol import Core
+from frontend.core.metrics import metrics
+
+# Stages shown in the status bar
+STATUS_BAR_STAGES = (
+    "backend.total",
+    "backend.neighbor_search",
+    "backend.fight_pass",
+    "backend.hiss_pass",
+    "core.scheduled_update",
+    "core.result_copy",
+    "ui.worker_handoff",
+    "ui.buffer_upload",
+    "ui.state_upload",
+    "ui.paint_gl",
+    "states.staleness",
+)
+STATUS_BAR_UPDATE_INTERVAL = 500  # milliseconds
+STATE_NAMES = ("calm", "hissing", "fighting")
+CHECKPOINT_MESSAGE_TIMEOUT = 5000  # milliseconds
 
 
 class MainWindow(QMainWindow):
@@ -24,6 +53,18 @@ class MainWindow(QMainWindow):
         width: int,
         height: int,
         core: Core,
+        show_stats: bool = False,
+        target_staleness: Optional[float] = None,
+        target_fps: Optional[float] = None,
+        history_ticks: int = 0,
+        connect_address: Optional[str] = None,
+        checkpoint_path: Path = DEFAULT_CHECKPOINT_PATH,
+        checkpoint: Optional[Checkpoint] = None,
+        show_follow_view: bool = False,
+        show_minimap: bool = False,
+        fight_lines: bool = False,
+        gpu_motion: bool = False,
+        background_slowdown: float = UpdateIntervals.BACKGROUND_SLOWDOWN,
     ):
         super().__init__()
         self.resize(width, height)
@@ -32,13 +73,29 @@ class MainWindow(QMainWindow):
 
         self.num_points = num_points
         self.use_texture = use_texture
+        self.show_stats = show_stats
+        self.target_staleness = target_staleness
+        self.target_fps = target_fps
+        self.history_ticks = history_ticks
+        self.connect_address = connect_address
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint = checkpoint
+        self.show_follow_view = show_follow_view
+        self.show_minimap = show_minimap
+        self.fight_lines = fight_lines
+        self.gpu_motion = gpu_motion
+        self.background_slowdown = background_slowdown
         self.main_widget = QWidget()
         self.control_layout = QVBoxLayout()
 
         self._init_controls(num_points)
         self._init_canvas(point_radius, num_points, use_texture)
+        self._init_views()
         self._setup_layout()
         self._connect_signals()
+        self._init_status_bar()
+        if checkpoint is not None:
+            self.on_checkpoint_restored()
 
     def _init_controls(self, num_points: int):
         """Initialize control elements of the GUI"""
@@ -46,7 +103,7 @@ class MainWindow(QMainWindow):
 
         self.num_points_label = QLabel("Number of Points:")
         self.num_points_input = QSpinBox()
-        self.num_points_input.setRange(1, 1000000)
+        self.num_points_input.setRange(1, max(1000000, num_points))
         self.num_points_input.setValue(num_points)
 
         self.speed_label = QLabel("Speed:")
@@ -62,6 +119,28 @@ class MainWindow(QMainWindow):
         self.cursor_push_checkbox.setChecked(False)
         self.cursor_push_checkbox.stateChanged.connect(self.toggle_cursor_push)
 
+        self.stats_checkbox = QCheckBox("Show Stats")
+        self.stats_checkbox.setChecked(self.show_stats)
+        self.stats_checkbox.stateChanged.connect(self.toggle_show_stats)
+
+        self.fight_lines_checkbox = QCheckBox("Show Fight Lines")
+        self.fight_lines_checkbox.setChecked(self.fight_lines)
+        self.fight_lines_checkbox.stateChanged.connect(self.toggle_fight_lines)
+
+        self.follow_view_checkbox = QCheckBox("Show Follow View")
+        self.follow_view_checkbox.setChecked(self.show_follow_view)
+        self.follow_view_checkbox.stateChanged.connect(self.toggle_follow_view)
+
+        self.minimap_checkbox = QCheckBox("Show Minimap")
+        self.minimap_checkbox.setChecked(self.show_minimap)
+        self.minimap_checkbox.stateChanged.connect(self.toggle_minimap)
+
+        self.quality_label = QLabel("Quality: full")
+        self.quality_label.setVisible(self.target_fps is not None)
+
+        self.state_counts_label = QLabel()
+        self.state_counts_label.setVisible(self.show_stats)
+
     def _init_canvas(self, point_radius: float, num_points: int, use_texture: bool):
         """Initialize the OpenGL canvas for rendering moving points"""
         self.canvas = MovingPointsCanvas(
@@ -69,11 +148,27 @@ class MainWindow(QMainWindow):
             point_radius=point_radius,
             num_points=num_points,
             use_texture=use_texture,
+            target_staleness=self.target_staleness,
+            target_fps=self.target_fps,
+            history_ticks=self.history_ticks,
+            connect_address=self.connect_address,
+            checkpoint_path=self.checkpoint_path,
+            checkpoint=self.checkpoint,
+            fight_lines=self.fight_lines,
+            gpu_motion=self.gpu_motion,
+            background_slowdown=self.background_slowdown,
         )
         self.canvas.setSizePolicy(
             QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
         )
 
+    def _init_views(self):
+        """Additional views drawing the buffers of the canvas, hidden views are not drawn"""
+        self.follow_view = FollowView(self.canvas)
+        self.follow_view.setVisible(self.show_follow_view)
+        self.minimap = Minimap(self.canvas)
+        self.minimap.setVisible(self.show_minimap)
+
     def _setup_layout(self):
         """Set up the layout of all GUI elements"""
         top_layout = QHBoxLayout()
@@ -93,12 +188,27 @@ class MainWindow(QMainWindow):
 
         left_controls.addWidget(self.texture_checkbox)
         left_controls.addWidget(self.cursor_push_checkbox)
+        left_controls.addWidget(self.stats_checkbox)
+        left_controls.addWidget(self.fight_lines_checkbox)
+        left_controls.addWidget(self.follow_view_checkbox)
+        left_controls.addWidget(self.minimap_checkbox)
+        left_controls.addWidget(self.quality_label)
+        left_controls.addWidget(self.state_counts_label)
 
         top_layout.addLayout(left_controls)
 
+        views_layout = QVBoxLayout()
+        views_layout.addWidget(self.follow_view)
+        views_layout.addWidget(self.minimap)
+        views_layout.addStretch()
+
+        canvas_layout = QHBoxLayout()
+        canvas_layout.addWidget(self.canvas, stretch=1)
+        canvas_layout.addLayout(views_layout)
+
         main_layout = QVBoxLayout()
         main_layout.addLayout(top_layout)
-        main_layout.addWidget(self.canvas)
+        main_layout.addLayout(canvas_layout)
 
         self.main_widget.setLayout(main_layout)
         self.setCentralWidget(self.main_widget)
@@ -112,9 +222,85 @@ class MainWindow(QMainWindow):
             partial(self.core.update_num_points, self)
         )
         self.canvas.follow_mode_changed.connect(self.on_follow_mode_changed)
+        self.canvas.quality_changed.connect(self.on_quality_changed)
+        self.canvas.checkpoint_status.connect(self.on_checkpoint_status)
+        self.canvas.checkpoint_restored.connect(self.on_checkpoint_restored)
+        if self.canvas.receiver is not None:
+            # The simulation is run by the server
+            self.num_points_input.setEnabled(False)
+            self.speed_slider.setEnabled(False)
+            # Pairs are found with the states, which are calculated by the server
+            self.fight_lines_checkbox.setEnabled(False)
+            self.canvas.receiver.disconnected.connect(self.on_stream_disconnected)
+
+    def _init_status_bar(self):
+        """Initialize the status bar with per-stage timings"""
+        self.stats_timer = QTimer(self)
+        self.stats_timer.timeout.connect(self.update_status_bar)
+        self.stats_timer.start(STATUS_BAR_UPDATE_INTERVAL)
+        self.status_bar = QStatusBar()
+        self.status_bar.setVisible(self.show_stats)
+        self.setStatusBar(self.status_bar)
+
+    def update_status_bar(self):
+        """Show rolling p50/p95/p99 of the stage timings and skipped state ticks"""
+        if self.show_stats:
+            self.update_state_counts()
+            skipped_ticks = metrics.counters().get("states.skipped_ticks", 0)
+            report = metrics.format_report(STATUS_BAR_STAGES)
+            self.status_bar.showMessage(
+                " | ".join(filter(None, [report, f"skipped ticks: {skipped_ticks}"]))
+            )
+
+    def update_state_counts(self):
+        """Show cats in every state in the world and in view, queried from the state grid"""
+        totals = self.canvas.state_grid.totals()
+        visible = self.canvas.visible_state_counts()
+        self.state_counts_label.setText(
+            "\n".join(
+                f"{name.capitalize()}: {total} ({in_view} in view)"
+                for name, total, in_view in zip(STATE_NAMES, totals, visible)
+            )
+        )
 
     def on_follow_mode_changed(self, is_following: bool):
-        self.num_points_input.setEnabled(not is_following)
+        self.num_points_input.setEnabled(
+            not is_following and self.canvas.receiver is None
+        )
+
+    def on_quality_changed(self, level_name: str):
+        self.quality_label.setText(f"Quality: {level_name}")
+
+    def on_checkpoint_status(self, message: str):
+        self.status_bar.setVisible(True)
+        self.status_bar.showMessage(message, CHECKPOINT_MESSAGE_TIMEOUT)
+
+    def on_checkpoint_restored(self):
+        """Show the restored number of cats and speed without regenerating the cats"""
+        for control, value in (
+            (self.num_points_input, self.canvas.num_points),
+            (
+                self.speed_slider,
+                self._speed_slider_value(self.canvas.state.speed_factor),
+            ),
+        ):
+            control.blockSignals(True)
+            control.setValue(value)
+            control.blockSignals(False)
+        self.on_follow_mode_changed(self.canvas.state.followed_cat_id is not None)
+
+    @staticmethod
+    def _speed_slider_value(speed_factor: float) -> int:
+        """Inverse of `update_speed`"""
+        return round(200 + 40 * math.log(speed_factor, 1.5))
+
+    def on_stream_disconnected(self, reason: str):
+        # Stats would overwrite the message
+        self.stats_checkbox.setChecked(False)
+        self.status_bar.setVisible(True)
+        self.status_bar.showMessage(
+            f"Disconnected from {self.connect_address}: {reason}"
+        )
 
     def update_num_points(self, value: int):
         self.canvas.update_num_points(value)
@@ -130,3 +316,66 @@ class MainWindow(QMainWindow):
     def toggle_cursor_push(self, state: int):
         """Updating the value of the cursor_push flag"""
         self.canvas.cursor_push = bool(state)
+
+    def toggle_show_stats(self, state: int):
+        """Updating the value of the show_stats flag"""
+        self.show_stats = bool(state)
+        self.status_bar.setVisible(self.show_stats)
+        self.state_counts_label.setVisible(self.show_stats)
+        if self.show_stats:
+            self.update_state_counts()
+
+    def toggle_fight_lines(self, state: int):
+        self.fight_lines = bool(state)
+        self.canvas.set_fight_lines(self.fight_lines)
+
+    def toggle_follow_view(self, state: int):
+        self.show_follow_view = bool(state)
+        self.follow_view.setVisible(self.show_follow_view)
+
+    def toggle_minimap(self, state: int):
+        self.show_minimap = bool(state)
+        self.minimap.setVisible(self.show_minimap)
+
+    # Activity
+
+    def update_activity(self):
+        """Tell the canvas whether the window is shown and active"""
+        handle = self.windowHandle()
+        exposed = (
+            self.isVisible()
+            and not self.isMinimized()
+            and (handle is None or handle.isExposed())
+        )
+        self.canvas.set_activity(window_activity(exposed, self.isActiveWindow()))
+
+    def changeEvent(self, event: QEvent | None):
+        super().changeEvent(event)
+        if event is not None and event.type() in (
+            QEvent.Type.WindowStateChange,
+            QEvent.Type.ActivationChange,
+        ):
+            self.update_activity()
+
+    def showEvent(self, event: QShowEvent | None):
+        super().showEvent(event)
+        handle = self.windowHandle()
+        if handle is not None:
+            # Exposure changes without a state change when the window is covered or uncovered
+            handle.removeEventFilter(self)
+            handle.installEventFilter(self)
+        self.update_activity()
+
+    def hideEvent(self, event: QHideEvent | None):
+        super().hideEvent(event)
+        self.update_activity()
+
+    def eventFilter(self, watched: QObject | None, event: QEvent | None) -> bool:
+        if event is not None and event.type() == QEvent.Type.Expose:
+            # The window reports its new exposure after the event is handled
+            QTimer.singleShot(0, self.update_activity)
+        return super().eventFilter(watched, event)
+
+    def closeEvent(self, event: QCloseEvent | None):
+        self.canvas.stop_state_updates()
+        super().closeEvent(event)
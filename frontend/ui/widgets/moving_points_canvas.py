@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import threading
+import time
 from pathlib import Path
 from typing import *
 
@@ -9,21 +11,51 @@ from frontend.constants import (
     CameraSettings,
     OpenGLSettings,
 )
-from frontend.ui.shader_source import VERTEX_SHADER, FRAGMENT_SHADER
+from frontend.ui.shader_source import (
+    VERTEX_SHADER,
+    FRAGMENT_SHADER,
+    LINE_VERTEX_SHADER,
+    LINE_FRAGMENT_SHADER,
+)
 from frontend.ui.state_updater import UpdateStatesWorker
-from frontend.ui.renderer import RenderState, PointRenderer
+from frontend.ui.activity import Activity, BackgroundThrottle
+from frontend.ui.renderer import (
+    FIGHT_LINE_COLOR,
+    RenderState,
+    PointRenderer,
+    TEXTURE_PATHS,
+    setup_line_uniforms,
+)
+from frontend.ui.shared_buffers import SharedPointBuffers
 from frontend.ui.canvas_state import CanvasState
+from frontend.ui.frame_receiver import FrameReceiver
 from frontend.ui.input_handler import InputHandler
+from frontend.ui.quality import FrameRateGovernor, QualityLevel, QUALITY_LEVELS
+from frontend.core.aggregate import StateGrid
+from frontend.core.cat_store import CatStore
+from frontend.core.checkpoint import DEFAULT_PATH as DEFAULT_CHECKPOINT_PATH
+from frontend.core.checkpoint import Checkpoint, load_checkpoint, save_checkpoint
+from frontend.core.history import StateHistory
+from frontend.core.interactions import FIGHT_PAIR_DTYPE
+from frontend.core.metrics import metrics
+from frontend.core.profiler import trace_span
+from frontend.core.state_diff import StateDiff
+from frontend.core.staleness import StalenessController
 
 from PyQt6.QtGui import QSurfaceFormat, QWheelEvent, QMouseEvent
 import moderngl
 import numpy as np
 from OpenGL.GL import GL_POINT_SPRITE, GL_MULTISAMPLE
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QPointF
+from PyQt6.QtCore import Qt, QMetaObject, QTimer, QThread, pyqtSignal, QPointF
 from PyQt6.QtGui import QImage
 from PyQt6.QtOpenGLWidgets import QOpenGLWidget
 from frontend.core.protocol import Core
 
+# Changed states closer than this many cats are written in a single range
+STATE_WRITE_GAP = 64
+# More ranges than this are replaced by a write of the whole state buffer
+MAX_STATE_WRITES = 256
+
 
 def create_surface_format() -> QSurfaceFormat:
     """Creates and configures OpenGL surface format"""
@@ -40,6 +72,12 @@ class MovingPointsCanvas(QOpenGLWidget):
     """Canvas widget for rendering and managing moving points"""
 
     follow_mode_changed = pyqtSignal(bool)
+    quality_changed = pyqtSignal(str)
+    # `StateDiff` of every applied state update
+    states_changed = pyqtSignal(object)
+    # Result of saving or restoring a checkpoint, emitted from the saving thread too
+    checkpoint_status = pyqtSignal(str)
+    checkpoint_restored = pyqtSignal()
 
     # Initialization
 
@@ -52,6 +90,15 @@ class MovingPointsCanvas(QOpenGLWidget):
         cursor_push: bool = False,
         r1: float = RenderingConstants.DEFAULT_R1,
         r2: float = RenderingConstants.DEFAULT_R2,
+        target_staleness: Optional[float] = None,
+        target_fps: Optional[float] = None,
+        history_ticks: int = 0,
+        connect_address: Optional[str] = None,
+        checkpoint_path: Path = DEFAULT_CHECKPOINT_PATH,
+        checkpoint: Optional[Checkpoint] = None,
+        fight_lines: bool = False,
+        gpu_motion: bool = False,
+        background_slowdown: float = UpdateIntervals.BACKGROUND_SLOWDOWN,
     ):
         super().__init__()
         self.setFormat(create_surface_format())
@@ -60,8 +107,33 @@ class MovingPointsCanvas(QOpenGLWidget):
         self._init_core_components(
             core, point_radius, num_points, use_texture, cursor_push, r1, r2
         )
+        self.staleness = StalenessController(
+            target_staleness, UpdateIntervals.STATE_UPDATE / 1000
+        )
+        self.governor = (
+            FrameRateGovernor(target_fps) if target_fps is not None else None
+        )
+        self.quality = QUALITY_LEVELS[0]
+        self.history = StateHistory(history_ticks, num_points)
+        # Per-state counts for the stats panel, updated with the states
+        self.state_grid = StateGrid()
+        self.state_grid_updated_at = 0.0
+        self.states_changed.connect(self.core.log_state_transitions)
+        # Cats are moved by a `--serve` instance instead of the timers if connected
+        self.receiver = (
+            FrameReceiver(connect_address) if connect_address is not None else None
+        )
+        self.checkpoint_path = checkpoint_path
+        # Lines between fighting cats, the pairs are found with the states
+        self.fight_lines = fight_lines
+        # Positions are moved by the vertex shader between changes of deltas and states
+        self.gpu_motion = gpu_motion
+        # Timers slow down while the window is in the background, nothing is painted while it is hidden
+        self.throttle = BackgroundThrottle(background_slowdown)
+        # Checkpoints are taken between state updates, so they match the backend tick
+        self._pending_checkpoint_action: Optional[Callable[[], None]] = None
         self._setup_timers()
-        self._init_state()
+        self._init_state(checkpoint)
 
     def _init_core_components(
         self,
@@ -84,37 +156,66 @@ class MovingPointsCanvas(QOpenGLWidget):
         self.r1 = r1
         self.r2 = r2
 
-    def _init_state(self):
+    @property
+    def points(self) -> np.ndarray:
+        return self.store.positions
+
+    @property
+    def states(self) -> np.ndarray:
+        return self.store.states
+
+    @property
+    def deltas(self) -> np.ndarray:
+        return self.store.deltas
+
+    def _init_state(self, checkpoint: Optional[Checkpoint] = None):
         """Initialize state variables"""
         self.show_cursor_coords = False
         self.is_updating_states = False
+        self.state_tick = 0
+        self.target_tick = 0
+        self.state_started_at = 0.0
+        self.last_frame_at: Optional[float] = None
+        self.position_update_cost = 0.0
         self.cursor_coords: np.ndarray | None = None
         self.follow_radius = RenderingConstants.DEFAULT_FOLLOW_RADIUS
+        self.fight_pairs = np.empty((0, 2), dtype=FIGHT_PAIR_DTYPE)
+        # Movement by the deltas drawn by the shader, but not applied to the stored positions yet
+        self.motion_time = 0.0
 
         # Generate initial points and states
-        self.points = self.core.generate_points(self.num_points, self.state.zoom_factor)
-        self.states = np.zeros(self.num_points, dtype=int)
-        self.update_deltas()
+        self.store = CatStore()
+        if checkpoint is not None:
+            self._apply_checkpoint(checkpoint)
+        else:
+            self.store.reset(
+                self.core.initial_points(self.num_points, self.state.zoom_factor)
+            )
+            self.update_deltas()
+        self.state_grid.update(self.points, self.states)
 
         self.setFocusPolicy(Qt.FocusPolicy.ClickFocus)
 
     def _setup_timers(self):
-        """Setup and start update timers"""
+        """Setup and start update timers, they are not started for a connected canvas"""
         # Position update timer
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_positions)
-        self.timer.start(UpdateIntervals.POSITION_UPDATE)
 
         # Target update timer
         self.target_update_timer = QTimer()
         self.target_update_timer.timeout.connect(self.update_deltas)
-        self.target_update_timer.start(UpdateIntervals.TARGET_UPDATE)
 
         # State update timer
         self.state_update_timer = QTimer()
         self.state_update_timer.timeout.connect(self.update_states)
-        self.state_update_timer.start(UpdateIntervals.STATE_UPDATE)
 
+        if self.receiver is None:
+            self.timer.start(UpdateIntervals.POSITION_UPDATE)
+            self.target_update_timer.start(UpdateIntervals.TARGET_UPDATE)
+            self.state_update_timer.start(UpdateIntervals.STATE_UPDATE)
+
+        # All state updates run on this thread, it is started with the first one
         self.core_thread = QThread(parent=self)
 
         self.setFocusPolicy(
@@ -130,9 +231,6 @@ class MovingPointsCanvas(QOpenGLWidget):
         self.ctx.enable_direct(GL_POINT_SPRITE)
         self.ctx.enable_direct(GL_MULTISAMPLE)
 
-        self.indices = np.arange(self.num_points, dtype=np.int32)
-        self.index_buffer = self.ctx.buffer(self.indices.tobytes())
-
         # Compile shaders and create program
         self.shader_program = self.ctx.program(
             vertex_shader=VERTEX_SHADER,
@@ -143,10 +241,19 @@ class MovingPointsCanvas(QOpenGLWidget):
         self.textures = self.load_textures()
 
         self.renderer = PointRenderer(self.ctx, self.shader_program, self.textures)
+        self.line_program = self.ctx.program(
+            vertex_shader=LINE_VERTEX_SHADER,
+            fragment_shader=LINE_FRAGMENT_SHADER,
+        )
 
         # Initialize buffers
         self.init_buffers()
 
+        # Frames are applied to the buffers, so they are received only from now on
+        if self.receiver is not None:
+            self.receiver.frame_received.connect(self.handle_frame)
+            self.receiver.start()
+
     def load_textures(self) -> list[moderngl.Texture]:
         texture_paths = self._get_texture_pathes()
         textures = []
@@ -165,17 +272,18 @@ class MovingPointsCanvas(QOpenGLWidget):
         return textures
 
     def _get_texture_pathes(self) -> dict[int, Path]:
-        base_dir = Path(__file__).parent.parent.parent.parent / "data"
-
-        return {
-            0: base_dir / "calm_cat.png",
-            1: base_dir / "angry_cat.png",
-            2: base_dir / "fight_cat.png",
-        }
+        return TEXTURE_PATHS
 
     @no_type_check
     def paintGL(self):
         """Render the scene"""
+        started_at = time.perf_counter()
+        with metrics.measure("ui.paint_gl"):
+            self._paint_scene()
+        self._govern_frame_rate(started_at)
+
+    @no_type_check
+    def _paint_scene(self):
         self.fb = self.ctx.detect_framebuffer(self.defaultFramebufferObject())
         self.fb.clear()
         self.fb.use()
@@ -183,78 +291,170 @@ class MovingPointsCanvas(QOpenGLWidget):
         render_state = RenderState(
             points=self.points,
             states=self.states,
-            followed_cat_id=self.state.followed_cat_id,
+            followed_cat_id=self.highlighted_index,
             zoom_factor=self.state.zoom_factor,
             pan_offset=self.state.pan_offset,
             point_radius=self.point_radius,
             follow_radius=self.follow_radius,
-            use_texture=self.use_texture,
+            use_texture=self.use_texture and self.quality.use_texture,
+            motion_time=self.motion_time,
         )
-        # Set shader uniforms
+        # Lines are drawn under the cats they connect
+        if self.fight_lines and self.buffers.fight_pair_count > 0:
+            setup_line_uniforms(self.line_program, render_state, FIGHT_LINE_COLOR)
+            self.line_vao.render(
+                moderngl.LINES, vertices=2 * self.buffers.fight_pair_count
+            )
 
-        # Render points using current state
+        # Render points using current state, buffers are kept up to date by the timers
         self.renderer.setup_uniforms(render_state)
-        visible_points, visible_states = self.renderer.get_visible_points(render_state)
+        self.vao.render(moderngl.POINTS, vertices=self.buffers.vertex_count)
 
-        self.vbo.write(visible_points.astype("f4").tobytes())
-        self.state_buffer.write(visible_states.astype("i4").tobytes())
+    def resizeGL(self, w: int, h: int):
+        self.ctx.viewport = (0, 0, w, h)
 
+    # Quality
+
+    def _govern_frame_rate(self, started_at: float):
+        """Feed the frame to the governor and apply the quality level it picks"""
+        # Throttled frames are slow on purpose
+        if self.governor is None or self.throttle.activity.throttled:
+            return
+        # The first frame after a pause also carries the catch-up
+        if self.last_frame_at is not None:
+            cost = time.perf_counter() - started_at + self.position_update_cost
+            level = self.governor.record_frame(cost)
+            if level is not None:
+                self.apply_quality(level)
+        self.last_frame_at = started_at
+        self.position_update_cost = 0.0
+
+    def apply_quality(self, level: QualityLevel):
+        self.quality = level
+        self.ctx.multisample = level.multisample
+        self.timer.setInterval(
+            UpdateIntervals.POSITION_UPDATE * self._position_substeps()
+        )
         self.update_buffers()
-        self.vao.render(moderngl.POINTS, vertices=self.num_points)
+        self.quality_changed.emit(level.name)
 
-    def resizeGL(self, w: int, h: int):
-        self.ctx.viewport = (0, 0, w, h)
+    def _position_substeps(self) -> int:
+        return self.throttle.position_substeps(self.quality.position_substeps)
 
-    # Buffer Management
+    # Activity
 
-    def init_buffers(self):
-        # Create Vertex Buffer Object (VBO) for positions
-        self.vbo = self.ctx.buffer(self.points.astype("f4").tobytes())
+    def set_activity(self, activity: Activity):
+        """Throttle the timers in the background and catch up when the window is back"""
+        if not self.throttle.set_activity(activity):
+            return
+        self.last_frame_at = None
+        self.position_update_cost = 0.0
+        if self.receiver is not None:
+            return
+        self.timer.setInterval(
+            UpdateIntervals.POSITION_UPDATE * self._position_substeps()
+        )
+        self.target_update_timer.setInterval(
+            self.throttle.timer_interval(UpdateIntervals.TARGET_UPDATE)
+        )
+        self.state_update_timer.setInterval(
+            self.throttle.timer_interval(round(self.staleness.interval * 1000))
+        )
+        if not activity.paints:
+            return
+        # Cats moved while hidden are uploaded at once, and states are updated without waiting a throttled tick
+        if not self.defers_positions:
+            self._apply_motion()
+        self._upload_positions()
+        if not activity.throttled and not self.is_updating_states:
+            self.update_states()
+        self.update()
 
-        # Create a Buffer for states
-        self.state_buffer = self.ctx.buffer(self.states.astype("i4").tobytes())
+    def _drawn_points(self) -> np.ndarray:
+        # A copy is made only for the strided levels, the full store is written as is
+        return np.ascontiguousarray(self.points[:: self.quality.point_stride])
 
-        indices = np.arange(len(self.points), dtype=np.int32)
-        self.index_buffer = self.ctx.buffer(indices.astype("i4").tobytes())
+    def _drawn_states(self) -> np.ndarray:
+        return np.ascontiguousarray(self.states[:: self.quality.point_stride])
 
-        # Create Vertex Array Object (VAO)
-        self.vao = self.ctx.vertex_array(
-            self.shader_program,
-            [
-                (self.vbo, "2f", "position"),  # Bind position attribute
-                (self.state_buffer, "1i", "state"),  # Bind state attribute
-                (self.index_buffer, "1i", "index"),
-            ],
+    def _drawn_velocities(self) -> np.ndarray:
+        # Written in every mode, so switching to the GPU motion needs no upload
+        return np.ascontiguousarray(self.deltas[:: self.quality.point_stride])
+
+    @property
+    def highlighted_index(self) -> Optional[int]:
+        """Index of the followed cat in the drawn buffers, used by all views"""
+        return self._drawn_cat_id(self.state.followed_cat_id)
+
+    def _drawn_cat_id(self, cat_id: Optional[int]) -> Optional[int]:
+        """Index of the cat among the drawn ones, `None` if it is not drawn"""
+        stride = self.quality.point_stride
+        if cat_id is None or cat_id % stride != 0:
+            return None
+        return cat_id // stride
+
+    # Buffer Management
+
+    def init_buffers(self):
+        # Positions and states are uploaded once per frame for all views
+        self.buffers = SharedPointBuffers(
+            self.ctx, self.points, self.states, self._drawn_velocities()
         )
+        self.vao = self.buffers.vertex_array(self.ctx, self.shader_program)
+        self.line_vao = self.buffers.line_vertex_array(self.ctx, self.line_program)
 
     def update_buffers(self):
-        self.vbo.orphan(len(self.points) * 8)
-        self.state_buffer.orphan(len(self.states) * 4)
-        self.vbo.write(self.points.astype("f4").tobytes())
-        self.state_buffer.write(self.states.astype("i4").tobytes())
+        self.sync_positions()
+        self.buffers.reallocate(
+            self._drawn_points(), self._drawn_states(), self._drawn_velocities()
+        )
+        self._upload_fight_pairs()
+
+    def _upload_fight_pairs(self):
+        """Write pairs of the drawn cats only, pairs found for another number of cats are dropped"""
+        pairs = self.fight_pairs[self.fight_pairs.max(axis=1) < self.store.count]
+        stride = self.quality.point_stride
+        if stride != 1:
+            pairs = pairs[(pairs % stride == 0).all(axis=1)] // stride
+        self.buffers.write_fight_pairs(pairs)
 
     # State Updates
 
     def update_num_points(self, num_points: int):
         """Update the number of points being rendered"""
+        if self.receiver is not None:
+            # The number of cats is set by the server, the buffers are only refreshed
+            self.update_buffers()
+            self.update()
+            return
         self.num_points = num_points
-        self.points = self.core.generate_points(self.num_points, self.state.zoom_factor)
-        self.states = np.zeros(self.num_points, dtype=int)
-        self.indices = np.arange(self.num_points, dtype=np.int32)
-        self.index_buffer = self.ctx.buffer(self.indices.tobytes())
+        self.store.reset(
+            self.core.initial_points(self.num_points, self.state.zoom_factor)
+        )
+        self.motion_time = 0.0
+        self.history.reset(self.num_points)
         self.update_deltas()
+        self.state_grid.update(self.points, self.states)
         self.update_buffers()
         self.update()
 
     def update_positions(self):
         """Update point positions and camera if following"""
-        self._update_point_positions()
-        self._update_camera_if_following()
-        self._update_render_buffers()
+        started_at = time.perf_counter()
+        with trace_span("timer.update_positions"):
+            self._update_point_positions()
+            self._update_camera_if_following()
+            self._update_render_buffers()
+        self.position_update_cost += time.perf_counter() - started_at
 
     def _update_point_positions(self):
         """Update positions based on current deltas"""
-        interpolation_speed = 1.0 / RenderingConstants.FPS
+        interpolation_speed = self._position_substeps() / RenderingConstants.FPS
+        if self.defers_positions:
+            # Motion is linear until the deltas change, so only the time is advanced
+            self.motion_time += interpolation_speed
+            return
+        self.sync_positions()
         movement = self.deltas * interpolation_speed
 
         if self.cursor_push:
@@ -262,7 +462,8 @@ class MovingPointsCanvas(QOpenGLWidget):
                 push_vector = self._calculate_push_vector(self.points[i])
                 movement[i] += push_vector
 
-        self.points += movement
+        positions = self.store.positions
+        positions += movement
 
     def _calculate_push_vector(self, point_pos: np.ndarray) -> np.ndarray:
         if self.cursor_coords is None:
@@ -283,12 +484,55 @@ class MovingPointsCanvas(QOpenGLWidget):
 
         return np.zeros(2)
 
+    @property
+    def defers_positions(self) -> bool:
+        """Motion is accumulated in `motion_time` instead of moving the stored cats at every step
+
+        The shaders draw it with `--gpu-motion`, and nothing is drawn while the
+        window is hidden. Pushing by the cursor and streamed frames are not linear.
+        """
+        if self.receiver is not None:
+            return False
+        if not self.throttle.activity.paints:
+            return True
+        return self.gpu_motion and not self.cursor_push
+
+    def sync_positions(self):
+        """Apply the deferred motion to the stored positions and upload them as the new base
+
+        Done whenever the stored positions are read or the deltas change, so the
+        stored cats are where they are drawn: moving by `motion_time` at once
+        differs from moving step by step by rounding only.
+        """
+        if self._apply_motion():
+            self._upload_positions()
+
+    def _apply_motion(self) -> bool:
+        """Returns whether the stored cats were moved"""
+        if self.motion_time == 0.0:
+            return False
+        positions = self.store.positions
+        positions += self.deltas * self.motion_time
+        self.motion_time = 0.0
+        return True
+
+    def _upload_positions(self):
+        # Nothing is drawn while hidden, positions are uploaded when the window is back
+        if getattr(self, "buffers", None) is None or not self.throttle.activity.paints:
+            return
+        with metrics.measure("ui.buffer_upload"):
+            self.buffers.write_positions(self._drawn_points())
+
+    def cat_position(self, cat_id: int) -> np.ndarray:
+        """Position of the cat where it is drawn, without syncing all positions"""
+        return self.points[cat_id] + self.deltas[cat_id] * self.motion_time
+
     def _update_camera_if_following(self):
         """Update camera position when following a point"""
         if self.state.followed_cat_id is None:
             return
 
-        followed_pos = self.points[self.state.followed_cat_id]
+        followed_pos = self.cat_position(self.state.followed_cat_id)
         target_pos = -followed_pos
 
         self.state.pan_offset = self._smooth_camera_movement(
@@ -306,56 +550,281 @@ class MovingPointsCanvas(QOpenGLWidget):
         )
 
     def _update_render_buffers(self):
-        """Update render buffers if states match points"""
-        if len(self.points) == len(self.states):
-            self.vbo.write(self.points.astype("f4").tobytes())
-            self.state_buffer.write(self.states.astype("i4").tobytes())
+        """Update positions in the render buffers, states are patched on their updates"""
+        if not self.throttle.activity.paints:
+            return
+        if not self.defers_positions:
+            self._upload_positions()
         self.update()
 
     def update_deltas(self):
         """Update movement deltas"""
-        self.deltas = self.core.generate_deltas(
-            self, self.num_points, self.state.speed_factor
-        )
+        with trace_span("timer.update_deltas"):
+            self.sync_positions()
+            self.store.deltas[:] = self.core.generate_deltas(
+                self,
+                self.store.count,
+                self.state.speed_factor,
+                self.core.motion_rng(self.target_tick),
+            )
+            self.target_tick += 1
+            if getattr(self, "buffers", None) is not None:
+                self.buffers.write_velocities(self._drawn_velocities())
 
     def update_states(self):
         """Update states using worker thread"""
 
-        if self.is_updating_states:
-            return  # Skip if a thread is already running
+        with trace_span("timer.update_states"):
+            if self.is_updating_states:
+                # Skip if a thread is already running
+                self.staleness.skip_tick()
+                metrics.set_counter(
+                    "states.skipped_ticks", self.staleness.skipped_ticks
+                )
+                return
 
-        self.is_updating_states = True  # Mark as running
-        self._start_state_update_worker()
+            self.is_updating_states = True  # Mark as running
+            # States are calculated for the cats where they are drawn
+            self.sync_positions()
+            self._start_state_update_worker()
 
     def _start_state_update_worker(self):
-        """Initialize and start state update worker thread"""
-        self.core_thread = QThread(parent=self)
+        """Run a state update worker on the state update thread"""
+        if not self.core_thread.isRunning():
+            self.core_thread.start()
+        self.state_started_at = time.perf_counter()
         self.worker = UpdateStatesWorker(
-            self.core, self.num_points, self.points, self.width(), self.height()
+            self.core,
+            self.num_points,
+            self.points,
+            self.width(),
+            self.height(),
+            self.states,
+            self.state.visible_rect(),
+            self.state_tick,
+            self.history,
+            self.state_grid,
+            self.fight_lines,
         )
+        self.state_tick += 1
 
         self._setup_worker_connections()
-        self.core_thread.start()
+        QMetaObject.invokeMethod(self.worker, "run", Qt.ConnectionType.QueuedConnection)
 
     def _setup_worker_connections(self):
         """Setup signal connections for worker thread"""
         self.worker.moveToThread(self.core_thread)
 
         # Connect signals
-        self.core_thread.started.connect(self.worker.run)
+        self.worker.fight_pairs_found.connect(self.handle_fight_pairs)
         self.worker.finished.connect(self.handle_states_update)
-        self.worker.finished.connect(self.core_thread.quit)
         self.worker.finished.connect(self.worker.deleteLater)
-        self.core_thread.finished.connect(self.core_thread.deleteLater)
         self.worker.finished.connect(self.reset_update_flag)
 
+    def stop_state_updates(self):
+        """Stop the timers and the state update thread, a running update is finished first"""
+        for timer in (self.timer, self.target_update_timer, self.state_update_timer):
+            timer.stop()
+        self.core_thread.quit()
+        self.core_thread.wait()
+
     def reset_update_flag(self):
         """Reset the flag to allow the next thread to start."""
         self.is_updating_states = False
+        if self._pending_checkpoint_action is not None:
+            action, self._pending_checkpoint_action = (
+                self._pending_checkpoint_action,
+                None,
+            )
+            action()
 
-    def handle_states_update(self, new_states: np.ndarray):
+    def handle_states_update(
+        self, new_states: np.ndarray, diff: Optional[StateDiff], emitted_at: float
+    ):
         """Handle state updates from worker thread"""
-        self.states = new_states
+        metrics.record("ui.worker_handoff", time.perf_counter() - emitted_at)
+        # States calculated before the number of cats changed are dropped
+        if len(new_states) == self.store.count:
+            if diff is None:
+                diff = StateDiff.between(self.states, new_states)
+            diff.apply(self.store.states)
+            self._upload_state_changes(diff)
+            metrics.set_counter("states.changed_cats", len(diff))
+            self.states_changed.emit(diff)
+        self._adjust_state_update_interval(emitted_at)
+
+    def handle_fight_pairs(self, pairs: np.ndarray):
+        """Show lines between the fighting cats found with the next states"""
+        self.fight_pairs = pairs
+        self._upload_fight_pairs()
+
+    def set_fight_lines(self, fight_lines: bool):
+        """Lines appear with the next state update and are removed at once"""
+        self.fight_lines = fight_lines
+        if not fight_lines:
+            self.handle_fight_pairs(np.empty((0, 2), dtype=FIGHT_PAIR_DTYPE))
+        self.update()
+
+    def _upload_state_changes(self, diff: StateDiff):
+        """Patch the state buffer with ranged writes of the changed cats only"""
+        with metrics.measure("ui.state_upload"):
+            ranges = diff.ranges(STATE_WRITE_GAP)
+            if self.quality.point_stride != 1 or len(ranges) > MAX_STATE_WRITES:
+                self.buffers.write_states(self._drawn_states())
+                return
+            for start, end in ranges:
+                self.buffers.write_states(self.states[start:end], offset=start)
+
+    def handle_frame(self):
+        """Show the newest frame received from the server"""
+        assert self.receiver is not None
+        frame = self.receiver.take_frame()
+        if frame is None:
+            return
+
+        if len(frame.states) != self.store.count:
+            self.num_points = len(frame.states)
+            self.store.reset(frame.positions)
+            self.store.states[:] = frame.states
+            self.history.reset(self.num_points)
+            self.update_buffers()
+        else:
+            self.store.positions[:] = frame.positions
+            diff = (
+                frame.diff
+                if frame.diff is not None
+                else StateDiff.between(self.states, frame.states)
+            )
+            diff.apply(self.store.states)
+            self._upload_state_changes(diff)
+            self.states_changed.emit(diff)
+            with metrics.measure("ui.buffer_upload"):
+                self.buffers.write_positions(self._drawn_points())
+        self.history.push(self.states)
+        self._update_state_grid_from_frame()
+        self._update_camera_if_following()
+        self.update()
+
+    def _update_state_grid_from_frame(self):
+        """Rebin cats at the rate of state updates, not at the rate of frames"""
+        now = time.perf_counter()
+        if now - self.state_grid_updated_at >= UpdateIntervals.STATE_UPDATE / 1000:
+            self.state_grid.update(self.points, self.states)
+            self.state_grid_updated_at = now
+
+    def visible_state_counts(self) -> np.ndarray:
+        """Number of cats in every state within the follow radius or the viewport"""
+        if self.state.followed_cat_id is not None:
+            return self.state_grid.counts_around(
+                self.cat_position(self.state.followed_cat_id), self.follow_radius
+            )
+        return self.state_grid.counts(self.state.visible_rect())
+
+    def _adjust_state_update_interval(self, finished_at: float):
+        """Record the achieved staleness and retune the state update timer"""
+        previous_staleness = self.staleness.staleness
+        interval = self.staleness.record_update(self.state_started_at, finished_at)
+        if self.staleness.staleness != previous_staleness:
+            metrics.record("states.staleness", self.staleness.staleness)
+
+        interval_ms = self.throttle.timer_interval(max(1, round(interval * 1000)))
+        metrics.set_counter("states.interval_ms", interval_ms)
+        if interval_ms != self.state_update_timer.interval():
+            self.state_update_timer.setInterval(interval_ms)
+
+    # Checkpoints
+
+    def save_checkpoint(self):
+        """Save the simulation to `checkpoint_path` in a background thread"""
+        self._run_between_state_updates(self._start_checkpoint_save)
+
+    def restore_checkpoint(self):
+        """Replace the simulation with the one saved to `checkpoint_path`"""
+        self._run_between_state_updates(self._restore_checkpoint)
+
+    def _run_between_state_updates(self, action: Callable[[], None]):
+        if self.receiver is not None:
+            self.checkpoint_status.emit("Checkpoints are saved by the server")
+        elif self.is_updating_states:
+            self._pending_checkpoint_action = action
+        else:
+            action()
+
+    def make_checkpoint(self) -> Checkpoint:
+        """Snapshot of the simulation, arrays are copied"""
+        self.sync_positions()
+        return Checkpoint(
+            positions=self.points.copy(),
+            deltas=self.deltas.copy(),
+            states=self.states.copy(),
+            seed=self.core.seed,
+            random_tick=self.core.random_tick(),
+            target_tick=self.target_tick,
+            state_tick=self.state_tick,
+            view={
+                "zoom_factor": self.state.zoom_factor,
+                "pan_offset": self.state.pan_offset.tolist(),
+                "followed_cat_id": self.state.followed_cat_id,
+                "speed_factor": self.state.speed_factor,
+                "follow_radius": self.follow_radius,
+            },
+        )
+
+    def _start_checkpoint_save(self):
+        checkpoint = self.make_checkpoint()
+        threading.Thread(target=self._write_checkpoint, args=(checkpoint,)).start()
+
+    def _write_checkpoint(self, checkpoint: Checkpoint):
+        started_at = time.perf_counter()
+        try:
+            save_checkpoint(self.checkpoint_path, checkpoint)
+        except OSError as error:
+            self.checkpoint_status.emit(f"Failed to save a checkpoint: {error}")
+            return
+        self.checkpoint_status.emit(
+            f"{checkpoint.num_cats} cats saved to {self.checkpoint_path} "
+            f"in {time.perf_counter() - started_at:.2f} s"
+        )
+
+    def _restore_checkpoint(self):
+        started_at = time.perf_counter()
+        try:
+            checkpoint = load_checkpoint(self.checkpoint_path)
+        except (OSError, ValueError) as error:
+            self.checkpoint_status.emit(f"Failed to restore a checkpoint: {error}")
+            return
+        self._apply_checkpoint(checkpoint)
+        self.state_grid.update(self.points, self.states)
+        self.update_buffers()
+        self.update()
+        self.checkpoint_restored.emit()
+        self.checkpoint_status.emit(
+            f"{checkpoint.num_cats} cats restored from {self.checkpoint_path} "
+            f"in {time.perf_counter() - started_at:.2f} s"
+        )
+
+    def _apply_checkpoint(self, checkpoint: Checkpoint):
+        """Continue the saved run: arrays are used as is, without copying"""
+        self.store.adopt(checkpoint.positions, checkpoint.deltas, checkpoint.states)
+        self.motion_time = 0.0
+        self.num_points = checkpoint.num_cats
+        self.history.reset(self.num_points)
+        self.core.restore_random(checkpoint.seed, checkpoint.random_tick)
+        self.target_tick = checkpoint.target_tick
+        self.state_tick = checkpoint.state_tick
+
+        view = checkpoint.view
+        self.state = CanvasState(
+            zoom_factor=view["zoom_factor"],
+            pan_offset=np.array(view["pan_offset"], dtype=np.float64),
+            followed_cat_id=view["followed_cat_id"],
+            speed_factor=view["speed_factor"],
+        )
+        self.follow_radius = view["follow_radius"]
+
+    def follow_cat(self, cat_id: int):
+        """Start following the cat, like a double click on it does"""
+        self._handle_following_mode_starting(cat_id)
 
     def stop_following(self):
         """Stop following mode and reset state"""
@@ -430,10 +899,12 @@ class MovingPointsCanvas(QOpenGLWidget):
 
     def _find_nearest_cat_id(self, world_pos: np.ndarray) -> int:
         """Find the nearest point to given world coordinates"""
+        self.sync_positions()
         distances = np.linalg.norm(self.points - world_pos, axis=1)
         return int(np.argmin(distances))
 
     def _handle_following_mode_starting(self, point_id: int):
+        self.sync_positions()
         distances = np.linalg.norm(self.points - self.points[point_id], axis=1)
 
         if distances[point_id] < self.follow_radius:
@@ -449,3 +920,7 @@ class MovingPointsCanvas(QOpenGLWidget):
         if event.key() == Qt.Key.Key_F:
             self.stop_following()
             self.update()
+        elif event.key() == Qt.Key.Key_S:
+            self.save_checkpoint()
+        elif event.key() == Qt.Key.Key_L:
+            self.restore_checkpoint()
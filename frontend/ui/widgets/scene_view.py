@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from typing import *
+
+import moderngl
+import numpy as np
+from OpenGL.GL import GL_POINT_SPRITE
+from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtOpenGLWidgets import QOpenGLWidget
+
+from frontend.constants import ViewSettings
+from frontend.core.metrics import metrics
+from frontend.ui.renderer import (
+    FIGHT_LINE_COLOR,
+    PointRenderer,
+    RenderState,
+    setup_line_uniforms,
+)
+from frontend.ui.shader_source import (
+    FRAGMENT_SHADER,
+    LINE_FRAGMENT_SHADER,
+    LINE_VERTEX_SHADER,
+    VERTEX_SHADER,
+)
+from frontend.ui.shared_buffers import SharedPointBuffers
+from frontend.ui.widgets.moving_points_canvas import (
+    MovingPointsCanvas,
+    create_surface_format,
+)
+
+# Color of the main viewport outline on the minimap
+FRAME_COLOR = (1.0, 1.0, 1.0, 0.8)
+
+
+class SceneView(QOpenGLWidget):
+    """Additional view of the simulation run by a `MovingPointsCanvas`
+
+    Draws the buffers the canvas shares with a camera of its own and uploads
+    no cats, so a view costs draw time only. Textures are shared too.
+    Views are repainted after every frame of the canvas.
+    """
+
+    def __init__(self, canvas: MovingPointsCanvas):
+        super().__init__()
+        self.setFormat(create_surface_format())
+        self.setFixedSize(ViewSettings.SIZE, ViewSettings.SIZE)
+        self.canvas = canvas
+        self.vao: Optional[moderngl.VertexArray] = None
+        self.line_vao: Optional[moderngl.VertexArray] = None
+        self._bound_buffers: Optional[SharedPointBuffers] = None
+        canvas.frameSwapped.connect(self.update)
+
+    def camera(self) -> tuple[float, np.ndarray]:
+        """Zoom factor and pan offset of the view, the ones of the canvas by default"""
+        state = self.canvas.state
+        return state.zoom_factor, state.pan_offset
+
+    def render_state(self) -> RenderState:
+        zoom, pan = self.camera()
+        return RenderState(
+            points=self.canvas.points,
+            states=self.canvas.states,
+            followed_cat_id=self.canvas.highlighted_index,
+            zoom_factor=zoom,
+            pan_offset=pan,
+            point_radius=self.canvas.point_radius,
+            follow_radius=self.canvas.follow_radius,
+            use_texture=self.canvas.use_texture and self.canvas.quality.use_texture,
+            motion_time=self.canvas.motion_time,
+        )
+
+    def initializeGL(self):
+        self.ctx = moderngl.create_context()
+        self.ctx.enable(moderngl.PROGRAM_POINT_SIZE)
+        self.ctx.enable(moderngl.BLEND)
+        self.ctx.enable_direct(GL_POINT_SPRITE)
+        self.shader_program = self.ctx.program(
+            vertex_shader=VERTEX_SHADER,
+            fragment_shader=FRAGMENT_SHADER,
+        )
+        self.line_program = self.ctx.program(
+            vertex_shader=LINE_VERTEX_SHADER,
+            fragment_shader=LINE_FRAGMENT_SHADER,
+        )
+
+    def resizeGL(self, w: int, h: int):
+        self.ctx.viewport = (0, 0, w, h)
+
+    @no_type_check
+    def paintGL(self):
+        with metrics.measure("ui.paint_view"):
+            fb = self.ctx.detect_framebuffer(self.defaultFramebufferObject())
+            fb.clear()
+            fb.use()
+            if not self._bind_buffers():
+                return
+            buffers = self._bound_buffers
+            state = self.render_state()
+            if self.canvas.fight_lines and buffers.fight_pair_count > 0:
+                setup_line_uniforms(self.line_program, state, FIGHT_LINE_COLOR)
+                self.line_vao.render(
+                    moderngl.LINES, vertices=2 * buffers.fight_pair_count
+                )
+            self.renderer.setup_uniforms(state)
+            self.vao.render(moderngl.POINTS, vertices=buffers.vertex_count)
+            self.paint_overlay(state)
+
+    def paint_overlay(self, state: RenderState):
+        """Drawn over the cats, with the camera of the view"""
+
+    def _bind_buffers(self) -> bool:
+        """Bind the buffers of the canvas to a vertex array of this view
+
+        The canvas creates them in its first `initializeGL` and again whenever
+        its context is recreated. Vertex arrays wrap their GL names in the context
+        of the view. Returns whether there is anything to draw.
+        """
+        buffers = getattr(self.canvas, "buffers", None)
+        if buffers is None:
+            return False
+        if buffers is not self._bound_buffers:
+            self.vao = buffers.vertex_array(self.ctx, self.shader_program)
+            self.line_vao = buffers.line_vertex_array(self.ctx, self.line_program)
+            self.renderer = PointRenderer(
+                self.ctx, self.shader_program, self.canvas.textures
+            )
+            self._bound_buffers = buffers
+        return True
+
+
+class FollowView(SceneView):
+    """Close-up of the followed cat, or of the cursor when no cat is followed"""
+
+    def camera(self) -> tuple[float, np.ndarray]:
+        state = self.canvas.state
+        if state.followed_cat_id is not None:
+            center = self.canvas.cat_position(state.followed_cat_id).astype(np.float64)
+        elif self.canvas.cursor_coords is not None:
+            center = self.canvas.cursor_coords
+        else:
+            center = -state.pan_offset
+        return state.zoom_factor * ViewSettings.FOLLOW_MAGNIFICATION, -center
+
+
+class Minimap(SceneView):
+    """The whole world with an outline of the main viewport, a click moves the viewport"""
+
+    def camera(self) -> tuple[float, np.ndarray]:
+        return 1.0 / ViewSettings.MINIMAP_EXTENT, np.zeros(2)
+
+    def render_state(self) -> RenderState:
+        state = super().render_state()
+        state.point_radius = ViewSettings.MINIMAP_POINT_RADIUS
+        state.use_texture = False
+        return state
+
+    def initializeGL(self):
+        super().initializeGL()
+        self.frame_buffer = self.ctx.buffer(reserve=4 * 2 * 4)
+        self.frame_vao = self.ctx.vertex_array(
+            self.line_program, [(self.frame_buffer, "2f", "position")]
+        )
+
+    @no_type_check
+    def paint_overlay(self, state: RenderState):
+        rect = self.canvas.state.visible_rect()
+        corners = np.array(
+            [
+                (rect.min_x, rect.min_y),
+                (rect.max_x, rect.min_y),
+                (rect.max_x, rect.max_y),
+                (rect.min_x, rect.max_y),
+            ],
+            dtype=np.float32,
+        )
+        self.frame_buffer.write(corners)
+        setup_line_uniforms(self.line_program, state, FRAME_COLOR)
+        self.frame_vao.render(moderngl.LINE_LOOP)
+
+    def world_position(self, x: float, y: float) -> np.ndarray:
+        """World coordinates of a point of the widget"""
+        zoom, pan = self.camera()
+        return np.array(
+            [
+                (x / self.width() * 2 - 1) / zoom - pan[0],
+                -(y / self.height() * 2 - 1) / zoom - pan[1],
+            ]
+        )
+
+    def mousePressEvent(self, event: QMouseEvent | None):
+        """Center the main viewport on the clicked point unless a cat is followed"""
+        if event is None or self.canvas.state.followed_cat_id is not None:
+            return
+        position = event.position()
+        self.canvas.state.pan_offset = -self.world_position(position.x(), position.y())
+        self.canvas.update()
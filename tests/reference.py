@@ -0,0 +1,470 @@
+"""Brute-force reference of the cat rules and a differential harness for the backend engines
+
+With the `-DTEST` build every hiss roll succeeds, so the state of a cat depends
+only on the distance to its nearest neighbor in the plain coordinate system:
+"wants to fight" within `fight_radius`, "hisses" within `hiss_radius`, calm otherwise.
+`reference_states` finds that distance by comparing every pair of cats.
+
+The harness generates scenes of several classes, runs every engine of `ENGINES`
+on them and compares the states with the reference. A new engine is checked
+by adding it to `ENGINES`.
+
+Run `python -m tests.reference --scenes 1000 --max-cats 100000` for a full report.
+"""
+
+import argparse
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+from cffi import FFI
+
+from tests.utils import get_backend
+
+CALM, HISSES, WANTS_TO_FIGHT = 0, 1, 2
+# Relative margin of squared distances treated as equal to a radius:
+# the backend is built with `-ffast-math`, so such cats may go either way
+AMBIGUITY_TOLERANCE = 1e-9
+# Elements of a pairwise distance block, bounds memory of the reference
+BLOCK_SIZE = 1 << 22
+
+Radii = tuple[float, float]
+
+
+def plain_positions(positions: np.ndarray, width: int, height: int, scale: float):
+    """Same conversion from the OpenGL coordinates as `convert_opengl_to_plain_coordinates`"""
+    scale = float(np.float32(scale))
+    return np.column_stack(
+        [
+            positions[:, 0] * 0.5 * width * scale,
+            positions[:, 1] * 0.5 * height * scale,
+        ]
+    )
+
+
+def nearest_distances_sq(positions: np.ndarray) -> np.ndarray:
+    """Squared distance from every cat to its nearest other cat, infinite for a single cat"""
+    count = len(positions)
+    nearest = np.full(count, np.inf)
+    rows = max(1, BLOCK_SIZE // max(count, 1))
+    for start in range(0, count, rows):
+        block = positions[start : start + rows]
+        dx = block[:, None, 0] - positions[None, :, 0]
+        dy = block[:, None, 1] - positions[None, :, 1]
+        distances_sq = dx * dx
+        distances_sq += dy * dy
+        # A cat is not its own neighbor
+        distances_sq[np.arange(len(block)), np.arange(start, start + len(block))] = (
+            np.inf
+        )
+        nearest[start : start + rows] = distances_sq.min(axis=1)
+    return nearest
+
+
+def reference_states(
+    nearest_sq: np.ndarray, radii: Radii
+) -> tuple[np.ndarray, np.ndarray]:
+    """States given by the nearest distances, and the mask of cats too close to a radius to tell"""
+    fight_radius_sq, hiss_radius_sq = radii[0] ** 2, radii[1] ** 2
+    states = np.full(len(nearest_sq), CALM, dtype=np.uint8)
+    states[nearest_sq <= hiss_radius_sq] = HISSES
+    states[nearest_sq <= fight_radius_sq] = WANTS_TO_FIGHT
+    ambiguous = np.zeros(len(nearest_sq), dtype=bool)
+    for radius_sq in (fight_radius_sq, hiss_radius_sq):
+        ambiguous |= np.abs(nearest_sq - radius_sq) <= AMBIGUITY_TOLERANCE * radius_sq
+    return states, ambiguous
+
+
+# Scenes
+
+
+@dataclass
+class Scene:
+    name: str
+    # Positions of cats in the OpenGL coordinate system, one array per consecutive calculation
+    frames: list[np.ndarray]
+    width: int
+    height: int
+    scale: float = 1.0
+    radii: list[Radii] = field(default_factory=lambda: [(15.0, 30.0)])
+
+    @property
+    def num_cats(self) -> int:
+        return len(self.frames[0])
+
+
+def _window(count: int, spacing: float) -> int:
+    """Window size giving about `spacing` pixels between neighboring cats"""
+    return max(2, int(np.sqrt(count) * spacing))
+
+
+def _opengl(plain: np.ndarray, size: int) -> np.ndarray:
+    return plain / (0.5 * size)
+
+
+def _uniform(rng: np.random.Generator, count: int) -> Scene:
+    size = _window(count, rng.uniform(5.0, 60.0))
+    positions = rng.uniform(-1.0, 1.0, size=(count, 2))
+    return Scene("uniform", [_opengl(positions * 0.5 * size, size)], size, size)
+
+
+def _clusters(rng: np.random.Generator, count: int) -> Scene:
+    size = _window(count, rng.uniform(20.0, 80.0))
+    centers = rng.uniform(-0.4, 0.4, size=(rng.integers(1, 20), 2)) * size
+    ids = rng.integers(0, len(centers), size=count)
+    plain = centers[ids] + rng.normal(0.0, rng.uniform(5.0, 60.0), size=(count, 2))
+    return Scene("clusters", [_opengl(plain, size)], size, size)
+
+
+def _rings(rng: np.random.Generator, count: int) -> Scene:
+    size = _window(count, rng.uniform(10.0, 60.0))
+    radii = rng.uniform(0.05, 0.45, size=4)[rng.integers(0, 4, size=count)] * size
+    angles = rng.uniform(0.0, 2 * np.pi, size=count)
+    plain = np.column_stack([np.cos(angles), np.sin(angles)]) * radii[:, None]
+    return Scene("rings", [_opengl(plain, size)], size, size)
+
+
+def _lattice(rng: np.random.Generator, count: int) -> Scene:
+    """Many equal distances, none of them close to a radius"""
+    spacing = rng.choice([10.0, 20.0, 40.0])
+    side = int(np.ceil(np.sqrt(count)))
+    grid = np.stack(np.meshgrid(np.arange(side), np.arange(side)), axis=-1)
+    plain = (grid.reshape(-1, 2)[:count] - side / 2) * spacing
+    size = _window(side * side, spacing) + 2 * int(spacing)
+    return Scene("lattice", [_opengl(plain, size)], size, size)
+
+
+def _duplicates(rng: np.random.Generator, count: int) -> Scene:
+    """Cats at exactly the same positions"""
+    size = _window(count, rng.uniform(20.0, 60.0))
+    unique = rng.uniform(-0.5, 0.5, size=(max(1, count // 2), 2)) * size
+    plain = unique[rng.integers(0, len(unique), size=count)]
+    return Scene("duplicates", [_opengl(plain, size)], size, size)
+
+
+def _boundary(rng: np.random.Generator, count: int) -> Scene:
+    """Isolated pairs of cats just inside and just outside of both radii"""
+    fight_radius, hiss_radius = 15.0, 30.0
+    pairs = max(1, count // 2)
+    distances = np.array([fight_radius, hiss_radius])[rng.integers(0, 2, size=pairs)]
+    distances *= 1.0 + rng.choice([-1e-6, 1e-6], size=pairs)
+    side = int(np.ceil(np.sqrt(pairs)))
+    spacing = 4 * hiss_radius
+    first = (
+        np.stack(np.meshgrid(np.arange(side), np.arange(side)), axis=-1).reshape(-1, 2)[
+            :pairs
+        ]
+        - side / 2
+    ) * spacing
+    angles = rng.uniform(0.0, 2 * np.pi, size=pairs)
+    second = (
+        first + np.column_stack([np.cos(angles), np.sin(angles)]) * distances[:, None]
+    )
+    # Pairs are placed in plain coordinates of a 2x2 window without scale, so they are kept exactly
+    plain = np.concatenate([first, second])
+    return Scene("boundary", [plain], 2, 2, radii=[(fight_radius, hiss_radius)])
+
+
+def _drift(rng: np.random.Generator, count: int) -> Scene:
+    """Consecutive calculations of moving cats, so that neighbor lists are reused and rebuilt"""
+    scene = _uniform(rng, count)
+    frames = [scene.frames[0]]
+    for step in (1.0, 2.0, 5.0, 40.0):
+        frames.append(
+            frames[-1] + rng.normal(0.0, step / scene.width, size=frames[-1].shape)
+        )
+    return Scene("drift", frames, scene.width, scene.height)
+
+
+def _radius_sweep(rng: np.random.Generator, count: int) -> Scene:
+    """Several radius pairs over the same positions"""
+    scene = _uniform(rng, count)
+    scene.name = "radius_sweep"
+    scene.radii = [(5.0, 10.0), (15.0, 30.0), (25.0, 60.0)]
+    return scene
+
+
+SCENE_CLASSES: dict[str, Callable[[np.random.Generator, int], Scene]] = {
+    "uniform": _uniform,
+    "clusters": _clusters,
+    "rings": _rings,
+    "lattice": _lattice,
+    "duplicates": _duplicates,
+    "boundary": _boundary,
+    "drift": _drift,
+    "radius_sweep": _radius_sweep,
+}
+
+
+def generate_scenes(
+    scene_class: str, scenes: int, max_cats: int, seed: int = 0
+) -> Iterator[Scene]:
+    """Scenes with log-uniform numbers of cats from 1 to `max_cats`"""
+    rng = np.random.default_rng([seed, list(SCENE_CLASSES).index(scene_class)])
+    for _ in range(scenes):
+        count = int(np.exp(rng.uniform(0.0, np.log(max_cats + 1))))
+        yield SCENE_CLASSES[scene_class](rng, max(1, count))
+
+
+# Engines
+
+
+class Engine:
+    """Calculation of states by a backend engine, created anew for every scene"""
+
+    # Precision of positions passed to the backend, the reference gets the same rounded positions
+    POSITION_DTYPE: type = np.float64
+
+    def __init__(self, ffi: FFI, lib, scene: Scene):
+        self.ffi = ffi
+        self.lib = lib
+        self.scene = scene
+
+    def calculate(self, positions: np.ndarray) -> list[np.ndarray]:
+        """States of every radius pair of the scene"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def _calculate_f64(self, calculate: Callable, positions: np.ndarray) -> np.ndarray:
+        positions = np.ascontiguousarray(positions, dtype=np.float64)
+        states_ptr = calculate(
+            len(positions),
+            self.ffi.cast("OpenGlPosition *", self.ffi.from_buffer(positions)),
+            self.scene.width,
+            self.scene.height,
+            self.scene.scale,
+        )
+        states = np.frombuffer(
+            self.ffi.buffer(states_ptr, len(positions) * self.ffi.sizeof("int")),
+            dtype=np.intc,
+        ).astype(np.uint8)
+        self.lib.drunk_cats_free_states(states_ptr)
+        return states
+
+
+class GlobalEngine(Engine):
+    """`drunk_cats_calculate_states` of the default world"""
+
+    def __init__(self, ffi: FFI, lib, scene: Scene):
+        super().__init__(ffi, lib, scene)
+        # Configuring drops neighbor lists, so with a single radius pair they are kept between frames
+        lib.drunk_cats_configure(*scene.radii[0])
+
+    def calculate(self, positions: np.ndarray) -> list[np.ndarray]:
+        results = []
+        for radii in self.scene.radii:
+            if len(self.scene.radii) > 1:
+                self.lib.drunk_cats_configure(*radii)
+            results.append(
+                self._calculate_f64(self.lib.drunk_cats_calculate_states, positions)
+            )
+        return results
+
+
+class SinglePrecisionEngine(Engine):
+    """`drunk_cats_world_calculate_states_f32` of a world per radius pair, reusing neighbor lists"""
+
+    POSITION_DTYPE = np.float32
+    SKIN = 15.0
+
+    def __init__(self, ffi: FFI, lib, scene: Scene):
+        super().__init__(ffi, lib, scene)
+        self.worlds = [lib.drunk_cats_world_create(*radii) for radii in scene.radii]
+        for world in self.worlds:
+            lib.drunk_cats_world_configure_neighbor_list(world, self.SKIN)
+
+    def calculate(self, positions: np.ndarray) -> list[np.ndarray]:
+        positions = np.ascontiguousarray(positions, dtype=np.float32)
+        results = []
+        for world in self.worlds:
+            states = np.empty(len(positions), dtype=np.uint8)
+            self.lib.drunk_cats_world_calculate_states_f32(
+                world,
+                len(positions),
+                self.ffi.cast("OpenGlPositionF32 *", self.ffi.from_buffer(positions)),
+                self.scene.width,
+                self.scene.height,
+                self.scene.scale,
+                self.ffi.cast("uint8_t *", self.ffi.from_buffer(states)),
+            )
+            results.append(states)
+        return results
+
+    def close(self):
+        for world in self.worlds:
+            self.lib.drunk_cats_world_destroy(world)
+
+
+class InteractionEngine(SinglePrecisionEngine):
+    """`drunk_cats_world_calculate_interactions` collecting all interactions in the same pass"""
+
+    def calculate(self, positions: np.ndarray) -> list[np.ndarray]:
+        positions = np.ascontiguousarray(positions, dtype=np.float32)
+        count = len(positions)
+        neighbor_counts = np.empty(count, dtype=np.uint32)
+        nearest_rivals = np.empty(count, dtype=np.int64)
+        fight_pairs = np.empty((count, 2), dtype=np.uint32)
+        interactions = self.ffi.new("DrunkCatsInteractions *")
+        interactions.neighbor_counts = self.ffi.from_buffer(
+            "uint32_t[]", neighbor_counts
+        )
+        interactions.nearest_rivals = self.ffi.from_buffer("int64_t[]", nearest_rivals)
+        interactions.fight_pairs = self.ffi.from_buffer("uint32_t[]", fight_pairs)
+        interactions.fight_pairs_capacity = count
+        results = []
+        for world in self.worlds:
+            states = np.empty(count, dtype=np.uint8)
+            self.lib.drunk_cats_world_calculate_interactions(
+                world,
+                count,
+                self.ffi.cast("OpenGlPositionF32 *", self.ffi.from_buffer(positions)),
+                self.scene.width,
+                self.scene.height,
+                self.scene.scale,
+                self.ffi.cast("uint8_t *", self.ffi.from_buffer(states)),
+                interactions,
+            )
+            results.append(states)
+        return results
+
+
+class SweepEngine(Engine):
+    """`drunk_cats_calculate_states_sweep` of all radius pairs at once"""
+
+    def calculate(self, positions: np.ndarray) -> list[np.ndarray]:
+        positions = np.ascontiguousarray(positions, dtype=np.float64)
+        radii = self.ffi.new("DrunkCatsRadii[]", self.scene.radii)
+        count, pairs = len(positions), len(self.scene.radii)
+        states_ptr = self.lib.drunk_cats_calculate_states_sweep(
+            count,
+            self.ffi.cast("OpenGlPosition *", self.ffi.from_buffer(positions)),
+            self.scene.width,
+            self.scene.height,
+            self.scene.scale,
+            pairs,
+            radii,
+        )
+        states = np.frombuffer(
+            self.ffi.buffer(states_ptr, count * pairs * self.ffi.sizeof("int")),
+            dtype=np.intc,
+        ).astype(np.uint8)
+        self.lib.drunk_cats_free_states(states_ptr)
+        return list(states.reshape(pairs, count))
+
+
+ENGINES: dict[str, type[Engine]] = {
+    "calculate_states": GlobalEngine,
+    "world_calculate_states_f32": SinglePrecisionEngine,
+    "calculate_states_sweep": SweepEngine,
+    "world_calculate_interactions": InteractionEngine,
+}
+
+
+# Harness
+
+
+@dataclass
+class SceneResult:
+    scene_class: str
+    engine: str
+    num_cats: int
+    # Cats compared over all frames and radius pairs, cats too close to a radius are skipped
+    compared: int
+    mismatches: int
+    reference_seconds: float
+    engine_seconds: float
+    # Description of the first mismatch
+    first_mismatch: Optional[str] = None
+
+    @property
+    def speedup(self) -> float:
+        return self.reference_seconds / max(self.engine_seconds, 1e-9)
+
+
+def compare_scene(ffi: FFI, lib, engine_name: str, scene: Scene) -> SceneResult:
+    engine = ENGINES[engine_name](ffi, lib, scene)
+    result = SceneResult(scene.name, engine_name, scene.num_cats, 0, 0, 0.0, 0.0)
+    try:
+        for frame_index, positions in enumerate(scene.frames):
+            positions = positions.astype(engine.POSITION_DTYPE).astype(np.float64)
+            started_at = time.perf_counter()
+            nearest_sq = nearest_distances_sq(
+                plain_positions(positions, scene.width, scene.height, scene.scale)
+            )
+            expected = [reference_states(nearest_sq, radii) for radii in scene.radii]
+            result.reference_seconds += time.perf_counter() - started_at
+
+            started_at = time.perf_counter()
+            actual = engine.calculate(positions)
+            result.engine_seconds += time.perf_counter() - started_at
+
+            for radii, (states, ambiguous), got in zip(scene.radii, expected, actual):
+                mismatched = np.flatnonzero((states != got) & ~ambiguous)
+                result.compared += int(np.count_nonzero(~ambiguous))
+                result.mismatches += len(mismatched)
+                if len(mismatched) and result.first_mismatch is None:
+                    cat = mismatched[0]
+                    result.first_mismatch = (
+                        f"frame {frame_index}, radii {radii}, cat {cat}: "
+                        f"expected {states[cat]}, got {got[cat]}, "
+                        f"nearest distance {np.sqrt(nearest_sq[cat])}"
+                    )
+    finally:
+        engine.close()
+    return result
+
+
+def run_differential(
+    scenes: int, max_cats: int, seed: int = 0, engines: Optional[list[str]] = None
+) -> list[SceneResult]:
+    ffi = FFI()
+    lib = get_backend(ffi)
+    results = []
+    for scene_class in SCENE_CLASSES:
+        for scene in generate_scenes(scene_class, scenes, max_cats, seed):
+            for engine_name in engines or list(ENGINES):
+                results.append(compare_scene(ffi, lib, engine_name, scene))
+    return results
+
+
+def format_report(results: list[SceneResult]) -> str:
+    """Mismatches and the median speedup over the reference per scene class and engine"""
+    header = f"{'scene class':<14} {'engine':<28} {'scenes':>6} {'max cats':>8} {'mismatches':>10} {'speedup':>8}"
+    lines = [header, "-" * len(header)]
+    groups: dict[tuple[str, str], list[SceneResult]] = {}
+    for result in results:
+        groups.setdefault((result.scene_class, result.engine), []).append(result)
+    for (scene_class, engine), group in groups.items():
+        speedup = float(np.median([result.speedup for result in group]))
+        lines.append(
+            f"{scene_class:<14} {engine:<28} {len(group):>6} "
+            f"{max(result.num_cats for result in group):>8} "
+            f"{sum(result.mismatches for result in group):>10} {speedup:>7.1f}x"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare backend engines with the brute-force reference",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--scenes", type=int, default=100, help="scenes per class")
+    parser.add_argument("--max-cats", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", action="append", choices=list(ENGINES))
+    args = parser.parse_args()
+
+    results = run_differential(args.scenes, args.max_cats, args.seed, args.engine)
+    print(format_report(results))
+    failures = [result for result in results if result.mismatches]
+    for result in failures:
+        print(f"{result.scene_class}/{result.engine}: {result.first_mismatch}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
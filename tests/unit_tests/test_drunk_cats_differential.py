@@ -0,0 +1,64 @@
+"""Backend engines against the brute-force reference on generated scenes
+
+Scale with `DRUNK_CATS_DIFFERENTIAL_SCENES` (scenes per class) and
+`DRUNK_CATS_DIFFERENTIAL_MAX_CATS`, run with `-s` to see the speedup report.
+"""
+
+import os
+
+import numpy as np
+import pytest
+from cffi import FFI
+
+from tests.reference import (
+    ENGINES,
+    SCENE_CLASSES,
+    compare_scene,
+    format_report,
+    generate_scenes,
+    nearest_distances_sq,
+    plain_positions,
+    reference_states,
+)
+from tests.utils import get_backend
+
+SCENES = int(os.environ.get("DRUNK_CATS_DIFFERENTIAL_SCENES", 10))
+MAX_CATS = int(os.environ.get("DRUNK_CATS_DIFFERENTIAL_MAX_CATS", 2000))
+SEED = int(os.environ.get("DRUNK_CATS_DIFFERENTIAL_SEED", 0))
+
+ffi = FFI()
+lib = get_backend(ffi)
+
+
+def test_reference_follows_the_rules():
+    # Arrange
+    positions = np.array([(0.0, 0.0), (0.0, 0.2), (0.0, 0.6), (0.9, 0.9)])
+
+    # Act
+    nearest_sq = nearest_distances_sq(plain_positions(positions, 20, 20, 1.0))
+    states, ambiguous = reference_states(nearest_sq, (3.0, 5.0))
+
+    # Assert
+    assert states.tolist() == [2, 2, 1, 0]
+    assert not ambiguous.any()
+
+
+@pytest.mark.parametrize("scene_class", list(SCENE_CLASSES))
+def test_engines_match_reference(scene_class: str):
+    # Arrange
+    scenes = list(generate_scenes(scene_class, SCENES, MAX_CATS, SEED))
+
+    # Act
+    results = [
+        compare_scene(ffi, lib, engine, scene) for scene in scenes for engine in ENGINES
+    ]
+
+    # Assert
+    print(f"\n{format_report(results)}")
+    failures = [
+        f"{result.engine}, {result.num_cats} cats: {result.first_mismatch}"
+        for result in results
+        if result.mismatches
+    ]
+    assert not failures
+    assert sum(result.compared for result in results) > 0
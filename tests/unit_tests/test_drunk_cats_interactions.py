@@ -0,0 +1,166 @@
+from tests.utils import get_backend
+import pytest
+import numpy as np
+from cffi import FFI
+
+window_width = 20
+window_height = 20
+scale = 1.0
+fight_radius = 3.0
+hiss_radius = 5.0
+
+ffi = FFI()
+lib = get_backend(ffi)
+
+
+@pytest.fixture
+def world():
+    world = lib.drunk_cats_world_create(fight_radius, hiss_radius)
+
+    yield world
+
+    lib.drunk_cats_world_destroy(world)
+
+
+def calculate_interactions(world, positions, fight_pairs_capacity=None):
+    points = np.ascontiguousarray(positions, dtype=np.float32)
+    count = len(points)
+    capacity = count * count if fight_pairs_capacity is None else fight_pairs_capacity
+    states = np.empty(count, dtype=np.uint8)
+    neighbor_counts = np.empty(count, dtype=np.uint32)
+    nearest_rivals = np.empty(count, dtype=np.int64)
+    fight_pairs = np.empty((max(capacity, 1), 2), dtype=np.uint32)
+
+    interactions = ffi.new("DrunkCatsInteractions *")
+    interactions.neighbor_counts = ffi.from_buffer("uint32_t[]", neighbor_counts)
+    interactions.nearest_rivals = ffi.from_buffer("int64_t[]", nearest_rivals)
+    interactions.fight_pairs = ffi.from_buffer("uint32_t[]", fight_pairs)
+    interactions.fight_pairs_capacity = capacity
+    lib.drunk_cats_world_calculate_interactions(
+        world,
+        count,
+        ffi.cast("OpenGlPositionF32 *", ffi.from_buffer(points)),
+        window_width,
+        window_height,
+        scale,
+        ffi.cast("uint8_t *", ffi.from_buffer(states)),
+        interactions,
+    )
+    pair_count = int(interactions.fight_pair_count)
+    return (
+        states,
+        neighbor_counts,
+        nearest_rivals,
+        fight_pairs[: min(pair_count, capacity)],
+        pair_count,
+    )
+
+
+def calculate_states_f32(world, positions) -> np.ndarray:
+    points = np.ascontiguousarray(positions, dtype=np.float32)
+    states = np.empty(len(points), dtype=np.uint8)
+    lib.drunk_cats_world_calculate_states_f32(
+        world,
+        len(points),
+        ffi.cast("OpenGlPositionF32 *", ffi.from_buffer(points)),
+        window_width,
+        window_height,
+        scale,
+        ffi.cast("uint8_t *", ffi.from_buffer(states)),
+    )
+    return states
+
+
+def brute_force_interactions(positions):
+    """Neighbor counts, nearest rivals and fighting pairs by comparing all pairs of cats"""
+    plain = np.asarray(positions, dtype=np.float32).astype(np.float64) * (
+        0.5 * window_width * scale,
+        0.5 * window_height * scale,
+    )
+    dist_sq = ((plain[:, None, :] - plain[None, :, :]) ** 2).sum(axis=2)
+    np.fill_diagonal(dist_sq, np.inf)
+    within_hiss = dist_sq <= hiss_radius**2
+    nearest = np.where(within_hiss.any(axis=1), dist_sq.argmin(axis=1), -1)
+    first, second = np.nonzero(np.triu(dist_sq <= fight_radius**2))
+    return within_hiss.sum(axis=1), nearest, np.stack([first, second], axis=1)
+
+
+def random_positions(count: int, extent: float, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).uniform(-extent, extent, (count, 2))
+
+
+def test_interactions_of_a_small_scene(world):
+    positions = [(0.0, 0.0), (0.0, 0.2), (0.0, 0.6), (0.0, 1.9)]
+
+    states, neighbor_counts, nearest_rivals, fight_pairs, pair_count = (
+        calculate_interactions(world, positions)
+    )
+
+    assert states.tolist() == [2, 2, 1, 0]
+    assert neighbor_counts.tolist() == [1, 2, 1, 0]
+    assert nearest_rivals.tolist() == [1, 0, 1, -1]
+    assert fight_pairs.tolist() == [[0, 1]]
+    assert pair_count == 1
+
+
+@pytest.mark.parametrize(
+    "count, extent, search",
+    [
+        (500, 1.0, "neighbor_list_builds"),
+        (600, 0.05, "kd_tree_searches"),
+    ],
+)
+def test_interactions_match_states_and_brute_force(world, count, extent, search):
+    positions = random_positions(count, extent)
+    other_world = lib.drunk_cats_world_create(fight_radius, hiss_radius)
+
+    try:
+        expected_states = calculate_states_f32(other_world, positions)
+    finally:
+        lib.drunk_cats_world_destroy(other_world)
+    states, neighbor_counts, nearest_rivals, fight_pairs, pair_count = (
+        calculate_interactions(world, positions)
+    )
+
+    stats = ffi.new("DrunkCatsStats *")
+    lib.drunk_cats_world_get_stats(world, stats)
+    assert getattr(stats, search) == 1
+    expected_counts, expected_nearest, expected_pairs = brute_force_interactions(
+        positions
+    )
+    assert np.array_equal(states, expected_states)
+    assert np.array_equal(neighbor_counts, expected_counts)
+    assert np.array_equal(nearest_rivals, expected_nearest)
+    assert pair_count == len(expected_pairs)
+    assert np.array_equal(fight_pairs[np.lexsort(fight_pairs.T[::-1])], expected_pairs)
+
+
+def test_fight_pairs_beyond_capacity_are_counted_only(world):
+    positions = [(0.0, 0.0), (0.0, 0.1), (0.1, 0.0), (1.5, 1.5)]
+
+    *_, fight_pairs, pair_count = calculate_interactions(
+        world, positions, fight_pairs_capacity=2
+    )
+
+    assert pair_count == 3
+    assert fight_pairs.tolist() == [[0, 1], [0, 2]]
+
+
+def test_interactions_are_optional(world):
+    positions = np.array([(0.0, 0.0), (0.0, 0.2), (0.0, 0.6)], dtype=np.float32)
+    states = np.empty(len(positions), dtype=np.uint8)
+    interactions = ffi.new("DrunkCatsInteractions *")
+
+    lib.drunk_cats_world_calculate_interactions(
+        world,
+        len(positions),
+        ffi.cast("OpenGlPositionF32 *", ffi.from_buffer(positions)),
+        window_width,
+        window_height,
+        scale,
+        ffi.cast("uint8_t *", ffi.from_buffer(states)),
+        interactions,
+    )
+
+    assert states.tolist() == [2, 2, 1]
+    assert interactions.fight_pair_count == 1
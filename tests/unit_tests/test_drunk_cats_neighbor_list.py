@@ -0,0 +1,119 @@
+from tests.utils import get_backend
+import pytest
+import numpy as np
+from cffi import FFI
+
+window_width = 20
+window_height = 20
+scale = 1.0
+
+ffi = FFI()
+lib = get_backend(ffi)
+
+
+@pytest.fixture
+def backend():
+    lib.drunk_cats_configure(3.0, 5.0)
+    lib.drunk_cats_configure_neighbor_list(4.0)
+    lib.drunk_cats_reset_stats()
+
+    yield lib
+
+    lib.drunk_cats_configure_neighbor_list(0.0)
+
+
+def calculate_states(backend, positions) -> list[int]:
+    array = np.array(positions, dtype=np.float64)
+    states = backend.drunk_cats_calculate_states(
+        len(positions),
+        ffi.cast("OpenGlPosition *", ffi.from_buffer(array)),
+        window_width,
+        window_height,
+        scale,
+    )
+    result = [states[i] for i in range(len(positions))]
+    backend.drunk_cats_free_states(states)
+    return result
+
+
+def get_stats(backend):
+    stats = ffi.new("DrunkCatsStats *")
+    backend.drunk_cats_get_stats(stats)
+    return stats
+
+
+def test_lists_reused_for_same_positions(backend):
+    positions = [(0.0, 0.0), (0.0, 0.2), (0.0, 0.6)]
+
+    assert calculate_states(backend, positions) == [2, 2, 1]
+    assert calculate_states(backend, positions) == [2, 2, 1]
+
+    stats = get_stats(backend)
+    assert stats.calls == 2
+    assert stats.neighbor_list_builds == 1
+    assert stats.neighbor_list_reuses == 1
+
+
+def test_reused_lists_see_cats_moved_within_skin(backend):
+    # Distance 6 is out of the hiss radius, but within the hiss radius plus skin
+    assert calculate_states(backend, [(0.0, 0.0), (0.0, 0.6)]) == [0, 0]
+    # Each cat moves by 1, which is within half of the skin
+    assert calculate_states(backend, [(0.0, 0.1), (0.0, 0.5)]) == [1, 1]
+
+    stats = get_stats(backend)
+    assert stats.neighbor_list_builds == 1
+    assert stats.neighbor_list_reuses == 1
+
+
+def test_lists_rebuilt_when_cats_move_too_far(backend):
+    assert calculate_states(backend, [(0.0, 0.0), (0.0, 1.0)]) == [0, 0]
+    # The second cat moves by 8, which is more than half of the skin
+    assert calculate_states(backend, [(0.0, 0.0), (0.0, 0.2)]) == [2, 2]
+
+    stats = get_stats(backend)
+    assert stats.neighbor_list_builds == 2
+    assert stats.neighbor_list_reuses == 0
+
+
+def test_lists_rebuilt_when_cat_count_changes(backend):
+    assert calculate_states(backend, [(0.0, 0.0), (0.0, 0.2)]) == [2, 2]
+    assert calculate_states(backend, [(0.0, 0.0), (0.0, 0.2), (0.0, 0.6)]) == [
+        2,
+        2,
+        1,
+    ]
+
+    assert get_stats(backend).neighbor_list_builds == 2
+
+
+def test_lists_rebuilt_after_reconfiguration(backend):
+    positions = [(0.0, 0.0), (0.0, 0.4)]
+
+    assert calculate_states(backend, positions) == [1, 1]
+    backend.drunk_cats_configure(5.0, 7.0)
+    assert calculate_states(backend, positions) == [2, 2]
+
+    assert get_stats(backend).neighbor_list_builds == 2
+
+
+def test_crowded_cats_use_kd_tree_search(backend):
+    positions = [(0.0, 0.001 * i) for i in range(300)]
+
+    assert calculate_states(backend, positions) == [2] * 300
+
+    stats = get_stats(backend)
+    assert stats.kd_tree_searches == 1
+    assert stats.neighbor_list_builds == 0
+    assert stats.neighbor_count == 0
+
+
+def test_negative_skin_is_rejected(backend):
+    # Act
+    result = backend.drunk_cats_configure_neighbor_list(-1.0)
+
+    # Assert
+    assert result == -1
+    # Lists are still searched with the previous skin of 4
+    assert calculate_states(backend, [(0.0, 0.0), (0.0, 0.6)]) == [0, 0]
+    assert calculate_states(backend, [(0.0, 0.1), (0.0, 0.5)]) == [1, 1]
+    assert get_stats(backend).neighbor_list_builds == 1
@@ -0,0 +1,131 @@
+from tests.utils import get_backend
+import pytest
+import numpy as np
+from cffi import FFI
+
+window_width = 20
+window_height = 20
+scale = 1.0
+
+ffi = FFI()
+lib = get_backend(ffi)
+
+
+@pytest.fixture
+def world():
+    world = lib.drunk_cats_world_create(3.0, 5.0)
+
+    yield world
+
+    lib.drunk_cats_world_destroy(world)
+
+
+def positions_ptr(positions):
+    array = np.array(positions, dtype=np.float64)
+    return array, ffi.cast("OpenGlPosition *", ffi.from_buffer(array))
+
+
+def calculate_world_states(world, positions) -> list[int]:
+    array, ptr = positions_ptr(positions)
+    states = lib.drunk_cats_world_calculate_states(
+        world, len(positions), ptr, window_width, window_height, scale
+    )
+    result = [states[i] for i in range(len(positions))]
+    lib.drunk_cats_free_states(states)
+    return result
+
+
+def get_world_stats(world):
+    stats = ffi.new("DrunkCatsStats *")
+    lib.drunk_cats_world_get_stats(world, stats)
+    return stats
+
+
+def test_world_uses_its_own_radii(world):
+    positions = [(0.0, 0.0), (0.0, 0.2), (0.0, 0.6)]
+    other_world = lib.drunk_cats_world_create(1.0, 2.0)
+
+    try:
+        assert calculate_world_states(world, positions) == [2, 2, 1]
+        assert calculate_world_states(other_world, positions) == [1, 1, 0]
+    finally:
+        lib.drunk_cats_world_destroy(other_world)
+
+
+def test_world_is_independent_of_global_configuration(world):
+    lib.drunk_cats_configure(1.0, 2.0)
+
+    assert calculate_world_states(world, [(0.0, 0.0), (0.0, 0.2)]) == [2, 2]
+
+
+def test_world_has_its_own_stats(world):
+    lib.drunk_cats_reset_stats()
+
+    calculate_world_states(world, [(0.0, 0.0), (0.0, 0.2)])
+    calculate_world_states(world, [(0.0, 0.0), (0.0, 0.2)])
+
+    global_stats = ffi.new("DrunkCatsStats *")
+    lib.drunk_cats_get_stats(global_stats)
+    assert global_stats.calls == 0
+    assert get_world_stats(world).calls == 2
+
+    lib.drunk_cats_world_reset_stats(world)
+    assert get_world_stats(world).calls == 0
+
+
+def test_world_reconfiguration_rebuilds_neighbor_lists(world):
+    positions = [(0.0, 0.0), (0.0, 0.6)]
+    lib.drunk_cats_world_configure_neighbor_list(world, 4.0)
+
+    assert calculate_world_states(world, positions) == [0, 0]
+    lib.drunk_cats_world_configure(world, 3.0, 7.0)
+    assert calculate_world_states(world, positions) == [1, 1]
+
+    assert get_world_stats(world).neighbor_list_builds == 2
+
+
+@pytest.mark.parametrize("cat_count", [3, 1000])
+def test_sweep_matches_separate_calls(cat_count):
+    rng = np.random.default_rng(0)
+    # 1000 cats in a 20x20 window are crowded enough for the kd-tree fallback
+    positions = rng.uniform(-1.0, 1.0, size=(cat_count, 2))
+    radii = [(1.0, 2.0), (3.0, 5.0), (0.5, 4.0)]
+    radii_array = ffi.new("DrunkCatsRadii[]", radii)
+    array, ptr = positions_ptr(positions)
+
+    states = lib.drunk_cats_calculate_states_sweep(
+        cat_count, ptr, window_width, window_height, scale, len(radii), radii_array
+    )
+    sweep = [
+        [states[k * cat_count + i] for i in range(cat_count)] for k in range(len(radii))
+    ]
+    lib.drunk_cats_free_states(states)
+
+    for k, (fight_radius, hiss_radius) in enumerate(radii):
+        world = lib.drunk_cats_world_create(fight_radius, hiss_radius)
+        try:
+            assert sweep[k] == calculate_world_states(world, positions)
+        finally:
+            lib.drunk_cats_world_destroy(world)
+
+
+def test_f32_states_match_double_precision_states(world):
+    # Arrange
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-1.0, 1.0, size=(200, 2)).astype(np.float32)
+    states = np.full(len(positions), 7, dtype=np.uint8)
+
+    # Act
+    lib.drunk_cats_world_calculate_states_f32(
+        world,
+        len(positions),
+        ffi.cast("OpenGlPositionF32 *", ffi.from_buffer(positions)),
+        window_width,
+        window_height,
+        scale,
+        ffi.cast("uint8_t *", ffi.from_buffer(states)),
+    )
+
+    # Assert
+    expected = calculate_world_states(world, positions.astype(np.float64))
+    assert states.tolist() == expected
@@ -0,0 +1,75 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+from frontend.constants import UpdateIntervals
+from frontend.core.core import Core
+from frontend.ui.activity import (
+    BACKGROUND,
+    FOREGROUND,
+    HIDDEN,
+    BackgroundThrottle,
+    window_activity,
+)
+from frontend.ui.widgets.moving_points_canvas import MovingPointsCanvas
+
+
+def test_window_activity():
+    # Act
+    activities = [
+        window_activity(exposed, active)
+        for exposed, active in [(True, True), (True, False), (False, True)]
+    ]
+
+    # Assert
+    assert activities == [FOREGROUND, BACKGROUND, HIDDEN]
+
+
+def test_throttle_slows_timers_down_in_the_background_only():
+    # Arrange
+    throttle = BackgroundThrottle(slowdown=4.0)
+    rates = []
+
+    # Act
+    for activity in (BACKGROUND, HIDDEN, FOREGROUND):
+        changed = throttle.set_activity(activity)
+        rates.append(
+            (changed, throttle.position_substeps(2), throttle.timer_interval(500))
+        )
+
+    # Assert
+    assert rates == [(True, 8, 2000), (True, 8, 2000), (True, 2, 500)]
+    assert not throttle.set_activity(FOREGROUND)
+
+
+@pytest.mark.parametrize("slowdown", [0.5, float("nan")])
+def test_throttle_rejects_speeding_up(slowdown):
+    with pytest.raises(ValueError):
+        BackgroundThrottle(slowdown=slowdown)
+
+
+def test_canvas_throttles_target_updates_while_not_active():
+    # Arrange
+    # The canvas is never shown, so no display is needed
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication([])
+    canvas = MovingPointsCanvas(
+        Core(["--seed", "1"]), num_points=50, background_slowdown=4.0
+    )
+    canvas.stop_state_updates()
+    canvas.buffers = MagicMock()
+    intervals = []
+
+    # Act
+    for activity in (BACKGROUND, HIDDEN, FOREGROUND):
+        with patch.object(canvas, "update_states"):
+            canvas.set_activity(activity)
+        intervals.append(canvas.target_update_timer.interval())
+
+    # Assert
+    target = UpdateIntervals.TARGET_UPDATE
+    assert intervals == [4 * target, 4 * target, target]
+    canvas.deleteLater()
+    app.processEvents()
@@ -0,0 +1,91 @@
+import numpy as np
+
+from frontend.core.aggregate import STATE_COUNT, StateGrid
+from frontend.core.world import Rect
+
+
+def count_in_cells(positions, states, rect: Rect, grid: StateGrid) -> np.ndarray:
+    """Brute-force count of cats in the cells the rectangle touches"""
+    cell = 2.0 / grid.resolution
+    low_x = -1.0 + np.floor((rect.min_x + 1.0) / cell) * cell
+    low_y = -1.0 + np.floor((rect.min_y + 1.0) / cell) * cell
+    high_x = -1.0 + (np.floor((rect.max_x + 1.0) / cell) + 1) * cell
+    high_y = -1.0 + (np.floor((rect.max_y + 1.0) / cell) + 1) * cell
+    inside = (
+        (positions[:, 0] >= low_x)
+        & (positions[:, 0] < high_x)
+        & (positions[:, 1] >= low_y)
+        & (positions[:, 1] < high_y)
+    )
+    return np.bincount(states[inside], minlength=STATE_COUNT)
+
+
+def test_rectangle_counts_match_brute_force():
+    # Arrange
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-0.999, 0.999, size=(20_000, 2))
+    states = rng.integers(0, STATE_COUNT, size=len(positions))
+    grid = StateGrid(resolution=16, bounds=Rect(-1.0, -1.0, 1.0, 1.0))
+    rects = [Rect(-0.5, -0.25, 0.3, 0.9), Rect(0.1, 0.1, 0.1, 0.1)]
+
+    # Act
+    grid.update(positions, states)
+
+    # Assert
+    assert grid.totals().tolist() == np.bincount(states).tolist()
+    for rect in rects:
+        expected = count_in_cells(positions, states, rect, grid)
+        assert grid.counts(rect).tolist() == expected.tolist()
+
+
+def test_cats_outside_of_bounds_are_counted_in_border_cells():
+    # Arrange
+    positions = np.array([[-5.0, 0.0], [3.0, 3.0]])
+    states = np.array([1, 2])
+    grid = StateGrid(resolution=4, bounds=Rect(-1.0, -1.0, 1.0, 1.0))
+
+    # Act
+    grid.update(positions, states)
+
+    # Assert
+    assert grid.counts(Rect(-1.0, -0.1, -0.9, 0.1)).tolist() == [0, 1, 0]
+    assert grid.counts(Rect(0.9, 0.9, 1.0, 1.0)).tolist() == [0, 0, 1]
+    assert grid.totals().tolist() == [0, 1, 1]
+
+
+def test_incremental_update_matches_rebuild_and_rebins_changed_cats_only():
+    # Arrange
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(-1.0, 1.0, size=(5_000, 2))
+    states = rng.integers(0, STATE_COUNT, size=len(positions))
+    grid = StateGrid(resolution=8)
+    grid.update(positions, states)
+    states[:10] = (states[:10] + 1) % STATE_COUNT
+
+    # Act
+    grid.update(positions, states)
+    rebuilt = StateGrid(resolution=8)
+    rebuilt.update(positions, states)
+
+    # Assert
+    assert grid.changed_cats == 10
+    rect = Rect(-0.3, -0.8, 0.6, 0.2)
+    assert grid.counts(rect).tolist() == rebuilt.counts(rect).tolist()
+    assert grid.totals().tolist() == rebuilt.totals().tolist()
+
+
+def test_fitted_bounds_follow_cats_out_of_the_view():
+    # Arrange
+    positions = np.array([[0.0, 0.0], [0.5, 0.5]])
+    states = np.array([0, 1])
+    grid = StateGrid(resolution=64)
+    grid.update(positions, states)
+
+    # Act
+    positions[1] = [40.0, -30.0]
+    grid.update(positions, states)
+
+    # Assert
+    assert grid.changed_cats == 2
+    assert grid.counts(Rect(39.0, -31.0, 41.0, -29.0)).tolist() == [0, 1, 0]
+    assert grid.counts(Rect(-1.0, -1.0, 1.0, 1.0)).tolist() == [1, 0, 0]
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+from frontend.core.backend import read_declarations
+
+
+def test_read_declarations():
+    # Act
+    declarations = read_declarations()
+
+    # Assert
+    assert "drunk_cats_calculate_states" in declarations
+    assert not any(line.startswith("#") for line in declarations.splitlines())
+
+
+def test_headless_import_does_not_load_gui_modules():
+    # Arrange
+    script = (
+        "import sys, frontend.core.core; "
+        "print(sorted({m.split('.')[0] for m in sys.modules} & "
+        "{'PyQt6', 'moderngl', 'OpenGL'}))"
+    )
+
+    # Act
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).parent.parent.parent,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    # Assert
+    assert output.strip() == "[]"
@@ -0,0 +1,59 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+from frontend.core.core import Core
+from frontend.ui.activity import FOREGROUND, HIDDEN
+from frontend.ui.widgets.moving_points_canvas import MovingPointsCanvas
+
+
+@pytest.fixture
+def canvas():
+    # The canvas is never shown, so no display is needed
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication([])
+    canvas = MovingPointsCanvas(Core(["--seed", "1"]), num_points=50)
+    canvas.stop_state_updates()
+    yield canvas
+    canvas.deleteLater()
+    app.processEvents()
+
+
+def test_follow_cat(canvas):
+    # Arrange
+    followed: list[bool] = []
+    canvas.follow_mode_changed.connect(followed.append)
+
+    # Act
+    canvas.follow_cat(3)
+
+    # Assert
+    assert canvas.state.followed_cat_id == 3
+    assert followed == [True]
+
+
+def test_cats_moved_while_hidden_are_uploaded_when_the_window_is_back(canvas):
+    # Arrange
+    canvas.buffers = MagicMock()
+    canvas.set_activity(HIDDEN)
+    for _ in range(3):
+        canvas.update_positions()
+    hidden_motion = canvas.motion_time
+    moved = canvas.points + canvas.deltas * hidden_motion
+
+    # Act
+    with patch.object(canvas, "update_states") as update_states:
+        canvas.set_activity(FOREGROUND)
+
+    # Assert
+    assert hidden_motion > 0.0
+    assert canvas.motion_time == 0.0
+    np.testing.assert_allclose(canvas.points, moved)
+    canvas.buffers.write_positions.assert_called_once()
+    np.testing.assert_array_equal(
+        canvas.buffers.write_positions.call_args.args[0], moved
+    )
+    update_states.assert_called_once()
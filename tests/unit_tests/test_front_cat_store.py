@@ -0,0 +1,91 @@
+import numpy as np
+
+from frontend.core.cat_store import CatStore
+
+
+def test_reset_copies_positions_with_fixed_dtypes():
+    # Arrange
+    store = CatStore()
+    positions = np.array([[0.5, -0.5], [0.25, 0.75]], dtype=np.float64)
+
+    # Act
+    store.reset(positions)
+
+    # Assert
+    assert store.count == 2
+    assert store.positions.dtype == np.float32
+    assert store.deltas.dtype == np.float32
+    assert store.states.dtype == np.uint8
+    np.testing.assert_array_equal(store.positions, positions)
+    assert not store.deltas.any() and not store.states.any()
+
+
+def test_shrinking_keeps_capacity_and_growing_zeroes_new_cats():
+    # Arrange
+    store = CatStore(4)
+    store.states[:] = 2
+    store.positions[:] = 1.0
+
+    # Act
+    store.resize(2)
+    store.resize(3)
+
+    # Assert
+    assert store.capacity == 4
+    assert store.states.tolist() == [2, 2, 0]
+    np.testing.assert_array_equal(store.positions[2], [0.0, 0.0])
+
+
+def test_growing_beyond_capacity_preserves_cats():
+    # Arrange
+    store = CatStore(4)
+    store.states[:] = [0, 1, 2, 1]
+
+    # Act
+    store.resize(5)
+
+    # Assert
+    assert store.capacity == 6
+    assert store.states.tolist() == [0, 1, 2, 1, 0]
+
+
+def test_views_share_memory_with_the_store():
+    # Arrange
+    store = CatStore(3)
+
+    # Act
+    positions = store.positions
+    positions += 0.5
+
+    # Assert
+    np.testing.assert_array_equal(store.positions, np.full((3, 2), 0.5))
+    assert store.positions.flags.c_contiguous and store.states.flags.c_contiguous
+
+
+def test_memory_per_cat():
+    # Arrange
+    store = CatStore(1000)
+
+    # Act
+    bytes_per_cat = store.nbytes / store.capacity
+
+    # Assert
+    assert bytes_per_cat == 17
+
+
+def test_adopted_arrays_are_used_without_copying():
+    # Arrange
+    store = CatStore(10)
+    positions = np.ones((4, 2), dtype=np.float32)
+    deltas = np.zeros((4, 2), dtype=np.float32)
+    states = np.full(4, 2, dtype=np.uint8)
+
+    # Act
+    store.adopt(positions, deltas, states)
+    store.states[0] = 1
+    store.resize(6)
+
+    # Assert
+    assert states[0] == 1
+    assert store.count == 6 and store.capacity >= 6
+    assert store.states.tolist() == [1, 2, 2, 2, 0, 0]
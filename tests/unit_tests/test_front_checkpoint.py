@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from frontend.core.checkpoint import Checkpoint, load_checkpoint, save_checkpoint
+
+
+def make_checkpoint(count: int) -> Checkpoint:
+    rng = np.random.default_rng(0)
+    return Checkpoint(
+        positions=rng.uniform(-1.0, 1.0, size=(count, 2)).astype(np.float32),
+        deltas=rng.uniform(-0.1, 0.1, size=(count, 2)).astype(np.float32),
+        states=rng.integers(0, 3, size=count).astype(np.uint8),
+        seed=2**63 + 5,
+        random_tick=17,
+        target_tick=9,
+        state_tick=16,
+        view={"zoom_factor": 2.0, "pan_offset": [0.5, -0.25], "followed_cat_id": 3},
+    )
+
+
+def test_checkpoint_is_restored_as_saved(tmp_path):
+    # Arrange
+    path = tmp_path / "cats.ckpt"
+    checkpoint = make_checkpoint(1001)
+
+    # Act
+    save_checkpoint(path, checkpoint)
+    restored = load_checkpoint(path)
+
+    # Assert
+    for name in ("positions", "deltas", "states"):
+        np.testing.assert_array_equal(
+            getattr(restored, name), getattr(checkpoint, name)
+        )
+        assert isinstance(getattr(restored, name), np.memmap)
+    assert (restored.seed, restored.random_tick) == (checkpoint.seed, 17)
+    assert (restored.target_tick, restored.state_tick) == (9, 16)
+    assert restored.view == checkpoint.view
+    assert not (tmp_path / "cats.ckpt.tmp").exists()
+
+
+def test_restored_arrays_are_copy_on_write(tmp_path):
+    # Arrange
+    path = tmp_path / "cats.ckpt"
+    save_checkpoint(path, make_checkpoint(10))
+    restored = load_checkpoint(path)
+
+    # Act
+    restored.positions += 1.0
+    restored.states[:] = 0
+
+    # Assert
+    np.testing.assert_array_equal(
+        load_checkpoint(path).positions, make_checkpoint(10).positions
+    )
+
+
+def test_other_files_are_rejected(tmp_path):
+    # Arrange
+    path = tmp_path / "cats.npy"
+    np.save(path, np.zeros((10, 2)))
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Not a checkpoint"):
+        load_checkpoint(path)
@@ -1,7 +1,11 @@
 import pytest
 import numpy as np
 from unittest.mock import MagicMock, patch
+from frontend.core.cat_store import CatStore
 from frontend.core.core import Core
+from frontend.core.metrics import metrics
+from frontend.core.simulation import Simulation
+from frontend.core.world import Rect
 from typing import no_type_check
 
 
@@ -77,3 +81,261 @@ def test_update_states(mock_load_backend_library, mock_initialize_ffi):
 
     expected_result = np.array([0, 1, 2], dtype=np.int32)
     np.testing.assert_array_equal(result, expected_result)
+
+
+@patch("frontend.core.core.Core._initialize_ffi", return_value=MagicMock())
+@patch("frontend.core.core.Core._load_backend_library", return_value=MagicMock())
+@patch("sys.argv", new=["program_name", "--world-size", "400"])
+def test_world_size_replaces_window_size(
+    mock_load_backend_library, mock_initialize_ffi
+):
+    # Arrange
+    core = Core()
+    core.global_scale = 2.0
+
+    # Act
+    plain_size = core.plain_size(800, 600)
+
+    # Assert
+    assert plain_size == (400, 400, 1.0)
+
+
+def test_single_precision_points_give_single_byte_states():
+    # Arrange
+    core = Core([])
+    core.lib.drunk_cats_configure_random(core.seed)
+    points = np.random.default_rng(0).uniform(-1.0, 1.0, size=(300, 2))
+
+    # Act
+    states = core.update_states(len(points), points.astype(np.float32), 200, 200)
+    # Same tick, so the same hiss rolls
+    core.lib.drunk_cats_configure_random(core.seed)
+    double_states = core.update_states(len(points), points, 200, 200)
+
+    # Assert
+    assert states.dtype == np.uint8
+    assert states.tolist() == double_states.tolist()
+
+
+def test_interactions_come_with_the_same_states():
+    # Arrange
+    core = Core([])
+    core.lib.drunk_cats_configure_random(core.seed)
+    points = np.random.default_rng(0).uniform(-1.0, 1.0, size=(300, 2))
+    points = points.astype(np.float32)
+
+    # Act
+    states = core.update_states(len(points), points, 200, 200)
+    core.lib.drunk_cats_configure_random(core.seed)
+    interactions = core.calculate_interactions(points, 200, 200, max_fight_pairs=4)
+    core.lib.drunk_cats_configure_random(core.seed)
+    states_only = core.calculate_interactions(
+        points, 200, 200, False, False, max_fight_pairs=0
+    )
+
+    # Assert
+    assert interactions.states.tolist() == states.tolist()
+    assert states_only.states.tolist() == states.tolist()
+    assert interactions.neighbor_counts is not None
+    assert interactions.nearest_rivals is not None
+    assert interactions.fight_pairs is not None
+    fighting = np.flatnonzero(states == 2)
+    assert set(interactions.fight_pairs.ravel()) <= set(fighting)
+    assert interactions.fight_pair_count >= len(fighting) / 2
+    assert interactions.truncated == (interactions.fight_pair_count > 4)
+    assert (interactions.neighbor_counts[fighting] > 0).all()
+    assert states_only.neighbor_counts is None
+    assert states_only.fight_pairs is None
+
+
+def test_negative_neighbor_skin_is_rejected():
+    with pytest.raises(SystemExit):
+        Core(["--neighbor-skin", "-1"])
+
+
+def test_backend_stats_are_recorded_when_a_call_fails():
+    # Arrange
+    core = Core([])
+    core.lib = MagicMock(wraps=core.lib)
+    core.lib.drunk_cats_calculate_states_f32.side_effect = MemoryError
+    points = np.zeros((4, 2), dtype=np.float32)
+
+    # Act
+    with patch.object(core, "_record_backend_stats") as record_backend_stats:
+        with pytest.raises(MemoryError):
+            core._calculate_states(4, points, 100, 100, 1.0)
+
+    # Assert
+    record_backend_stats.assert_called_once()
+
+
+def test_initial_points_of_a_loaded_population_are_not_copied():
+    # Arrange
+    core = Core([])
+    core.population = np.zeros((3, 2))
+
+    # Act
+    points = core.initial_points(3, 1.0)
+
+    # Assert
+    assert points is core.population
+
+
+def test_moving_cats_keeps_the_loaded_population():
+    # Arrange
+    core = Core(["--seed", "1"])
+    core.population = np.zeros((3, 2))
+    store = CatStore()
+    store.reset(core.initial_points(3, 1.0))
+    simulation = Simulation(core, 3)
+
+    # Act
+    store.positions[:] += 1.0
+    simulation.advance(100)
+
+    # Assert
+    np.testing.assert_array_equal(core.population, np.zeros((3, 2)))
+
+
+def test_tiles_keep_their_own_neighbor_lists():
+    # Arrange
+    core = Core(["--world-size", "400", "--tile-size", "100"])
+    points = np.random.default_rng(0).uniform(-1.0, 1.0, size=(300, 2))
+    states = np.zeros(len(points), dtype=np.int32)
+    visible_rect = Rect(-1.0, -1.0, 1.0, 1.0)
+    calls = core.get_backend_stats()["calls"]
+    tick = core.random_tick()
+
+    # Act
+    first = core.update_states(len(points), points, 200, 200, states, visible_rect)
+    core.update_states(len(points), points, 200, 200, first, visible_rect)
+
+    # Assert
+    assert core.get_backend_stats()["calls"] == calls
+    tiles = len(core._region_worlds)
+    assert tiles > 1
+    # Every scheduled pass advances the ticks of the default world once
+    assert core.random_tick() == tick + 2
+    assert metrics.counters()["backend.neighbor_list_reuses"] == tiles
+
+
+def test_tiled_states_match_untiled_ones_with_the_same_seed():
+    # Arrange
+    options = ["--seed", "7", "--world-size", "2000"]
+    points = np.random.default_rng(0).uniform(-1.0, 1.0, size=(3000, 2))
+    states = np.zeros(len(points), dtype=np.int32)
+    visible_rect = Rect(-1.0, -1.0, 1.0, 1.0)
+
+    # Act
+    # Both cores share the default world of the backend, so each one runs in turn
+    core = Core(options)
+    untiled = [core.update_states(len(points), points, 200, 200) for _ in range(2)]
+    untiled_tick = core.random_tick()
+    core = Core(options + ["--tile-size", "500"])
+    tiled = [
+        core.update_states(len(points), points, 200, 200, states, visible_rect)
+        for _ in range(2)
+    ]
+    tiled_tick = core.random_tick()
+
+    # Assert
+    assert np.count_nonzero(untiled[0] == 1) > 0
+    for tiled_states, untiled_states in zip(tiled, untiled):
+        np.testing.assert_array_equal(tiled_states, untiled_states)
+    assert tiled_tick == untiled_tick == 2
+
+
+def test_restored_random_reseeds_tiles():
+    # Arrange
+    options = ["--world-size", "2000", "--tile-size", "500"]
+    points = np.random.default_rng(0).uniform(-1.0, 1.0, size=(3000, 2))
+    states = np.zeros(len(points), dtype=np.int32)
+    visible_rect = Rect(-1.0, -1.0, 1.0, 1.0)
+    core = Core(["--seed", "1"] + options)
+    core.update_states(len(points), points, 200, 200, states, visible_rect)
+
+    # Act
+    core.restore_random(2, 0)
+    restored = core.update_states(len(points), points, 200, 200, states, visible_rect)
+    core = Core(["--seed", "2"] + options)
+    expected = core.update_states(len(points), points, 200, 200, states, visible_rect)
+
+    # Assert
+    np.testing.assert_array_equal(restored, expected)
+
+
+def test_tiles_and_offscreen_budget_are_exclusive():
+    with pytest.raises(SystemExit):
+        Core(["--tile-size", "100", "--offscreen-budget", "500"])
+
+
+@pytest.mark.parametrize("seed", ["-1", str(2**64)])
+def test_seed_out_of_uint64_is_rejected(seed):
+    with pytest.raises(SystemExit):
+        Core(["--seed", seed])
+
+
+@pytest.mark.parametrize("ticks", ["-1", "65536"])
+def test_history_ticks_beyond_tick_counts_are_rejected(ticks):
+    with pytest.raises(SystemExit):
+        Core(["--history-ticks", ticks])
+
+
+def test_negated_flags_turn_features_off():
+    # Arrange
+    core = Core(
+        [
+            "--no-use-texture",
+            "--no-show-stats",
+            "--no-follow-view",
+            "--no-minimap",
+            "--no-fight-lines",
+            "--no-gpu-motion",
+        ]
+    )
+
+    # Act
+    with patch("frontend.ui.widgets.main_window.MainWindow") as main_window:
+        core._create_main_window()
+
+    # Assert
+    options = main_window.call_args.kwargs
+    assert options["use_texture"] is False
+    assert options["show_stats"] is False
+    assert options["show_follow_view"] is False
+    assert options["show_minimap"] is False
+    assert options["fight_lines"] is False
+    assert options["gpu_motion"] is False
+
+
+@patch("frontend.core.core.asyncio.run")
+@patch("frontend.core.frame_server.FrameServer")
+def test_negated_stream_flags_turn_encodings_off(frame_server, run):
+    # Arrange
+    core = Core(["--serve", "0", "--no-stream-quantize", "--no-stream-delta"])
+
+    # Act
+    core.serve()
+
+    # Assert
+    options = frame_server.call_args.kwargs
+    assert (options["quantize"], options["delta"]) == (False, False)
+
+
+@pytest.mark.parametrize("slowdown", ["0.5", "nan"])
+def test_background_speedup_is_rejected(slowdown):
+    with pytest.raises(SystemExit):
+        Core(["--background-slowdown", slowdown])
+
+
+@pytest.mark.parametrize("option", ["--target-fps", "--target-staleness"])
+@pytest.mark.parametrize("value", ["0", "-1", "nan"])
+def test_non_positive_targets_are_rejected(option, value):
+    with pytest.raises(SystemExit):
+        Core([option, value])
+
+
+@pytest.mark.parametrize("fps", ["0", "-30", "nan"])
+def test_non_positive_stream_fps_is_rejected(fps):
+    with pytest.raises(SystemExit):
+        Core(["--serve", "0", "--stream-fps", fps])
@@ -0,0 +1,61 @@
+import asyncio
+
+from frontend.core.core import Core
+from frontend.core.frame_server import FrameServer
+from frontend.core.frame_stream import FrameDecoder
+from frontend.core.simulation import Simulation
+
+
+async def read_frames(address: str, count: int) -> list:
+    reader, writer = await asyncio.open_unix_connection(address.removeprefix("unix:"))
+    decoder = FrameDecoder()
+    frames = []
+    for _ in range(count):
+        size = int.from_bytes(await reader.readexactly(4), "little")
+        frames.append(decoder.decode(await reader.readexactly(size)))
+    writer.close()
+    return frames
+
+
+def test_viewers_get_frames_and_slow_viewers_get_them_dropped(tmp_path):
+    # Arrange
+    address = f"unix:{tmp_path / 'cats.sock'}"
+    server = FrameServer(Simulation(Core([]), 50_000), fps=200.0, delta=True)
+
+    async def scenario():
+        serving = asyncio.create_task(server.serve(address))
+        await server.listening.wait()
+        # Never reads, so its socket buffers fill up
+        _, stalled_writer = await asyncio.open_unix_connection(
+            address.removeprefix("unix:")
+        )
+        frames = await read_frames(address, 3)
+        while server.tick < 30:
+            await asyncio.sleep(0.01)
+        stalled = [v for v in server.viewers if v.sent_frames < 30]
+        serving.cancel()
+        stalled_writer.close()
+        return frames, stalled
+
+    # Act
+    frames, stalled = asyncio.run(scenario())
+
+    # Assert
+    assert [frame.tick for frame in frames] == sorted({f.tick for f in frames})
+    assert all(frame.positions.shape == (50_000, 2) for frame in frames)
+    assert frames[0].diff is None and frames[1].diff is not None
+    assert len(stalled) == 1 and stalled[0].dropped_frames > 0
+
+
+def test_simulated_time_keeps_up_with_the_frames(tmp_path):
+    # Arrange
+    address = f"unix:{tmp_path / 'cats.sock'}"
+    simulation = Simulation(Core([]), 10)
+    server = FrameServer(simulation, fps=300.0)
+
+    # Act
+    asyncio.run(server.serve(address, ticks=30))
+
+    # Assert
+    # 30 frames at 300 fps take 100 ms, not 30 frames of 3 ms
+    assert simulation.time == 100
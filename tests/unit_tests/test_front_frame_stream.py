@@ -0,0 +1,72 @@
+import io
+import socket
+
+import numpy as np
+
+from frontend.core.frame_stream import (
+    Frame,
+    FrameDecoder,
+    FrameEncoder,
+    parse_address,
+)
+
+
+def make_frame(tick: int, states: list[int]) -> Frame:
+    positions = np.linspace(-1.0, 1.0, 2 * len(states), dtype=np.float32)
+    return Frame(tick, positions.reshape(-1, 2), np.array(states, dtype=np.uint8))
+
+
+def test_raw_frames_round_trip():
+    # Arrange
+    frame = make_frame(7, [0, 1, 2])
+    stream = io.BytesIO(FrameEncoder().encode(frame))
+
+    # Act
+    decoded = FrameDecoder().read(stream)
+
+    # Assert
+    assert decoded is not None
+    assert decoded.tick == 7
+    np.testing.assert_array_equal(decoded.positions, frame.positions)
+    np.testing.assert_array_equal(decoded.states, frame.states)
+    assert decoded.diff is None
+    assert FrameDecoder().read(stream) is None
+
+
+def test_quantized_positions_are_close():
+    # Arrange
+    frame = make_frame(0, [0] * 100)
+    encoder = FrameEncoder(quantize=True)
+
+    # Act
+    message = encoder.encode(frame)
+    decoded = FrameDecoder().read(io.BytesIO(message))
+
+    # Assert
+    assert decoded is not None
+    assert len(message) < len(FrameEncoder().encode(frame))
+    np.testing.assert_allclose(decoded.positions, frame.positions, atol=2 / 65535)
+
+
+def test_delta_frames_carry_changed_states_only():
+    # Arrange
+    encoder, decoder = FrameEncoder(delta=True), FrameDecoder()
+    frames = [make_frame(0, [0, 1, 2, 0]), make_frame(1, [0, 2, 2, 0])]
+
+    # Act
+    key, delta = (decoder.decode(encoder.encode(f)[4:]) for f in frames)
+    resized = decoder.decode(encoder.encode(make_frame(2, [1, 1]))[4:])
+
+    # Assert
+    assert key.diff is None
+    assert delta.diff is not None
+    assert delta.diff.indices.tolist() == [1]
+    assert delta.states.tolist() == [0, 2, 2, 0]
+    assert resized.diff is None and resized.states.tolist() == [1, 1]
+
+
+def test_parse_address():
+    # Act, Assert
+    assert parse_address("unix:/tmp/cats.sock") == (socket.AF_UNIX, "/tmp/cats.sock")
+    assert parse_address("8765") == (socket.AF_INET, ("127.0.0.1", 8765))
+    assert parse_address("0.0.0.0:1") == (socket.AF_INET, ("0.0.0.0", 1))
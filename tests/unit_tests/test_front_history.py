@@ -0,0 +1,101 @@
+import threading
+
+import numpy as np
+import pytest
+
+from frontend.constants import CatStates
+from frontend.core.history import MAX_CAPACITY, StateHistory
+
+
+def push_all(history: StateHistory, ticks: list[list[int]]):
+    for states in ticks:
+        history.push(np.array(states, dtype=np.uint8))
+
+
+def test_states_are_packed_into_two_bits():
+    # Act
+    history = StateHistory(120, 500_000)
+
+    # Assert
+    assert history.nbytes == 15_000_000
+
+
+def test_ring_buffer_keeps_the_last_ticks():
+    # Arrange
+    history = StateHistory(2, 5)
+
+    # Act
+    push_all(history, [[0, 1, 2, 0, 1], [2, 2, 2, 2, 2], [1, 0, 0, 2, 1]])
+
+    # Assert
+    assert history.count == 2
+    assert history.states_at(0).tolist() == [1, 0, 0, 2, 1]
+    assert history.states_at(1).tolist() == [2, 2, 2, 2, 2]
+    with pytest.raises(IndexError):
+        history.states_at(2)
+
+
+def test_queries_over_the_last_ticks():
+    # Arrange
+    history = StateHistory(4, 6)
+    push_all(
+        history,
+        [
+            [2, 0, 0, 0, 1, 0],
+            [0, 1, 0, 2, 1, 0],
+            [0, 1, 1, 0, 1, 0],
+        ],
+    )
+
+    # Act
+    fought_recently = history.ever_in_state(CatStates.WANTS_TO_FIGHT, last=2)
+    fought = history.ever_in_state(CatStates.WANTS_TO_FIGHT)
+    hissing_ticks = history.ticks_in_state(CatStates.HISSES)
+
+    # Assert
+    assert np.flatnonzero(fought_recently).tolist() == [3]
+    assert np.flatnonzero(fought).tolist() == [0, 3]
+    assert hissing_ticks.tolist() == [0, 2, 1, 0, 3, 0]
+
+
+def test_states_of_another_number_of_cats_are_ignored():
+    # Arrange
+    history = StateHistory(3, 4)
+
+    # Act
+    pushed = history.push(np.zeros(5, dtype=np.uint8))
+    history.reset(5)
+    pushed_after_reset = history.push(np.ones(5, dtype=np.uint8))
+
+    # Assert
+    assert (pushed, pushed_after_reset) == (False, True)
+    assert history.states_at(0).tolist() == [1, 1, 1, 1, 1]
+
+
+def test_reset_waits_for_a_push_in_progress():
+    # Arrange
+    history = StateHistory(4, 13)
+    resetter = threading.Thread(target=history.reset, args=(6,))
+
+    class ResetWhilePushed(np.ndarray):
+        def __getitem__(self, key):
+            # The reset of another thread arrives in the middle of the push
+            if resetter.ident is None:
+                resetter.start()
+                resetter.join(timeout=0.1)
+            return super().__getitem__(key)
+
+    states = np.ones(13, dtype=np.uint8).view(ResetWhilePushed)
+
+    # Act
+    pushed = history.push(states)
+    resetter.join()
+
+    # Assert
+    assert pushed
+    assert (history.num_cats, history.count) == (6, 0)
+
+
+def test_capacity_beyond_tick_counts_is_rejected():
+    with pytest.raises(ValueError):
+        StateHistory(MAX_CAPACITY + 1, 4)
@@ -0,0 +1,73 @@
+import pytest
+from frontend.core.metrics import Metrics
+
+
+def test_record():
+    # Arrange
+    metrics = Metrics(window_size=100)
+
+    # Act
+    for i in range(1, 101):
+        metrics.record("stage", i / 1000)
+
+    # Assert
+    summary = metrics.stages()["stage"]
+    assert summary.count == 100
+    assert summary.last == pytest.approx(0.1)
+    assert summary.total == pytest.approx(5.05)
+    assert summary.p50 == pytest.approx(0.0505)
+    assert summary.p95 == pytest.approx(0.09505)
+    assert summary.p99 == pytest.approx(0.09901)
+
+
+def test_rolling_window():
+    # Arrange
+    metrics = Metrics(window_size=2)
+
+    # Act
+    for seconds in [10.0, 1.0, 1.0]:
+        metrics.record("stage", seconds)
+
+    # Assert
+    summary = metrics.stages()["stage"]
+    assert summary.total == pytest.approx(12.0)
+    assert summary.p99 == pytest.approx(1.0)
+
+
+def test_measure():
+    # Arrange
+    metrics = Metrics()
+
+    # Act
+    with metrics.measure("stage"):
+        pass
+
+    # Assert
+    summary = metrics.stages()["stage"]
+    assert summary.count == 1
+    assert summary.last >= 0.0
+
+
+def test_counters():
+    # Arrange
+    metrics = Metrics()
+
+    # Act
+    metrics.increment("ticks")
+    metrics.increment("ticks", 2)
+    metrics.set_counter("builds", 5)
+
+    # Assert
+    assert metrics.counters() == {"ticks": 3, "builds": 5}
+
+
+def test_format_report():
+    # Arrange
+    metrics = Metrics()
+    metrics.record("stage", 0.002)
+
+    # Act
+    report = metrics.format_report(["stage", "missing"])
+
+    # Assert
+    assert report == "stage: 2.00/2.00/2.00 ms"
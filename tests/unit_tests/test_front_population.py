@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+from frontend.core.population import (
+    SCENARIOS,
+    generate_scenario,
+    load_population,
+)
+
+
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_generate_scenario(name):
+    # Arrange
+    count = 1000
+    zoom_factor = 2.0
+
+    # Act
+    points = generate_scenario(name, count, zoom_factor, np.random.default_rng(0))
+
+    # Assert
+    assert points.shape == (count, 2)
+    assert points.dtype == np.float64
+    assert np.all(np.abs(points) <= 1 / zoom_factor)
+
+
+def test_generate_grid_in_chunks(monkeypatch):
+    # Arrange
+    monkeypatch.setattr("frontend.core.population.CHUNK_SIZE", 3)
+
+    # Act
+    points = generate_scenario("grid", 4)
+
+    # Assert
+    np.testing.assert_allclose(
+        points, [[-0.5, -0.5], [0.5, -0.5], [-0.5, 0.5], [0.5, 0.5]]
+    )
+
+
+def test_load_npy_population(tmp_path):
+    # Arrange
+    path = tmp_path / "population.npy"
+    expected = np.array([[0.1, 0.2], [0.3, 0.4]], dtype=np.float64)
+    np.save(path, expected)
+
+    # Act
+    points = load_population(path)
+    points += 1.0
+
+    # Assert
+    assert isinstance(points, np.memmap)
+    np.testing.assert_array_equal(points, expected + 1.0)
+    np.testing.assert_array_equal(np.load(path), expected)
+
+
+def test_load_raw_population(tmp_path):
+    # Arrange
+    path = tmp_path / "population.f32"
+    expected = np.array([[0.1, 0.2], [0.3, 0.4]], dtype=np.float32)
+    expected.tofile(path)
+
+    # Act
+    points = load_population(path)
+
+    # Assert
+    assert points.dtype == np.float32
+    np.testing.assert_array_equal(points, expected)
+
+
+def test_load_raw_population_with_explicit_dtype(tmp_path):
+    # Arrange
+    path = tmp_path / "population.bin"
+    expected = np.array([[0.1, 0.2]], dtype=np.float64)
+    expected.tofile(path)
+
+    # Act
+    points = load_population(path, "float64")
+
+    # Assert
+    np.testing.assert_array_equal(points, expected)
+
+
+def test_load_population_of_wrong_shape(tmp_path):
+    # Arrange
+    path = tmp_path / "population.npy"
+    np.save(path, np.zeros((2, 3)))
+
+    # Act & Assert
+    with pytest.raises(ValueError):
+        load_population(path)
+
+
+def test_load_npy_population_with_matching_dtype(tmp_path):
+    # Arrange
+    path = tmp_path / "population.npy"
+    expected = np.ones((3, 2), dtype=np.float32)
+    np.save(path, expected)
+
+    # Act
+    points = load_population(path, "float32")
+
+    # Assert
+    assert points.dtype == np.float32
+    np.testing.assert_array_equal(points, expected)
+
+
+def test_load_npy_population_with_mismatched_dtype(tmp_path):
+    # Arrange
+    path = tmp_path / "population.npy"
+    np.save(path, np.ones((3, 2), dtype=np.float32))
+
+    # Act & Assert
+    with pytest.raises(ValueError):
+        load_population(path, "float64")
@@ -0,0 +1,84 @@
+import json
+import threading
+from frontend.core import profiler
+from frontend.core.metrics import Metrics
+from frontend.core.profiler import (
+    Tracer,
+    enable_profiling,
+    disable_profiling,
+    trace_span,
+)
+
+
+def test_trace_span_disabled():
+    # Arrange
+    disable_profiling(save=False)
+
+    # Act
+    with trace_span("span"):
+        pass
+
+    # Assert
+    assert profiler.get_tracer() is None
+
+
+def test_span_events(tmp_path):
+    # Arrange
+    tracer = Tracer(tmp_path / "trace.json")
+
+    # Act
+    with tracer.span("outer"):
+        with tracer.span("inner", category="backend"):
+            pass
+    worker = threading.Thread(target=lambda: tracer.record_span("worker", 0.0, 1.0))
+    worker.start()
+    worker.join()
+
+    # Assert
+    events = tracer.to_json()["traceEvents"]
+    spans = {e["name"]: e for e in events if e["ph"] == "X"}
+    assert set(spans) == {"outer", "inner", "worker"}
+    assert spans["inner"]["cat"] == "backend"
+    assert spans["outer"]["ts"] <= spans["inner"]["ts"]
+    assert spans["outer"]["dur"] >= spans["inner"]["dur"]
+    assert spans["worker"]["tid"] != spans["outer"]["tid"]
+    assert spans["worker"]["dur"] == 1e6
+
+    thread_names = [e for e in events if e["ph"] == "M"]
+    assert len(thread_names) == 2
+
+
+def test_samples(tmp_path):
+    # Arrange
+    tracer = Tracer(tmp_path / "trace.json")
+
+    # Act
+    tracer.sample()
+
+    # Assert
+    trace = tracer.to_json()
+    assert len(trace["samples"]) >= 1
+    sample = trace["samples"][0]
+    frame = trace["stackFrames"][sample["sf"]]
+    assert frame["name"].startswith("sample")
+    assert "parent" in frame
+
+
+def test_enable_and_save(tmp_path):
+    # Arrange
+    path = tmp_path / "trace.json"
+    metrics = Metrics()
+
+    # Act
+    enable_profiling(path, sampling_interval=0.001)
+    with trace_span("span"):
+        with metrics.measure("stage"):
+            pass
+    disable_profiling()
+
+    # Assert
+    with open(path) as f:
+        trace = json.load(f)
+    names = {e["name"] for e in trace["traceEvents"] if e["ph"] == "X"}
+    assert names == {"span", "stage"}
+    assert profiler.get_tracer() is None
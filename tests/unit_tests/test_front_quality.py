@@ -0,0 +1,84 @@
+from frontend.ui.quality import FrameRateGovernor, QUALITY_LEVELS
+
+
+def feed(governor: FrameRateGovernor, cost: float, frames: int):
+    changes = []
+    for _ in range(frames):
+        level = governor.record_frame(cost)
+        if level is not None:
+            changes.append(level.name)
+    return changes
+
+
+def test_quality_drops_while_frames_miss_the_budget():
+    # Arrange
+    governor = FrameRateGovernor(target_fps=50, window=10)
+
+    # Act
+    changes = feed(governor, cost=0.03, frames=20)
+
+    # Assert
+    assert changes == [QUALITY_LEVELS[1].name, QUALITY_LEVELS[2].name]
+
+
+def test_quality_recovers_with_headroom():
+    # Arrange
+    governor = FrameRateGovernor(target_fps=50, window=10)
+    feed(governor, cost=0.03, frames=30)
+
+    # Act
+    changes = feed(governor, cost=0.005, frames=90)
+
+    # Assert
+    assert changes == [QUALITY_LEVELS[i].name for i in (2, 1, 0)]
+    assert governor.level == QUALITY_LEVELS[0]
+
+
+def test_quality_recovers_only_after_several_windows_with_headroom():
+    # Arrange
+    governor = FrameRateGovernor(target_fps=50, window=10, recovery_windows=3)
+    feed(governor, cost=0.03, frames=10)
+
+    # Act
+    early_changes = feed(governor, cost=0.005, frames=29)
+    changes = feed(governor, cost=0.005, frames=1)
+
+    # Assert
+    assert early_changes == []
+    assert changes == [QUALITY_LEVELS[0].name]
+
+
+def test_quality_is_kept_at_target_without_headroom():
+    # Arrange
+    governor = FrameRateGovernor(target_fps=50, window=10)
+
+    # Act
+    changes = feed(governor, cost=0.015, frames=50)
+
+    # Assert
+    assert changes == []
+
+
+def test_vsync_bound_frames_do_not_flip_quality():
+    # Arrange
+    governor = FrameRateGovernor(target_fps=50, window=10)
+    feed(governor, cost=0.03, frames=10)
+
+    # Act
+    # Frames are presented exactly at the budget, but use only 60% of it
+    changes = feed(governor, cost=0.012, frames=200)
+
+    # Assert
+    assert changes == []
+    assert governor.level == QUALITY_LEVELS[1]
+
+
+def test_quality_stops_at_the_cheapest_level():
+    # Arrange
+    governor = FrameRateGovernor(target_fps=50, window=2)
+
+    # Act
+    feed(governor, cost=0.1, frames=100)
+
+    # Assert
+    assert governor.level == QUALITY_LEVELS[-1]
@@ -0,0 +1,33 @@
+import cv2
+import moderngl
+import pytest
+
+from frontend.core.core import Core
+from frontend.tools.render_video import render_run
+
+
+@pytest.fixture(autouse=True)
+def require_offscreen_context():
+    try:
+        moderngl.create_standalone_context(backend="egl").release()  # type: ignore[arg-type]
+    except Exception as error:
+        pytest.skip(f"No offscreen OpenGL context: {error}")
+
+
+def test_render_run_writes_every_frame(tmp_path):
+    # Arrange
+    output = tmp_path / "run.mp4"
+    core = Core(["--num-points", "200", "--seed", "1"])
+
+    # Act
+    stats = render_run(core, output, seconds=0.5, fps=20.0, width=160, height=120)
+
+    # Assert
+    capture = cv2.VideoCapture(output.as_posix())
+    frames = []
+    while (frame := capture.read())[0]:
+        frames.append(frame[1])
+    assert stats["frames"] == 10
+    assert len(frames) == 10
+    assert frames[0].shape == (120, 160, 3)
+    assert frames[-1].any()
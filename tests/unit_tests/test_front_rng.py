@@ -0,0 +1,77 @@
+import numpy as np
+
+from frontend.core.core import Core
+from frontend.core.rng import STREAM_MOTION, STREAM_POSITIONS, counter_rng
+
+
+def test_draws_depend_only_on_seed_stream_and_counter():
+    # Act
+    first = counter_rng(1, STREAM_MOTION, 5).random(4)
+    second = counter_rng(1, STREAM_MOTION, 5).random(4)
+    next_counter = counter_rng(1, STREAM_MOTION, 6).random(4)
+    other_stream = counter_rng(1, STREAM_POSITIONS, 5).random(4)
+
+    # Assert
+    np.testing.assert_array_equal(first, second)
+    assert not np.array_equal(first, next_counter)
+    assert not np.array_equal(first, other_stream)
+
+
+def test_hiss_rolls_do_not_depend_on_neighbor_search():
+    # Arrange
+    core = Core([])
+    ffi, lib = core.ffi, core.lib
+    # Cats on a ring are too crowded for neighbor lists, but don't fight each other
+    angles = np.linspace(0.0, 2 * np.pi, 300, endpoint=False)
+    ring = np.column_stack([np.cos(angles), np.sin(angles)]) * 8.0
+    # Far isolated cats make neighbor lists affordable again
+    far = np.column_stack([np.arange(1000) * 100.0 + 1000.0, np.zeros(1000)])
+
+    def calculate(positions: np.ndarray) -> tuple[np.ndarray, int]:
+        world = lib.drunk_cats_world_create(0.1, 20.0)
+        try:
+            lib.drunk_cats_world_configure_random(world, 42)
+            states = np.empty(len(positions), dtype=np.uint8)
+            f32 = np.ascontiguousarray(positions, dtype=np.float32)
+            lib.drunk_cats_world_calculate_states_f32(
+                world,
+                len(positions),
+                ffi.cast("OpenGlPositionF32 *", ffi.from_buffer(f32)),
+                2,
+                2,
+                1.0,
+                ffi.cast("uint8_t *", ffi.from_buffer(states)),
+            )
+            stats = ffi.new("DrunkCatsStats *")
+            lib.drunk_cats_world_get_stats(world, stats)
+            return states, int(stats.kd_tree_searches)
+        finally:
+            lib.drunk_cats_world_destroy(world)
+
+    # Act
+    kd_tree_states, kd_tree_searches = calculate(ring)
+    list_states, list_kd_tree_searches = calculate(np.concatenate([ring, far]))
+
+    # Assert
+    assert (kd_tree_searches, list_kd_tree_searches) == (1, 0)
+    assert 0 < kd_tree_states.sum() < len(ring)
+    np.testing.assert_array_equal(kd_tree_states, list_states[: len(ring)])
+
+
+def test_restored_random_tick_repeats_hiss_rolls():
+    # Arrange
+    core = Core(["--seed", "7"])
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-1.0, 1.0, size=(2000, 2)).astype(np.float32)
+    core.update_states(len(points), points, 2000, 2000)
+    tick = core.random_tick()
+
+    # Act
+    states = core.update_states(len(points), points, 2000, 2000)
+    core.restore_random(core.seed, tick)
+    restored_states = core.update_states(len(points), points, 2000, 2000)
+
+    # Assert
+    assert tick == 1
+    assert 0 < np.count_nonzero(states == 1)
+    np.testing.assert_array_equal(states, restored_states)
@@ -0,0 +1,176 @@
+import moderngl
+import numpy as np
+import pytest
+
+from frontend.ui.renderer import PointRenderer, RenderState, setup_line_uniforms
+from frontend.ui.shader_source import (
+    FRAGMENT_SHADER,
+    LINE_FRAGMENT_SHADER,
+    LINE_VERTEX_SHADER,
+    VERTEX_SHADER,
+)
+from frontend.ui.shared_buffers import SharedPointBuffers
+
+SIZE = 64
+
+
+@pytest.fixture
+def ctx():
+    try:
+        ctx = moderngl.create_standalone_context(backend="egl")  # type: ignore[arg-type]
+    except Exception as error:
+        pytest.skip(f"No offscreen OpenGL context: {error}")
+    ctx.enable(moderngl.PROGRAM_POINT_SIZE)
+    yield ctx
+    ctx.release()
+
+
+class View:
+    """Draws the buffers like a view does: its own program, vertex array and camera"""
+
+    def __init__(self, ctx, buffers):
+        self.ctx = ctx
+        self.buffers = buffers
+        self.program = ctx.program(
+            vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER
+        )
+        self.vao = buffers.vertex_array(ctx, self.program)
+        self.framebuffer = ctx.simple_framebuffer((SIZE, SIZE))
+
+    def draw(
+        self, zoom: float, pan: tuple[float, float], motion_time: float = 0.0
+    ) -> np.ndarray:
+        self.framebuffer.use()
+        self.framebuffer.clear()
+        PointRenderer(self.ctx, self.program, []).setup_uniforms(
+            RenderState(
+                points=np.empty((0, 2)),
+                states=np.empty(0),
+                followed_cat_id=None,
+                zoom_factor=zoom,
+                pan_offset=np.array(pan),
+                point_radius=2.0,
+                follow_radius=0.5,
+                use_texture=False,
+                motion_time=motion_time,
+            )
+        )
+        self.vao.render(moderngl.POINTS, vertices=self.buffers.vertex_count)
+        pixels = np.frombuffer(self.framebuffer.read(components=3), dtype=np.uint8)
+        return pixels.reshape(SIZE, SIZE, 3)
+
+
+def test_views_draw_the_same_buffers_with_their_own_cameras(ctx):
+    # Arrange
+    points = np.array([[-0.5, -0.5], [0.5, 0.5]], dtype=np.float32)
+    states = np.array([0, 2], dtype=np.uint8)
+    buffers = SharedPointBuffers(ctx, points, states)
+
+    # Act
+    overview = View(ctx, buffers).draw(zoom=1.0, pan=(0.0, 0.0))
+    close_up = View(ctx, buffers).draw(zoom=4.0, pan=(-0.5, -0.5))
+
+    # Assert
+    assert overview[SIZE // 4, SIZE // 4].any()  # calm cat, bottom left
+    assert overview[3 * SIZE // 4, 3 * SIZE // 4, 0] == 255  # fighting cat, top right
+    assert close_up[SIZE // 2, SIZE // 2, 0] == 255  # fighting cat in the center
+    assert not close_up[SIZE // 4, SIZE // 4].any()
+
+
+def test_views_of_another_context_draw_the_shared_buffers(ctx):
+    # Arrange
+    points = np.array([[-0.5, -0.5], [0.5, 0.5]], dtype=np.float32)
+    buffers = SharedPointBuffers(ctx, points, np.full(2, 2, dtype=np.uint8))
+    try:
+        # Shares objects with the current context, like the contexts of all widgets
+        other = moderngl.create_context(standalone=True, share=True, backend="egl")  # type: ignore[arg-type]
+    except Exception as error:
+        pytest.skip(f"No shared OpenGL context: {error}")
+    other.enable(moderngl.PROGRAM_POINT_SIZE)
+
+    # Act
+    with other:
+        image = View(other, buffers).draw(zoom=1.0, pan=(0.0, 0.0))
+
+    # Assert
+    assert other is not ctx
+    assert image[SIZE // 4, SIZE // 4, 0] == 255
+    assert image[3 * SIZE // 4, 3 * SIZE // 4, 0] == 255
+    other.release()
+
+
+def test_reallocate_keeps_vertex_arrays_of_views_valid(ctx):
+    # Arrange
+    buffers = SharedPointBuffers(
+        ctx, np.zeros((1, 2), dtype=np.float32), np.zeros(1, dtype=np.uint8)
+    )
+    view = View(ctx, buffers)
+    points = np.array([[-0.5, -0.5], [0.0, 0.0], [0.5, 0.5]], dtype=np.float32)
+
+    # Act
+    buffers.reallocate(points, np.full(3, 2, dtype=np.uint8))
+    buffers.write_states(np.zeros(1, dtype=np.uint8), offset=1)
+    image = view.draw(zoom=1.0, pan=(0.0, 0.0))
+
+    # Assert
+    assert buffers.vertex_count == 3
+    assert image[SIZE // 4, SIZE // 4, 0] == 255
+    assert image[SIZE // 2, SIZE // 2, 0] == 0 and image[SIZE // 2, SIZE // 2].any()
+    assert image[3 * SIZE // 4, 3 * SIZE // 4, 0] == 255
+
+
+def test_cats_are_moved_by_their_velocities_in_the_shader(ctx):
+    # Arrange
+    points = np.array([[-0.5, -0.5], [0.5, 0.5]], dtype=np.float32)
+    velocities = np.array([[1.0, 0.0], [0.0, 0.0]], dtype=np.float32)
+    buffers = SharedPointBuffers(ctx, points, np.full(2, 2, dtype=np.uint8))
+    view = View(ctx, buffers)
+
+    # Act
+    unmoved = view.draw(zoom=1.0, pan=(0.0, 0.0), motion_time=1.0)
+    buffers.write_velocities(velocities)
+    moved = view.draw(zoom=1.0, pan=(0.0, 0.0), motion_time=1.0)
+
+    # Assert
+    assert unmoved[SIZE // 4, SIZE // 4, 0] == 255
+    assert not moved[SIZE // 4, SIZE // 4].any()
+    assert moved[SIZE // 4, 3 * SIZE // 4, 0] == 255
+    assert moved[3 * SIZE // 4, 3 * SIZE // 4, 0] == 255
+
+
+def test_fight_lines_connect_the_drawn_cats(ctx):
+    # Arrange
+    points = np.array([[-0.5, 0.0], [0.5, 0.0]], dtype=np.float32)
+    buffers = SharedPointBuffers(ctx, points, np.zeros(2, dtype=np.uint8))
+    program = ctx.program(
+        vertex_shader=LINE_VERTEX_SHADER, fragment_shader=LINE_FRAGMENT_SHADER
+    )
+    vao = buffers.line_vertex_array(ctx, program)
+    framebuffer = ctx.simple_framebuffer((SIZE, SIZE))
+    framebuffer.use()
+    framebuffer.clear()
+
+    # Act
+    buffers.write_fight_pairs(np.array([[0, 1]], dtype=np.uint32))
+    setup_line_uniforms(
+        program,
+        RenderState(
+            points=points,
+            states=np.zeros(2),
+            followed_cat_id=None,
+            zoom_factor=1.0,
+            pan_offset=np.zeros(2),
+            point_radius=2.0,
+            follow_radius=0.5,
+            use_texture=False,
+        ),
+        (1.0, 0.0, 0.0, 1.0),
+    )
+    vao.render(moderngl.LINES, vertices=2 * buffers.fight_pair_count)
+
+    # Assert
+    pixels = np.frombuffer(framebuffer.read(components=3), dtype=np.uint8)
+    row = pixels.reshape(SIZE, SIZE, 3)[SIZE // 2 - 1 : SIZE // 2 + 1, :, 0].max(axis=0)
+    assert buffers.fight_pair_count == 1
+    assert row[SIZE // 2] == 255
+    assert row[SIZE // 8] == 0
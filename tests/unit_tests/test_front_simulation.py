@@ -0,0 +1,45 @@
+import numpy as np
+
+from frontend.core.core import Core
+from frontend.core.simulation import Simulation, frame_milliseconds
+
+
+def test_step_moves_cats_and_calculates_states():
+    # Arrange
+    core = Core([])
+    points = np.zeros((10, 2), dtype=np.float64)
+    simulation = Simulation(core, 10, points=points)
+    deltas = simulation.deltas.copy()
+
+    # Act
+    states = simulation.step()
+
+    # Assert
+    np.testing.assert_allclose(simulation.points, deltas * 5.0)
+    assert np.all(points == 0.0)
+    assert states.shape == (10,)
+    assert simulation.state_fractions().sum() == 1.0
+
+
+def test_same_seed_gives_identical_runs():
+    # Arrange
+    def run(seed: int) -> list[np.ndarray]:
+        simulation = Simulation(Core(["--seed", str(seed)]), 2000, speed=20.0)
+        return [simulation.step().copy() for _ in range(5)] + [simulation.points]
+
+    # Act
+    first, second, other = run(7), run(7), run(8)
+
+    # Assert
+    for a, b in zip(first, second):
+        np.testing.assert_array_equal(a, b)
+    assert not np.array_equal(first[-1], other[-1])
+
+
+def test_frame_milliseconds_add_up_to_the_video_time():
+    # Act
+    milliseconds = [frame_milliseconds(frame, 30.0) for frame in range(300)]
+
+    # Assert
+    assert set(milliseconds) == {33, 34}
+    assert sum(milliseconds) == 10_000
@@ -0,0 +1,55 @@
+import moderngl
+import pytest
+
+from frontend.core.core import Core
+from frontend.tools.soak import (
+    GrowthLimits,
+    HeadlessTarget,
+    ResourceSample,
+    exceeded_limits,
+    growth_rates,
+    soak,
+)
+
+
+def make_sample(seconds: float, rss_bytes: int, gl_buffers: int = 3):
+    return ResourceSample(seconds, rss_bytes, 1000, 4, gl_buffers)
+
+
+def test_growth_rates_skip_the_warmup():
+    # Arrange
+    samples = [make_sample(0.0, 0)] + [
+        make_sample(60.0 * minute, 100 * 2**20 + minute * 2**20, 3 + minute)
+        for minute in range(1, 6)
+    ]
+
+    # Act
+    rates = growth_rates(samples, warmup=60.0)
+
+    # Assert
+    assert rates["rss_bytes"] == pytest.approx(2**20)
+    assert rates["python_objects"] == pytest.approx(0.0)
+    assert exceeded_limits(rates, GrowthLimits(rss_bytes=2 * 2**20)) == ["gl_buffers"]
+
+
+def test_headless_soak_applies_every_action_without_leaking_buffers():
+    # Arrange
+    try:
+        ctx = moderngl.create_standalone_context(backend="egl")  # type: ignore[arg-type]
+    except Exception as error:
+        pytest.skip(f"No offscreen OpenGL context: {error}")
+    core = Core(["--num-points", "200", "--seed", "1"])
+    target = HeadlessTarget(core, 200, ctx)
+
+    # Act
+    try:
+        samples = soak(target, seconds=1.0, action_interval=0.05, sample_interval=0.1)
+    finally:
+        target.close()
+
+    # Assert
+    assert len(samples) >= 2
+    assert target.num_points in (200, 400)
+    # Positions, velocities, states and fight pairs
+    assert samples[0].gl_buffers == samples[-1].gl_buffers == 4
+    assert len({sample.threads for sample in samples[1:]}) == 1
@@ -0,0 +1,61 @@
+import pytest
+
+from frontend.core.staleness import StalenessController
+
+
+def test_interval_is_unchanged_without_target():
+    # Arrange
+    controller = StalenessController(target=None, interval=0.5)
+
+    # Act
+    interval = controller.record_update(started_at=0.0, finished_at=0.2)
+
+    # Assert
+    assert interval == 0.5
+    assert controller.calculation_time == pytest.approx(0.2)
+
+
+def test_interval_leaves_room_for_calculation():
+    # Arrange
+    controller = StalenessController(target=0.3, interval=0.5, margin=0.0)
+
+    # Act
+    interval = controller.record_update(started_at=0.0, finished_at=0.1)
+
+    # Assert
+    assert interval == pytest.approx(0.2)
+
+
+def test_slow_calculations_run_back_to_back():
+    # Arrange
+    controller = StalenessController(target=0.3, interval=0.5)
+
+    # Act
+    interval = controller.record_update(started_at=0.0, finished_at=0.4)
+
+    # Assert
+    assert interval == pytest.approx(0.4)
+
+
+def test_staleness_is_age_of_replaced_states():
+    # Arrange
+    controller = StalenessController(target=None, interval=0.5)
+
+    # Act
+    controller.record_update(started_at=0.0, finished_at=0.1)
+    controller.record_update(started_at=0.5, finished_at=0.6)
+
+    # Assert
+    assert controller.staleness == pytest.approx(0.6)
+
+
+def test_skipped_ticks_are_counted():
+    # Arrange
+    controller = StalenessController(target=None, interval=0.5)
+
+    # Act
+    controller.skip_tick()
+    controller.skip_tick()
+
+    # Assert
+    assert controller.skipped_ticks == 2
@@ -0,0 +1,46 @@
+import numpy as np
+
+from frontend.core.state_diff import StateDiff
+
+
+def test_diff_contains_changed_cats_only():
+    # Arrange
+    old = np.array([0, 1, 2, 0, 0], dtype=np.uint8)
+    new = np.array([0, 2, 2, 1, 0], dtype=np.uint8)
+
+    # Act
+    diff = StateDiff.between(old, new)
+
+    # Assert
+    assert diff.indices.tolist() == [1, 3]
+    assert diff.states.tolist() == [2, 1]
+
+
+def test_applied_diff_gives_new_states():
+    # Arrange
+    old = np.array([0, 1, 2, 0, 0], dtype=np.uint8)
+    new = np.array([2, 1, 0, 0, 1], dtype=np.uint8)
+    states = old.copy()
+
+    # Act
+    StateDiff.between(old, new).apply(states)
+
+    # Assert
+    np.testing.assert_array_equal(states, new)
+
+
+def test_ranges_merge_close_changes():
+    # Arrange
+    old = np.zeros(20, dtype=np.uint8)
+    new = old.copy()
+    new[[2, 3, 4, 7, 15]] = 1
+    diff = StateDiff.between(old, new)
+
+    # Act
+    exact = diff.ranges()
+    merged = diff.ranges(max_gap=2)
+
+    # Assert
+    assert exact == [(2, 5), (7, 8), (15, 16)]
+    assert merged == [(2, 8), (15, 16)]
+    assert StateDiff.between(old, old).ranges() == []
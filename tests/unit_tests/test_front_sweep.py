@@ -0,0 +1,35 @@
+import csv
+
+import numpy as np
+
+from frontend.tools.sweep import SUMMARY_FILE, make_configs, run_sweep
+
+
+def test_make_configs_skips_invalid_radii():
+    # Act
+    configs = make_configs([10, 20], [5.0, 30.0], [20.0], [1.0], ticks=3)
+
+    # Assert
+    assert [(c.num_points, c.fight_radius) for c in configs] == [(10, 5.0), (20, 5.0)]
+
+
+def test_sweep_writes_results_and_resumes(tmp_path):
+    # Arrange
+    configs = make_configs([50], [5.0, 10.0], [20.0], [1.0], ticks=3)
+
+    # Act
+    first_run = run_sweep(configs[:1], tmp_path, workers=1)
+    second_run = run_sweep(configs, tmp_path, workers=1)
+
+    # Assert
+    assert first_run == configs[:1]
+    assert second_run == configs[1:]
+
+    with np.load(tmp_path / f"{configs[0].name}.npz") as data:
+        assert data["fractions"].shape == (3, 3)
+        np.testing.assert_allclose(data["fractions"].sum(axis=1), 1.0)
+        assert data["seconds"].shape == (3,)
+
+    with open(tmp_path / SUMMARY_FILE) as f:
+        rows = list(csv.DictReader(f))
+    assert sorted(float(row["fight_radius"]) for row in rows) == [5.0, 10.0]
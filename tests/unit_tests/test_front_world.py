@@ -0,0 +1,179 @@
+import numpy as np
+import pytest
+from typing import Optional
+
+from frontend.core.world import Rect, TileIndex, TiledWorld, VisibilityScheduler
+
+
+def count_neighbors(
+    positions: np.ndarray,
+    cat_ids: Optional[np.ndarray] = None,
+    region: int = 0,
+    radius: float = 1.0,
+) -> np.ndarray:
+    """Number of other cats within the radius, a stand-in for the backend"""
+    distances = np.linalg.norm(positions[:, None] - positions[None, :], axis=2)
+    return (np.count_nonzero(distances <= radius, axis=1) - 1).astype(np.int32)
+
+
+def test_tile_index_groups_cats_by_tiles():
+    # Arrange
+    positions = np.array([[0.5, 0.5], [-0.5, 0.5], [0.2, 0.9], [3.5, -1.5]])
+
+    # Act
+    index = TileIndex(positions, tile_size=1.0)
+
+    # Assert
+    tiles = {(tile.x, tile.y): sorted(index.cats(tile)) for tile in index}
+    assert tiles == {(0, 0): [0, 2], (-1, 0): [1], (3, -2): [3]}
+
+
+def test_cats_with_halo_include_close_cats_of_neighbor_tiles():
+    # Arrange
+    positions = np.array([[0.5, 0.5], [1.2, 0.5], [1.9, 0.5], [-0.1, -0.1]])
+    index = TileIndex(positions, tile_size=1.0)
+    tile = next(t for t in index if (t.x, t.y) == (0, 0))
+
+    # Act
+    cats = index.cats_with_halo(tile, halo=0.3)
+
+    # Assert
+    assert cats[0] == 0
+    assert sorted(cats[1:]) == [1, 3]
+
+
+def test_tiled_states_match_full_calculation():
+    # Arrange
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-10.0, 10.0, size=(400, 2))
+    states = np.zeros(len(positions), dtype=np.int32)
+    world = TiledWorld(tile_size=2.5, halo=1.0, far_tile_interval=1)
+
+    # Act
+    result = world.update_states(
+        count_neighbors, positions, states, Rect(-1, -1, 1, 1), tick=0
+    )
+
+    # Assert
+    np.testing.assert_array_equal(result, count_neighbors(positions))
+    assert world.skipped_tiles == 0
+
+
+@pytest.mark.parametrize(
+    "scheduler",
+    [
+        TiledWorld(tile_size=2.5, halo=1.0, far_tile_interval=1),
+        VisibilityScheduler(halo=1.0, offscreen_budget=100),
+    ],
+)
+def test_calculated_cats_are_identified_by_their_indices_in_the_world(scheduler):
+    # Arrange
+    rng = np.random.default_rng(2)
+    positions = rng.uniform(-10.0, 10.0, size=(400, 2))
+    states = np.zeros(len(positions), dtype=np.int32)
+    calls = []
+
+    def record(region_positions, cat_ids, region):
+        calls.append((region_positions, cat_ids))
+        return count_neighbors(region_positions)
+
+    # Act
+    scheduler.update_states(record, positions, states, Rect(-1, -1, 1, 1), tick=0)
+
+    # Assert
+    assert calls
+    for region_positions, cat_ids in calls:
+        np.testing.assert_array_equal(region_positions, positions[cat_ids])
+
+
+def test_far_tiles_are_updated_less_often():
+    # Arrange
+    positions = np.array([[0.5, 0.5], [0.6, 0.5], [10.5, 0.5], [10.6, 0.5]])
+    states = np.full(len(positions), -1, dtype=np.int32)
+    world = TiledWorld(tile_size=1.0, halo=0.5, far_tile_interval=3)
+    visible_rect = Rect(0.0, 0.0, 1.0, 1.0)
+
+    # Act
+    updates = [
+        world.update_states(count_neighbors, positions, states, visible_rect, tick)
+        for tick in range(3)
+    ]
+
+    # Assert
+    for result in updates:
+        assert list(result[:2]) == [1, 1]
+    far_updated = [result[2] == 1 for result in updates]
+    assert far_updated.count(True) == 1
+
+
+def test_halo_larger_than_tile_is_rejected():
+    with pytest.raises(ValueError):
+        TiledWorld(tile_size=1.0, halo=2.0, far_tile_interval=1)
+
+
+def test_visible_cats_are_updated_on_every_tick():
+    # Arrange
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(-10.0, 10.0, size=(400, 2))
+    states = np.full(len(positions), -1, dtype=np.int32)
+    scheduler = VisibilityScheduler(halo=1.0, offscreen_budget=0)
+    visible_rect = Rect(-2.0, -2.0, 2.0, 2.0)
+
+    # Act
+    result = scheduler.update_states(
+        count_neighbors, positions, states, visible_rect, tick=0
+    )
+
+    # Assert
+    visible = visible_rect.expanded(1.0).contains(positions)
+    np.testing.assert_array_equal(result[visible], count_neighbors(positions)[visible])
+    assert np.all(result[~visible] == -1)
+    assert scheduler.visible_cats == np.count_nonzero(visible)
+
+
+def test_offscreen_cats_are_refreshed_round_robin_within_budget():
+    # Arrange
+    positions = np.array([[3.0 * x + 0.5, 0.5] for x in range(6)], dtype=np.float64)
+    states = np.full(len(positions), -1, dtype=np.int32)
+    scheduler = VisibilityScheduler(halo=1.0, offscreen_budget=2)
+    hidden_rect = Rect(100.0, 100.0, 101.0, 101.0)
+
+    # Act
+    first = scheduler.update_states(
+        count_neighbors, positions, states, hidden_rect, tick=0
+    )
+    second = scheduler.update_states(
+        count_neighbors, positions, first, hidden_rect, tick=1
+    )
+
+    # Assert
+    assert list(first) == [0, 0, -1, -1, -1, -1]
+    assert list(second) == [0, 0, 0, 0, -1, -1]
+    assert scheduler.refreshed_cats == 2
+
+    # The sweep wraps around after the last strip
+    third = scheduler.update_states(count_neighbors, positions, second, hidden_rect, 2)
+    fourth = scheduler.update_states(count_neighbors, positions, third, hidden_rect, 3)
+    assert list(third) == [0] * 6
+    assert scheduler.refreshed_cats == 2
+    assert list(fourth) == [0] * 6
+
+
+def test_offscreen_sweep_advances_past_cats_sharing_x():
+    # Arrange
+    positions = np.array([[0.5, 3.0 * y] for y in range(4)] + [[5.5, 0.5]])
+    states = np.full(len(positions), -1, dtype=np.int32)
+    scheduler = VisibilityScheduler(halo=1.0, offscreen_budget=2)
+    hidden_rect = Rect(100.0, 100.0, 101.0, 101.0)
+
+    # Act
+    first = scheduler.update_states(
+        count_neighbors, positions, states, hidden_rect, tick=0
+    )
+    second = scheduler.update_states(
+        count_neighbors, positions, first, hidden_rect, tick=1
+    )
+
+    # Assert
+    assert list(first) == [0, 0, 0, 0, -1]
+    assert list(second) == [0] * 5